@@ -0,0 +1,197 @@
+"""
+Managed storage for generated files (syllabus PDFs in backend/temp).
+
+Every file written through an ArtifactStore is tracked with its size and last
+access. The store enforces a total size cap with LRU eviction and a maximum
+age, and a periodic sweeper also removes files it did not write itself (left
+over from earlier runs or other processes), so the directory cannot grow
+without bound. Files handed to a FileResponse are released - deleted - once
+the response has been sent.
+
+A file that is still being written or streamed is pinned; neither eviction nor
+the sweeper removes a pinned file until every pin on it has been dropped.
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import aiofiles
+
+
+class ArtifactStore:
+    def __init__(self, directory: Path, max_bytes: int, max_age_seconds: float, sweep_interval: float = 300):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.sweep_interval = sweep_interval
+        # path -> size, in least-recently-used order
+        self._files: "OrderedDict[Path, int]" = OrderedDict()
+        self._size = 0
+        # path -> number of holders (responses streaming it, jobs writing it)
+        self._pins: Dict[Path, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.evicted = 0
+        self.expired = 0
+        self.released = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    async def put(self, prefix: str, data: bytes, suffix: str = ".pdf") -> Path:
+        """Write data to a new file in the store and return its path, pinned until release()"""
+        path = self.new_path(prefix, suffix)
+        self.pin(path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self.unpin(path)
+            raise
+
+        self._files[path] = len(data)
+        self._size += len(data)
+        self._evict_over_size(keep=path)
+        return path
+
+    def new_path(self, prefix: str, suffix: str) -> Path:
+        """Unique path in the store for a file written incrementally; call adopt() once complete"""
+        return self.directory / f"{prefix}_{uuid.uuid4().hex[:8]}{suffix}"
+
+    def adopt(self, path: Path):
+        """Start tracking a file written directly into the store directory"""
+        path = Path(path)
+        size = path.stat().st_size
+        self._size += size - self._files.get(path, 0)
+        self._files[path] = size
+        self._files.move_to_end(path)
+        self._evict_over_size(keep=path)
+
+    def touch(self, path: Path):
+        path = Path(path)
+        if path in self._files:
+            self._files.move_to_end(path)
+
+    def pin(self, path: Path):
+        """Keep a file from being evicted or swept until the matching unpin()"""
+        path = Path(path)
+        self._pins[path] = self._pins.get(path, 0) + 1
+
+    def unpin(self, path: Path):
+        path = Path(path)
+        count = self._pins.get(path, 0) - 1
+        if count > 0:
+            self._pins[path] = count
+        else:
+            self._pins.pop(path, None)
+
+    def is_pinned(self, path: Path) -> bool:
+        path = Path(path)
+        # A put() in progress writes to "<name>.tmp" next to its pinned path
+        if path.suffix == ".tmp":
+            path = path.with_suffix("")
+        return path in self._pins
+
+    def release(self, path: Path):
+        """Drop the pins on a file and delete it (e.g. after the response is sent)"""
+        path = Path(path)
+        self._pins.pop(path, None)
+        if self._delete(path):
+            self.released += 1
+
+    def _delete(self, path: Path) -> bool:
+        size = self._files.pop(path, None)
+        if size is not None:
+            self._size -= size
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logging.warning(f"Could not delete artifact {path}: {e}")
+            return False
+
+    def _evict_over_size(self, keep: Optional[Path] = None):
+        for path in list(self._files):
+            if self._size <= self.max_bytes:
+                break
+            if path != keep and path not in self._pins:
+                self._delete(path)
+                self.evicted += 1
+
+    def sweep(self) -> int:
+        """Remove expired files (tracked or not) and enforce the size cap"""
+        cutoff = time.time() - self.max_age_seconds
+        removed = 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError as e:
+            logging.warning(f"Artifact sweep could not list {self.directory}: {e}")
+            return 0
+
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            path = Path(entry.path)
+            if self.is_pinned(path):
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if mtime < cutoff:
+                if self._delete(path):
+                    removed += 1
+                    self.expired += 1
+            elif path not in self._files:
+                # Unknown but recent - adopt it so it counts against the size cap
+                self._files[path] = entry.stat().st_size
+                self._files.move_to_end(path, last=False)
+                self._size += self._files[path]
+
+        before = self.evicted
+        self._evict_over_size()
+        removed += self.evicted - before
+        if removed:
+            logging.info(f"🧹 Artifact sweep removed {removed} files from {self.directory}")
+        return removed
+
+    async def start(self):
+        self.sweep()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logging.error(f"Artifact sweep error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "files": len(self._files),
+            "pinned": len(self._pins),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age_seconds,
+            "evicted": self.evicted,
+            "expired": self.expired,
+            "released": self.released,
+        }
@@ -0,0 +1,119 @@
+"""
+Branding asset cache for PDF rendering.
+
+The syllabus header draws the institute logo on every page. Instead of fetching
+`branding.logoUrl` inside the page callback, the logo is downloaded once per
+content revision (off the event loop), decoded and downsized with Pillow, and
+kept in memory as PNG bytes that renderers turn into a single ImageReader.
+When the fetch fails the bundled logo in assets/ is used instead.
+"""
+import asyncio
+import hashlib
+import logging
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import requests
+from PIL import Image as PILImage
+
+from content_manager import content_revision
+
+ASSETS_DIR = Path(__file__).parent / "assets"
+BUNDLED_LOGO_PATH = ASSETS_DIR / "grras_logo.png"
+
+# Drawn at 30mm x 10mm - 300 dpi is plenty for print
+LOGO_MAX_SIZE = (354, 118)
+LOGO_FETCH_TIMEOUT = 5
+LOGO_MAX_DOWNLOAD_BYTES = 5 * 1024 * 1024
+
+
+def prepare_logo(data: bytes) -> bytes:
+    """Decode any Pillow-readable image, downsize it and re-encode as PNG"""
+    with PILImage.open(BytesIO(data)) as image:
+        image = image.convert("RGBA")
+        image.thumbnail(LOGO_MAX_SIZE, PILImage.LANCZOS)
+        output = BytesIO()
+        image.save(output, format="PNG", optimize=True)
+        return output.getvalue()
+
+
+def logo_digest(logo: Optional[bytes]) -> str:
+    return hashlib.sha256(logo).hexdigest()[:16] if logo else ""
+
+
+class LogoAssetCache:
+    """Current branding logo, refreshed when the content revision or logoUrl changes"""
+
+    def __init__(self, bundled_path: Path = BUNDLED_LOGO_PATH):
+        self.bundled_path = bundled_path
+        self._bundled: Optional[bytes] = None
+        self._url: Optional[str] = None
+        self._revision: Optional[str] = None
+        self._logo: Optional[bytes] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.fetches = 0
+        self.fetch_failures = 0
+
+    def bundled_logo(self) -> Optional[bytes]:
+        if self._bundled is None:
+            try:
+                self._bundled = prepare_logo(self.bundled_path.read_bytes())
+            except Exception as e:
+                logging.error(f"Bundled logo unavailable at {self.bundled_path}: {e}")
+                self._bundled = b""
+        return self._bundled or None
+
+    def _fetch(self, url: str) -> bytes:
+        response = requests.get(url, timeout=LOGO_FETCH_TIMEOUT)
+        response.raise_for_status()
+        if len(response.content) > LOGO_MAX_DOWNLOAD_BYTES:
+            raise ValueError(f"logo is {len(response.content)} bytes")
+        return prepare_logo(response.content)
+
+    async def get(self, branding: Dict[str, Any], content: Dict[str, Any]) -> Optional[bytes]:
+        """PNG bytes of the logo to draw (remote logo, else bundled fallback)"""
+        url = (branding or {}).get("logoUrl") or ""
+        revision = content_revision(content)
+        if url == self._url and revision == self._revision:
+            return self._logo
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another request may have refreshed it while we waited
+            if url == self._url and revision == self._revision:
+                return self._logo
+
+            logo = None
+            if url.startswith("http"):
+                self.fetches += 1
+                try:
+                    logo = await asyncio.to_thread(self._fetch, url)
+                    logging.info(f"✅ Logo cached from {url} ({len(logo)} bytes)")
+                except Exception as e:
+                    self.fetch_failures += 1
+                    if url == self._url and self._logo:
+                        # Same logo as before - keep the copy we already have
+                        logo = self._logo
+                        logging.warning(f"Logo refresh failed, keeping cached logo: {e}")
+                    else:
+                        logging.warning(f"Logo load failed, using bundled logo: {e}")
+
+            self._logo = logo or self.bundled_logo()
+            self._url = url
+            self._revision = revision
+            return self._logo
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "logo_url": self._url,
+            "revision": self._revision,
+            "bytes": len(self._logo) if self._logo else 0,
+            "bundled": bool(self._logo) and self._logo == self._bundled,
+            "fetches": self.fetches,
+            "fetch_failures": self.fetch_failures,
+        }
+
+
+logo_cache = LogoAssetCache()
@@ -0,0 +1,139 @@
+"""
+In-process registry of admin background jobs.
+
+A job is an asyncio task with an id, a status (queued, running, completed,
+failed), a progress counter the task updates as it goes, and a result dict.
+Routes start jobs and return the id immediately; status endpoints read
+Job.to_dict(). Finished jobs are kept for JOB_RETENTION_SECONDS so their
+status and results can still be fetched.
+"""
+import time
+import uuid
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+JOB_RETENTION_SECONDS = 3600
+MAX_FINISHED_JOBS = 50
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class Job:
+    def __init__(self, kind: str, params: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = QUEUED
+        self.done = 0
+        self.total = 0
+        self.message = ""
+        self.result: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._finished_monotonic: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def progress(self, done: Optional[int] = None, total: Optional[int] = None, message: Optional[str] = None):
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "progress": {
+                "done": self.done,
+                "total": self.total,
+                "percent": round(100 * self.done / self.total, 1) if self.total else (100.0 if self.status == COMPLETED else 0.0),
+                "message": self.message,
+            },
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobRegistry:
+    def __init__(self, retention_seconds: float = JOB_RETENTION_SECONDS, max_finished: int = MAX_FINISHED_JOBS):
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Job] = {}
+
+    def start(self, kind: str, runner: Callable[[Job], Awaitable[Dict[str, Any]]], params: Optional[Dict[str, Any]] = None) -> Job:
+        """Run `runner(job)` as a background task; its return value becomes job.result"""
+        self._prune()
+        job = Job(kind, params)
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, runner))
+        logging.info(f"🧵 Started {kind} job {job.id}")
+        return job
+
+    async def _run(self, job: Job, runner: Callable[[Job], Awaitable[Dict[str, Any]]]):
+        job.status = RUNNING
+        job.started_at = datetime.utcnow()
+        try:
+            job.result = await runner(job) or {}
+            job.status = COMPLETED
+            logging.info(f"✅ {job.kind} job {job.id} completed")
+        except asyncio.CancelledError:
+            job.status = FAILED
+            job.error = "cancelled"
+            raise
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            logging.error(f"❌ {job.kind} job {job.id} failed: {e}")
+        finally:
+            job.finished_at = datetime.utcnow()
+            job._finished_monotonic = time.monotonic()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def find_active(self, kind: str, **params) -> Optional[Job]:
+        """A queued/running job of this kind with matching params, to avoid duplicate work"""
+        for job in self._jobs.values():
+            if job.kind == kind and not job.finished and all(job.params.get(k) == v for k, v in params.items()):
+                return job
+        return None
+
+    def list(self, kind: Optional[str] = None):
+        return [job for job in self._jobs.values() if kind is None or job.kind == kind]
+
+    def _prune(self):
+        now = time.monotonic()
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished),
+            key=lambda job: job._finished_monotonic or 0,
+        )
+        overflow = len(finished) - self.max_finished
+        for i, job in enumerate(finished):
+            if i < overflow or now - (job._finished_monotonic or now) > self.retention_seconds:
+                self._jobs.pop(job.id, None)
+
+    async def shutdown(self):
+        for job in self._jobs.values():
+            if job.task and not job.task.done():
+                job.task.cancel()
+
+
+job_registry = JobRegistry()
@@ -0,0 +1,221 @@
+"""
+RSS 2.0, Atom 1.0 and JSON Feed 1.1 generation for the blog.
+
+Feeds are rendered from the per-revision BlogIndex ordering, once per content
+revision and filter, and served from memory with ETag/Last-Modified so polling
+aggregators usually get a 304.
+"""
+import json
+import hashlib
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import quote
+from xml.sax.saxutils import escape as xml_escape
+
+from blog_index import BlogIndex, post_body
+from blog_scheduler import parse_schedule_time
+
+FEED_ITEM_LIMIT = 20
+MAX_CACHED_FEEDS = 256  # filters come from query strings - bound the cache per revision
+
+RSS = "rss"
+ATOM = "atom"
+JSON_FEED = "json"
+
+MEDIA_TYPES = {
+    RSS: "application/rss+xml; charset=utf-8",
+    ATOM: "application/atom+xml; charset=utf-8",
+    JSON_FEED: "application/feed+json; charset=utf-8",
+}
+
+
+class CachedFeed:
+    def __init__(self, body: bytes, last_modified: datetime, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.last_modified = last_modified.replace(microsecond=0)
+        self.last_modified_header = format_datetime(self.last_modified, usegmt=True)
+
+
+def _post_updated(post: Dict[str, Any]) -> datetime:
+    for field in ("updatedAt", "updated_at", "createdAt", "created_at", "publishAt", "date"):
+        parsed = parse_schedule_time(post.get(field))
+        if parsed:
+            return parsed
+    return datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _post_published(post: Dict[str, Any]) -> datetime:
+    for field in ("publishAt", "createdAt", "created_at", "date"):
+        parsed = parse_schedule_time(post.get(field))
+        if parsed:
+            return parsed
+    return _post_updated(post)
+
+
+def _feed_title(site_title: str, category: Optional[str], tag: Optional[str]) -> str:
+    if category:
+        return f"{site_title} - {category}"
+    if tag:
+        return f"{site_title} - #{tag}"
+    return site_title
+
+
+def _query_suffix(category: Optional[str], tag: Optional[str]) -> str:
+    if category:
+        return f"?category={quote(category)}"
+    if tag:
+        return f"?tag={quote(tag)}"
+    return ""
+
+
+def render_rss(channel: Dict[str, Any], items: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> str:
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:content="http://purl.org/rss/1.0/modules/content/" xmlns:dc="http://purl.org/dc/elements/1.1/">',
+        "  <channel>",
+        f"    <title>{xml_escape(channel['title'])}</title>",
+        f"    <link>{xml_escape(channel['home_url'])}</link>",
+        f"    <description>{xml_escape(channel['description'])}</description>",
+        f'    <atom:link href="{xml_escape(channel["feed_url"])}" rel="self" type="application/rss+xml"/>',
+        f"    <lastBuildDate>{format_datetime(channel['updated'], usegmt=True)}</lastBuildDate>",
+        f"    <language>{xml_escape(channel['language'])}</language>",
+    ]
+    for post, summary in items:
+        url = f"{channel['blog_url']}/{post['slug']}"
+        lines += [
+            "    <item>",
+            f"      <title>{xml_escape(post.get('title', ''))}</title>",
+            f"      <link>{xml_escape(url)}</link>",
+            f'      <guid isPermaLink="true">{xml_escape(url)}</guid>',
+            f"      <pubDate>{format_datetime(_post_published(post), usegmt=True)}</pubDate>",
+            f"      <description>{xml_escape(summary['excerpt'])}</description>",
+            f"      <content:encoded>{xml_escape(post_body(post))}</content:encoded>",
+        ]
+        if post.get("author"):
+            lines.append(f"      <dc:creator>{xml_escape(post['author'])}</dc:creator>")
+        for tag in post.get("tags") or []:
+            lines.append(f"      <category>{xml_escape(str(tag))}</category>")
+        lines.append("    </item>")
+    lines += ["  </channel>", "</rss>"]
+    return "\n".join(lines)
+
+
+def render_atom(channel: Dict[str, Any], items: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> str:
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{xml_escape(channel['title'])}</title>",
+        f"  <subtitle>{xml_escape(channel['description'])}</subtitle>",
+        f'  <link href="{xml_escape(channel["feed_url"])}" rel="self"/>',
+        f'  <link href="{xml_escape(channel["home_url"])}"/>',
+        f"  <id>{xml_escape(channel['feed_url'])}</id>",
+        f"  <updated>{channel['updated'].isoformat()}</updated>",
+    ]
+    for post, summary in items:
+        url = f"{channel['blog_url']}/{post['slug']}"
+        lines += [
+            "  <entry>",
+            f"    <title>{xml_escape(post.get('title', ''))}</title>",
+            f'    <link href="{xml_escape(url)}"/>',
+            f"    <id>{xml_escape(url)}</id>",
+            f"    <published>{_post_published(post).isoformat()}</published>",
+            f"    <updated>{_post_updated(post).isoformat()}</updated>",
+            f"    <author><name>{xml_escape(post.get('author') or 'GRRAS Team')}</name></author>",
+            f"    <summary>{xml_escape(summary['excerpt'])}</summary>",
+            f'    <content type="html">{xml_escape(post_body(post))}</content>',
+        ]
+        for tag in post.get("tags") or []:
+            lines.append(f'    <category term="{xml_escape(str(tag))}"/>')
+        lines.append("  </entry>")
+    lines.append("</feed>")
+    return "\n".join(lines)
+
+
+def render_json_feed(channel: Dict[str, Any], items: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> str:
+    feed = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": channel["title"],
+        "home_page_url": channel["home_url"],
+        "feed_url": channel["feed_url"],
+        "description": channel["description"],
+        "language": channel["language"],
+        "items": [
+            {
+                "id": f"{channel['blog_url']}/{post['slug']}",
+                "url": f"{channel['blog_url']}/{post['slug']}",
+                "title": post.get("title", ""),
+                "summary": summary["excerpt"],
+                "content_html": post_body(post),
+                "image": summary.get("coverImage") or summary.get("featured_image") or summary.get("image") or None,
+                "date_published": _post_published(post).isoformat(),
+                "date_modified": _post_updated(post).isoformat(),
+                "authors": [{"name": post.get("author") or "GRRAS Team"}],
+                "tags": list(post.get("tags") or []),
+            }
+            for post, summary in items
+        ],
+    }
+    return json.dumps(feed, ensure_ascii=False)
+
+
+RENDERERS = {RSS: render_rss, ATOM: render_atom, JSON_FEED: render_json_feed}
+FEED_PATHS = {RSS: "rss.xml", ATOM: "atom.xml", JSON_FEED: "feed.json"}
+
+
+class FeedCache:
+    """Rendered feeds of the current content revision, keyed by kind and filter"""
+
+    def __init__(self):
+        self._revision: Optional[str] = None
+        self._feeds: Dict[Tuple[str, str, str], CachedFeed] = {}
+
+    def get(
+        self,
+        blog_index: BlogIndex,
+        content: Dict[str, Any],
+        kind: str,
+        base_url: str,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+    ) -> CachedFeed:
+        if self._revision != blog_index.revision:
+            self._feeds = {}
+            self._revision = blog_index.revision
+
+        key = (kind, (category or "").lower(), (tag or "").lower())
+        feed = self._feeds.get(key)
+        if feed is None:
+            feed = self._render(blog_index, content, kind, base_url, category, tag)
+            if len(self._feeds) < MAX_CACHED_FEEDS:
+                self._feeds[key] = feed
+            logging.info(f"📰 Rendered {kind} feed {key[1:]} for revision {blog_index.revision}")
+        return feed
+
+    def _render(self, blog_index, content, kind, base_url, category, tag) -> CachedFeed:
+        positions = blog_index.filter_positions(category=category, tags=[tag] if tag else None)
+        items = [(blog_index.posts[i], blog_index.summaries[i]) for i in positions[:FEED_ITEM_LIMIT]]
+
+        site = (content.get("settings") or {}).get("site") or {}
+        site_title = site.get("title") or (content.get("institute") or {}).get("name") or "GRRAS Solutions"
+        updated = max(
+            (_post_updated(post) for post, _ in items),
+            default=parse_schedule_time((content.get("meta") or {}).get("lastModified")) or datetime.now(timezone.utc),
+        )
+        channel = {
+            "title": _feed_title(f"{site_title} Blog", category, tag),
+            "description": site.get("description") or "Latest articles from GRRAS Solutions",
+            "language": site.get("language") or "en-IN",
+            "home_url": f"{base_url}/blog",
+            "blog_url": f"{base_url}/blog",
+            "feed_url": f"{base_url}/blog/{FEED_PATHS[kind]}{_query_suffix(category, tag)}",
+            "updated": updated,
+        }
+        body = RENDERERS[kind](channel, items).encode("utf-8")
+        return CachedFeed(body, updated, MEDIA_TYPES[kind])
+
+
+feed_cache = FeedCache()
@@ -0,0 +1,302 @@
+"""
+Blog read model for the public blog API.
+
+Listing endpoints only need a small projection of each post, so the published
+posts are ordered, summarised and indexed once per content revision instead of
+on every request. Full post bodies are only returned by the single-post route.
+
+Category/tag counts are stored with the content under blog.facets and kept up
+to date incrementally by the admin blog routes; posting lists for faceted
+filtering live on the per-revision index. Related posts/courses are computed
+on write by the related content engine and stored under blog.related.
+"""
+import re
+import logging
+from html import unescape
+from typing import Dict, Any, List, Optional
+
+from content_manager import content_revision
+from related_content import related_content_engine
+
+# Fields returned by listing endpoints - everything except the HTML bodies
+SUMMARY_FIELDS = (
+    "id", "slug", "title", "excerpt", "summary", "coverImage", "featured_image", "image",
+    "category", "tags", "author", "featured", "status", "publishAt",
+    "created_at", "createdAt", "updated_at", "updatedAt",
+)
+
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def get_blog_posts(content: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the raw blog post list from a content document"""
+    blog_section = (content or {}).get("blog", {})
+    return blog_section.get("posts", []) if isinstance(blog_section, dict) else []
+
+
+def is_published(post: Dict[str, Any]) -> bool:
+    """Published check used by every public read (field or status based)"""
+    return bool(post.get("published", True) or post.get("status") == "published")
+
+
+def post_body(post: Dict[str, Any]) -> str:
+    """Return the HTML body, preferring 'body' over the legacy 'content' copy"""
+    return post.get("body") or post.get("content") or ""
+
+
+def plain_text(html: str) -> str:
+    """Strip tags and collapse whitespace"""
+    return _SPACE_RE.sub(" ", unescape(_TAG_RE.sub(" ", html or ""))).strip()
+
+
+def compute_reading_time(post: Dict[str, Any]) -> int:
+    """Reading time in minutes at 200 words per minute"""
+    word_count = len(plain_text(post_body(post)).split())
+    return max(1, round(word_count / WORDS_PER_MINUTE))
+
+
+def derive_excerpt(post: Dict[str, Any], length: int = EXCERPT_LENGTH) -> str:
+    """Excerpt taken from the body text"""
+    text = plain_text(post_body(post))
+    return text if len(text) <= length else text[:length].rsplit(" ", 1)[0] + "..."
+
+
+def compute_excerpt(post: Dict[str, Any], length: int = EXCERPT_LENGTH) -> str:
+    """Use the authored excerpt/summary, otherwise derive one from the body text"""
+    return post.get("excerpt") or post.get("summary") or derive_excerpt(post, length)
+
+
+def post_category(post: Dict[str, Any]) -> str:
+    """Category a post is counted under in facets - falls back to the first tag, then 'general'.
+
+    Filtering by category only matches the explicit `category` field (see BlogIndex).
+    """
+    category = post.get("category")
+    if not category and post.get("tags"):
+        category = post["tags"][0]
+    return category or "general"
+
+
+def post_date(post: Dict[str, Any]) -> str:
+    """Creation date used for newest-first ordering"""
+    return str(
+        post.get("created_at") or post.get("createdAt")
+        or post.get("publishAt") or post.get("date") or ""
+    )
+
+
+def precompute_post_fields(post: Dict[str, Any]) -> Dict[str, Any]:
+    """Store derived listing fields on a post at write time.
+
+    The derived excerpt gets its own field: `excerpt` stays what the author wrote,
+    so the derived one follows body edits on every save.
+    """
+    post["derived_excerpt"] = derive_excerpt(post)
+    post["reading_time"] = compute_reading_time(post)
+    return post
+
+
+def summarize_post(post: Dict[str, Any]) -> Dict[str, Any]:
+    """Lightweight listing representation of a post (no HTML bodies)"""
+    summary = {field: post[field] for field in SUMMARY_FIELDS if field in post}
+    summary["excerpt"] = post.get("excerpt") or post.get("summary") or post.get("derived_excerpt") or derive_excerpt(post)
+    summary["reading_time"] = post.get("reading_time") or compute_reading_time(post)
+    return summary
+
+
+def empty_facets() -> Dict[str, Dict[str, int]]:
+    return {"categories": {}, "tags": {}}
+
+
+def _bump(counts: Dict[str, int], key: str, delta: int):
+    counts[key] = counts.get(key, 0) + delta
+    if counts[key] <= 0:
+        counts.pop(key)
+
+
+def apply_post_to_facets(facets: Dict[str, Dict[str, int]], post: Optional[Dict[str, Any]], delta: int):
+    """Add (delta=1) or remove (delta=-1) one post's contribution to the counters"""
+    if not post or not is_published(post):
+        return
+    _bump(facets["categories"], post_category(post), delta)
+    for tag in post.get("tags") or []:
+        _bump(facets["tags"], tag, delta)
+
+
+def build_facets(posts: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """Full recount - used for bulk content saves and documents without counters"""
+    facets = empty_facets()
+    for post in posts:
+        apply_post_to_facets(facets, post, 1)
+    return facets
+
+
+def rebuild_blog_facets(content: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """Recount and store facets on the content document"""
+    blog_section = content.get("blog")
+    if not isinstance(blog_section, dict):
+        return empty_facets()
+    blog_section["facets"] = build_facets(blog_section.get("posts", []))
+    return blog_section["facets"]
+
+
+def update_blog_facets(
+    content: Dict[str, Any],
+    old_post: Optional[Dict[str, Any]] = None,
+    new_post: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Dict[str, int]]:
+    """Incrementally move the stored counters from old_post to new_post.
+
+    Call after the post list has been changed: create passes only new_post,
+    delete only old_post, update/publish-state changes pass both.
+    """
+    blog_section = content["blog"]
+    facets = blog_section.get("facets")
+    if not isinstance(facets, dict) or "categories" not in facets or "tags" not in facets:
+        # Counters never stored for this document - the recount already reflects the change
+        return rebuild_blog_facets(content)
+    apply_post_to_facets(facets, old_post, -1)
+    apply_post_to_facets(facets, new_post, 1)
+    return facets
+
+
+def _post_document(post: Dict[str, Any]) -> str:
+    # Tags and category are repeated so they weigh more than body words
+    labels = " ".join([post_category(post)] + list(post.get("tags") or []))
+    return " ".join((post.get("title", ""), labels, labels, compute_excerpt(post), plain_text(post_body(post))))
+
+
+def _course_document(course: Dict[str, Any]) -> str:
+    parts = [
+        course.get("title") or course.get("name") or "",
+        course.get("category") or "",
+        course.get("oneLiner") or "",
+        course.get("overview") or course.get("description") or "",
+    ]
+    for field in ("tools", "highlights", "outcomes", "learningOutcomes"):
+        values = course.get(field)
+        if isinstance(values, list):
+            parts.extend(str(value) for value in values)
+    return " ".join(parts)
+
+
+def build_related_content(content: Dict[str, Any]) -> Dict[str, Dict[str, List[str]]]:
+    """Top-k related posts and courses for every published post"""
+    posts = [post for post in get_blog_posts(content) if is_published(post) and post.get("slug")]
+    courses = [
+        course for course in (content.get("courses") or [])
+        if course.get("visible", True) and course.get("slug")
+    ]
+    return related_content_engine.build(
+        post_keys=[post["slug"] for post in posts],
+        post_texts=[_post_document(post) for post in posts],
+        post_tags=[{post_category(post).lower()} | {t.lower() for t in post.get("tags") or []} for post in posts],
+        course_keys=[course["slug"] for course in courses],
+        course_texts=[_course_document(course) for course in courses],
+    )
+
+
+def refresh_related_content(content: Dict[str, Any]) -> Dict[str, Dict[str, List[str]]]:
+    """Recompute and store related content on the content document (write time)"""
+    blog_section = content.get("blog")
+    if not isinstance(blog_section, dict):
+        return {"posts": {}, "courses": {}}
+    blog_section["related"] = build_related_content(content)
+    return blog_section["related"]
+
+
+class BlogIndex:
+    """Published posts of one content revision, ordered and summarised"""
+
+    def __init__(self, content: Dict[str, Any]):
+        self.revision = content_revision(content)
+
+        published = [post for post in get_blog_posts(content) if is_published(post) and post.get("slug")]
+        published.sort(key=post_date, reverse=True)
+
+        self.posts: List[Dict[str, Any]] = published
+        self.summaries: List[Dict[str, Any]] = [summarize_post(post) for post in published]
+        self.position: Dict[str, int] = {post["slug"]: i for i, post in enumerate(published)}
+        self._search_text: List[str] = [
+            " ".join((post.get("title", ""), summary["excerpt"], plain_text(post_body(post)))).lower()
+            for post, summary in zip(published, self.summaries)
+        ]
+
+        # Posting lists: lower-cased facet value -> ascending positions (newest first).
+        # Categories use the explicit field only, as ?category= always has; the
+        # first-tag fallback of post_category() is just for the facet counts.
+        self.category_postings: Dict[str, List[int]] = {}
+        self.tag_postings: Dict[str, List[int]] = {}
+        for i, post in enumerate(published):
+            if post.get("category"):
+                self.category_postings.setdefault(str(post["category"]).lower(), []).append(i)
+            for tag in {t.lower() for t in post.get("tags") or []}:
+                self.tag_postings.setdefault(tag, []).append(i)
+
+        blog_section = content.get("blog")
+        stored_facets = blog_section.get("facets") if isinstance(blog_section, dict) else None
+        self.facets = stored_facets if isinstance(stored_facets, dict) else build_facets(published)
+
+        stored_related = blog_section.get("related") if isinstance(blog_section, dict) else None
+        self.related = stored_related if isinstance(stored_related, dict) else build_related_content(content)
+
+    def get_post(self, slug: str) -> Optional[Dict[str, Any]]:
+        """Full published post by slug"""
+        position = self.position.get(slug)
+        return self.posts[position] if position is not None else None
+
+    def get_summary(self, slug: str) -> Optional[Dict[str, Any]]:
+        position = self.position.get(slug)
+        return self.summaries[position] if position is not None else None
+
+    def related_posts(self, slug: str) -> List[Dict[str, Any]]:
+        """Summaries of the precomputed related posts that are still published"""
+        related_slugs = (self.related.get("posts") or {}).get(slug, [])
+        return [self.summaries[self.position[s]] for s in related_slugs if s in self.position]
+
+    def related_course_slugs(self, slug: str) -> List[str]:
+        return list((self.related.get("courses") or {}).get(slug, []))
+
+    def filter_positions(
+        self,
+        category: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        search: Optional[str] = None,
+    ) -> List[int]:
+        """Positions (newest first) of posts matching the listing filters.
+
+        Category and tags (all of them must match) are answered by intersecting
+        posting lists; only the free-text search scans the remaining candidates.
+        """
+        candidates: Optional[set] = None
+        if category:
+            candidates = set(self.category_postings.get(category.lower(), ()))
+        for tag in tags or []:
+            tag_positions = set(self.tag_postings.get(tag.lower(), ()))
+            candidates = tag_positions if candidates is None else candidates & tag_positions
+        positions = sorted(candidates) if candidates is not None else range(len(self.posts))
+        if search:
+            search_lower = search.lower()
+            positions = [i for i in positions if search_lower in self._search_text[i]]
+        return list(positions)
+
+
+class BlogIndexCache:
+    """Keeps the BlogIndex for the most recent content revision"""
+
+    def __init__(self):
+        self._index: Optional[BlogIndex] = None
+
+    def get(self, content: Dict[str, Any]) -> BlogIndex:
+        revision = content_revision(content)
+        if self._index is None or self._index.revision != revision:
+            self._index = BlogIndex(content)
+            logging.info(f"📚 Blog index rebuilt for revision {revision} ({len(self._index.posts)} published posts)")
+        return self._index
+
+
+blog_index_cache = BlogIndexCache()
@@ -0,0 +1,182 @@
+"""
+Scheduled publishing for blog posts.
+
+Posts carrying a future `publishAt` are stored as `status: "scheduled"` and
+`published: False` when written, so public reads never compare dates. The
+PublishScheduler keeps a min-heap of upcoming publish/unpublish times and
+flips each post exactly when it is due, saving the content (which bumps the
+content revision so every derived cache refreshes).
+"""
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from blog_index import get_blog_posts, is_published, update_blog_facets, refresh_related_content
+from content_manager import content_revision
+
+# Upper bound on one sleep so changes saved by other workers are picked up
+MAX_SLEEP_SECONDS = 300
+
+PUBLISH = "publish"
+UNPUBLISH = "unpublish"
+
+
+def parse_schedule_time(value: Any) -> Optional[datetime]:
+    """Parse publishAt/unpublishAt values ('2025-01-20', ISO strings, 'Z' suffix) as UTC"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+        except ValueError:
+            logging.warning(f"Ignoring unparseable schedule time: {value}")
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _post_key(post: Dict[str, Any]) -> str:
+    return post.get("id") or post.get("slug") or ""
+
+
+def apply_publish_schedule(post: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+    """Bring a post's stored state in line with its schedule at write time.
+
+    Returns True if the post was changed.
+    """
+    now = now or datetime.now(timezone.utc)
+    publish_at = parse_schedule_time(post.get("publishAt"))
+    unpublish_at = parse_schedule_time(post.get("unpublishAt"))
+    changed = False
+
+    if is_published(post) and publish_at and publish_at > now:
+        post["published"] = False
+        post["status"] = "scheduled"
+        changed = True
+    elif post.get("status") == "scheduled" and (not publish_at or publish_at <= now):
+        post["published"] = True
+        post["status"] = "published"
+        changed = True
+
+    if is_published(post) and unpublish_at and unpublish_at <= now:
+        post["published"] = False
+        post["status"] = "unpublished"
+        changed = True
+
+    return changed
+
+
+def apply_publish_schedules(content: Dict[str, Any], now: Optional[datetime] = None) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Apply schedules to every post; returns (old, new) pairs for changed posts"""
+    changes = []
+    for post in get_blog_posts(content):
+        previous = dict(post)
+        if apply_publish_schedule(post, now):
+            changes.append((previous, post))
+    return changes
+
+
+class PublishScheduler:
+    """Min-heap of (due time, post key, action) driven by one background task"""
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, str, str]] = []
+        self._revision: Optional[str] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._content_manager = None
+        self._normalized = False
+
+    def rebuild(self, content: Dict[str, Any]):
+        """Rebuild the heap from a content document (no-op for a known revision)"""
+        revision = content_revision(content)
+        if revision == self._revision:
+            return
+        heap = []
+        for post in get_blog_posts(content):
+            if post.get("status") == "scheduled":
+                publish_at = parse_schedule_time(post.get("publishAt"))
+                if publish_at:
+                    heap.append((publish_at, _post_key(post), PUBLISH))
+            if is_published(post) or post.get("status") == "scheduled":
+                unpublish_at = parse_schedule_time(post.get("unpublishAt"))
+                if unpublish_at:
+                    heap.append((unpublish_at, _post_key(post), UNPUBLISH))
+        heapq.heapify(heap)
+        self._heap = heap
+        self._revision = revision
+
+    def notify(self, content: Dict[str, Any]):
+        """Called after content writes so newly scheduled posts are picked up"""
+        self.rebuild(content)
+        self._wakeup.set()
+
+    def next_due(self) -> Optional[datetime]:
+        return self._heap[0][0] if self._heap else None
+
+    async def start(self, content_manager):
+        self._content_manager = content_manager
+        self._task = asyncio.create_task(self._run())
+        logging.info("🗓️ Blog publish scheduler started")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            # Cleared before processing so a notify() during the pass is not lost
+            self._wakeup.clear()
+            try:
+                await self.process_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Blog publish scheduler error: {e}")
+
+            delay = MAX_SLEEP_SECONDS
+            next_due = self.next_due()
+            if next_due:
+                delay = min(delay, max(0.0, (next_due - datetime.now(timezone.utc)).total_seconds()))
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def process_due(self):
+        """Flip every post whose publish/unpublish time has passed and save once"""
+        content = await self._content_manager.get_content()
+        self.rebuild(content)
+
+        now = datetime.now(timezone.utc)
+        # The first pass also normalizes posts saved before scheduling existed
+        if self._normalized and (not self._heap or self._heap[0][0] > now):
+            return
+        self._normalized = True
+
+        while self._heap and self._heap[0][0] <= now:
+            heapq.heappop(self._heap)
+
+        changes = apply_publish_schedules(content, now)
+        if not changes:
+            return
+
+        for old_post, new_post in changes:
+            update_blog_facets(content, old_post=old_post, new_post=new_post)
+            logging.info(f"🗓️ Scheduled {new_post.get('status')}: {new_post.get('slug')}")
+        refresh_related_content(content)
+
+        updated_content = await self._content_manager.save_content(content, user="publish-scheduler", is_draft=False)
+        self.rebuild(updated_content)
+
+
+publish_scheduler = PublishScheduler()
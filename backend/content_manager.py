@@ -9,6 +9,13 @@ import logging
 import uuid
 import shutil
 
+
+def content_revision(content: Optional[Dict[str, Any]]) -> str:
+    """Return a cache key that changes on every save of the content document"""
+    meta = (content or {}).get("meta") or {}
+    return f"{meta.get('revision', 0)}:{meta.get('lastModified', '')}"
+
+
 class ContentManager:
     def __init__(self, storage_type: str = "mongo", mongo_client=None, db_name: str = "grras_database"):
         # ENFORCE MONGODB STORAGE - Single source of truth for GitHub deployments
@@ -279,7 +286,8 @@ class ContentManager:
     async def save_content(self, content: Dict[str, Any], user: str = "admin", is_draft: bool = False) -> Dict[str, Any]:
         """Save content to MongoDB ONLY - Single Source of Truth"""
         try:
-            # Update metadata
+            # Update metadata - revision is bumped on every save so derived caches refresh
+            content["meta"]["revision"] = int(content["meta"].get("revision", 0) or 0) + 1
             content["meta"]["lastModified"] = datetime.now(timezone.utc).isoformat()
             content["meta"]["modifiedBy"] = user
             content["meta"]["isDraft"] = is_draft
@@ -0,0 +1,181 @@
+"""
+Declarative MongoDB index registry.
+
+INDEXES lists, per collection, every index the API relies on. At startup the
+registry compares it with index_information() and creates only what is
+missing, so it is safe to apply on every boot and from several replicas. An
+index whose name is taken by a different key pattern is reported as a conflict
+and left alone - indexes are never dropped automatically. The build runs as a
+background task so a large collection or a slow Atlas connection does not
+hold up startup. report() combines the build results with $indexStats usage
+counters for the admin endpoint.
+"""
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+# Leads are listed newest first with (timestamp, _id) as the keyset, optionally
+# narrowed by course, type or source - each compound index also serves an
+# equality-only filter on its first field.
+INDEXES: Dict[str, List[Dict[str, Any]]] = {
+    "leads": [
+        {"name": "timestamp_id", "keys": [("timestamp", -1), ("_id", -1)]},
+        {"name": "email", "keys": [("email", 1)]},
+        {"name": "type_timestamp", "keys": [("type", 1), ("timestamp", -1), ("_id", -1)]},
+        {"name": "course_timestamp", "keys": [("course", 1), ("timestamp", -1), ("_id", -1)]},
+        {"name": "source_timestamp", "keys": [("source", 1), ("timestamp", -1), ("_id", -1)]},
+        # Merged leads: every course the person asked about (multikey)
+        {"name": "courses_timestamp", "keys": [("courses", 1), ("timestamp", -1), ("_id", -1)]},
+    ],
+    # One owner per normalised email/phone; lead_id lets deletes drop a lead's keys
+    "lead_identities": [
+        {"name": "key_unique", "keys": [("key", 1)], "unique": True},
+        {"name": "lead_id", "keys": [("lead_id", 1)]},
+    ],
+    # Purged leads, newest archive first and per purge job
+    "leads_archive": [
+        {"name": "archived_at", "keys": [("archived_at", -1)]},
+        {"name": "purge_job", "keys": [("purge_job", 1)]},
+    ],
+    # Stats read a day range, optionally narrowed to one course
+    "lead_rollups_daily": [
+        {"name": "day", "keys": [("day", 1)]},
+        {"name": "course_day", "keys": [("course", 1), ("day", 1)]},
+    ],
+}
+
+CREATED = "created"
+EXISTS = "exists"
+CONFLICT = "conflict"
+FAILED = "failed"
+
+
+def _key_pattern(keys) -> List[tuple]:
+    return [(field, direction) for field, direction in keys]
+
+
+class IndexRegistry:
+    def __init__(self, indexes: Dict[str, List[Dict[str, Any]]]):
+        self.indexes = indexes
+        self.results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def ensure(self, db) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Create every registered index that does not exist yet"""
+        started = time.monotonic()
+        created = 0
+        for collection_name, specs in self.indexes.items():
+            collection = db[collection_name]
+            results = self.results.setdefault(collection_name, {})
+            try:
+                existing = await collection.index_information()
+            except Exception as e:
+                logging.error(f"❌ Could not read indexes of {collection_name}: {e}")
+                for spec in specs:
+                    results[spec["name"]] = {"status": FAILED, "error": str(e)}
+                continue
+            existing_patterns = {name: _key_pattern(info["key"]) for name, info in existing.items()}
+
+            for spec in specs:
+                name, keys = spec["name"], _key_pattern(spec["keys"])
+                if existing_patterns.get(name) == keys:
+                    results[name] = {"status": EXISTS}
+                    continue
+                if name in existing_patterns:
+                    logging.warning(
+                        f"⚠️ Index {collection_name}.{name} exists with keys {existing_patterns[name]}, "
+                        f"expected {keys} - leaving it in place"
+                    )
+                    results[name] = {"status": CONFLICT, "existing_keys": existing_patterns[name]}
+                    continue
+                same_keys = next((n for n, p in existing_patterns.items() if p == keys), None)
+                if same_keys:
+                    # Same index under another name (e.g. created by hand) - it serves the same queries
+                    results[name] = {"status": EXISTS, "existing_name": same_keys}
+                    continue
+
+                build_started = time.monotonic()
+                try:
+                    options = {k: v for k, v in spec.items() if k not in ("name", "keys")}
+                    await collection.create_index(keys, name=name, background=True, **options)
+                except Exception as e:
+                    logging.error(f"❌ Failed to create index {collection_name}.{name}: {e}")
+                    results[name] = {"status": FAILED, "error": str(e)}
+                    continue
+                seconds = round(time.monotonic() - build_started, 3)
+                results[name] = {"status": CREATED, "build_seconds": seconds}
+                created += 1
+                logging.info(f"🗂️ Created index {collection_name}.{name} in {seconds}s")
+
+        self.last_run = {
+            "finished_at": datetime.utcnow().isoformat(),
+            "seconds": round(time.monotonic() - started, 3),
+            "created": created,
+        }
+        logging.info(f"✅ Index registry applied ({created} created)")
+        return self.results
+
+    async def start(self, db):
+        self._task = asyncio.create_task(self._run(db))
+
+    async def _run(self, db):
+        try:
+            await self.ensure(db)
+        except Exception as e:
+            logging.error(f"Index registry error: {e}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def usage(self, db, collection_name: str) -> Dict[str, Any]:
+        """$indexStats access counters, keyed by index name"""
+        stats = await db[collection_name].aggregate([{"$indexStats": {}}]).to_list(length=None)
+        return {
+            s["name"]: {
+                "ops": s.get("accesses", {}).get("ops", 0),
+                "since": s["accesses"]["since"].isoformat() if s.get("accesses", {}).get("since") else None,
+            }
+            for s in stats
+        }
+
+    async def report(self, db) -> Dict[str, Any]:
+        collections = {}
+        for collection_name, specs in self.indexes.items():
+            try:
+                usage = await self.usage(db, collection_name)
+                usage_error = None
+            except Exception as e:
+                usage, usage_error = {}, str(e)
+            results = self.results.get(collection_name, {})
+            registered = {spec["name"] for spec in specs}
+            collections[collection_name] = {
+                "indexes": [
+                    {
+                        "name": spec["name"],
+                        "keys": [list(k) for k in spec["keys"]],
+                        **results.get(spec["name"], {"status": "pending"}),
+                        "usage": usage.get(results.get(spec["name"], {}).get("existing_name", spec["name"])),
+                    }
+                    for spec in specs
+                ],
+                # Indexes present in the database but not declared here (besides _id)
+                "unregistered": sorted(n for n in usage if n not in registered and n != "_id_"),
+                "usage_error": usage_error,
+            }
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "last_run": self.last_run,
+            "collections": collections,
+        }
+
+
+index_registry = IndexRegistry(INDEXES)
@@ -0,0 +1,276 @@
+"""
+Write-behind buffer for lead submissions.
+
+Off by default (LEAD_BUFFER_ENABLED). When on, LeadStore.insert() hands each
+submission to the buffer: it is appended to a local spill file and fsynced,
+kept in memory, and the request returns. Appends are group committed - the
+write happens under the buffer lock, the fsync outside it, and one fsync
+covers every append written before it started - so concurrent submissions
+share a disk flush instead of queueing for one each. A background task
+flushes the queue through LeadStore.write_batch() every LEAD_BUFFER_FLUSH_MS,
+or as soon as LEAD_BUFFER_MAX_ITEMS are waiting, so a burst of submissions
+costs a couple of round trips per batch instead of several per request.
+
+Spill files are NDJSON segments (bson.json_util, so ObjectIds and dates
+round-trip) under LEAD_BUFFER_SPILL_DIR. Each flush rotates to a new segment
+and deletes the old one once it is stored in Mongo. Segments left behind by a
+crash or a failed flush are replayed on the next start; write_batch() skips
+entries that already reached the database, so a replay never duplicates a
+lead. While Mongo is unreachable the flush retries with backoff and
+submissions keep being accepted. Each open segment holds an exclusive flock,
+so a second process sharing the directory never replays a live segment.
+
+Acknowledged leads reach the admin list and stats after the next flush;
+submission responses carry the lead id assigned at enqueue time.
+"""
+import os
+import time
+import fcntl
+import asyncio
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from bson import ObjectId, json_util
+
+LEAD_BUFFER_ENABLED = os.environ.get("LEAD_BUFFER_ENABLED", "false").lower() in ("1", "true", "yes")
+LEAD_BUFFER_FLUSH_MS = int(os.environ.get("LEAD_BUFFER_FLUSH_MS", "200"))
+LEAD_BUFFER_MAX_ITEMS = int(os.environ.get("LEAD_BUFFER_MAX_ITEMS", "100"))
+LEAD_BUFFER_SPILL_DIR = Path(os.environ.get(
+    "LEAD_BUFFER_SPILL_DIR", str(Path(__file__).parent / "storage" / "lead_buffer")
+))
+
+MAX_RETRY_SECONDS = 30
+
+
+class Segment:
+    """One locked, append-only spill file"""
+
+    def __init__(self, path: Path, file):
+        self.path = path
+        self.file = file
+
+    @classmethod
+    def create(cls, directory: Path) -> "Segment":
+        path = directory / f"{time.time_ns():020d}.ndjson"
+        file = open(path, "ab")
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return cls(path, file)
+
+    @classmethod
+    def claim(cls, path: Path) -> Optional["Segment"]:
+        """Lock a leftover segment for replay; None if a live process still owns it"""
+        file = open(path, "ab")
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            return None
+        return cls(path, file)
+
+    def write(self, data: bytes):
+        """Append without fsync - the data is durable after the next sync()"""
+        self.file.write(data)
+        self.file.flush()
+
+    def sync(self):
+        os.fsync(self.file.fileno())
+
+    def read_entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entries.append(json_util.loads(line))
+                except ValueError:
+                    # Only the write in flight at a crash can be torn - it was never acknowledged
+                    logging.warning(f"⚠️ Skipping unreadable line in lead spill file {self.path.name}")
+        return entries
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+    def discard(self):
+        self.path.unlink(missing_ok=True)
+        self.file.close()
+
+
+class LeadBuffer:
+    def __init__(
+        self,
+        spill_dir: Path = LEAD_BUFFER_SPILL_DIR,
+        flush_ms: int = LEAD_BUFFER_FLUSH_MS,
+        max_items: int = LEAD_BUFFER_MAX_ITEMS,
+    ):
+        self.spill_dir = Path(spill_dir)
+        self.flush_seconds = flush_ms / 1000
+        self.max_items = max_items
+        self.store = None
+        self._segment: Optional[Segment] = None
+        self._pending: List[Dict[str, Any]] = []
+        # Rotated segments waiting to be written, oldest first
+        self._unflushed: List[Tuple[Segment, List[Dict[str, Any]]]] = []
+        self._lock: Optional[asyncio.Lock] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        # Group commit: appends written / appends covered by a finished fsync
+        self._sync_lock: Optional[asyncio.Lock] = None
+        self._written = 0
+        self._synced = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.flushed = 0
+        self.syncs = 0
+        self.failures = 0
+        self.last_flush: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def _recover_sync(self) -> List[Tuple[Segment, List[Dict[str, Any]]]]:
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        recovered = []
+        for path in sorted(self.spill_dir.glob("*.ndjson")):
+            segment = Segment.claim(path)
+            if segment is None:
+                continue
+            entries = segment.read_entries()
+            if entries:
+                recovered.append((segment, entries))
+            else:
+                segment.discard()
+        self._segment = Segment.create(self.spill_dir)
+        return recovered
+
+    async def start(self, store):
+        """Attach to `store`, queue leftover spill files for replay and start flushing"""
+        self.store = store
+        self._lock, self._flush_lock, self._wake = asyncio.Lock(), asyncio.Lock(), asyncio.Event()
+        self._sync_lock = asyncio.Lock()
+        self._unflushed = await asyncio.to_thread(self._recover_sync)
+        waiting = sum(len(entries) for _, entries in self._unflushed)
+        if waiting:
+            logging.info(f"📥 Replaying {waiting} buffered leads from {len(self._unflushed)} spill files")
+        store.buffer = self
+        self._task = asyncio.create_task(self._run())
+        logging.info(f"✅ Lead write buffer started (flush every {int(self.flush_seconds * 1000)}ms or {self.max_items} leads)")
+
+    async def stop(self):
+        """Stop accepting leads and write out everything queued"""
+        if self.store is None:
+            return
+        self.store.buffer = None
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logging.error(f"❌ Final lead buffer flush failed, leads stay in {self.spill_dir} for the next start: {e}")
+        for segment, _ in self._unflushed:
+            segment.close()
+        self._unflushed = []
+        if self._segment is not None:
+            if self._pending:
+                self._segment.close()
+            else:
+                self._segment.discard()
+            self._segment = None
+        self.store = None
+
+    async def enqueue(self, lead: Dict[str, Any]) -> Dict[str, Any]:
+        """Durably queue one normalised lead; returns once it is fsynced to the spill file"""
+        entry = {"id": ObjectId(), "lead": lead}
+        data = (json_util.dumps(entry) + "\n").encode("utf-8")
+        async with self._lock:
+            await asyncio.to_thread(self._segment.write, data)
+            self._pending.append(entry)
+            self._written += 1
+            ticket = self._written
+            self.enqueued += 1
+            if len(self._pending) >= self.max_items:
+                self._wake.set()
+        await self._sync(ticket)
+        return {"lead_id": entry["id"], "merged": False, "queued": True}
+
+    async def _sync(self, ticket: int):
+        """Wait until append number `ticket` is on disk, fsyncing for everyone queued so far"""
+        async with self._sync_lock:
+            if self._synced >= ticket:
+                # Covered by the fsync another submission just ran
+                return
+            segment, target = self._segment, self._written
+            try:
+                await asyncio.to_thread(segment.sync)
+            except (ValueError, OSError):
+                if segment is self._segment:
+                    raise
+                # Rotated away meanwhile - _rotate() fsynced it before letting go
+            self.syncs += 1
+            self._synced = max(self._synced, target)
+
+    async def _rotate(self):
+        async with self._lock:
+            if not self._pending:
+                return
+            segment, entries = self._segment, self._pending
+            # Appends still waiting on a group fsync may live in this segment
+            await asyncio.to_thread(segment.sync)
+            self._segment = await asyncio.to_thread(Segment.create, self.spill_dir)
+            self._pending = []
+        self._unflushed.append((segment, entries))
+
+    async def flush(self) -> int:
+        """Write every queued lead; raises if the database write fails (the leads stay queued)"""
+        async with self._flush_lock:
+            await self._rotate()
+            written = 0
+            while self._unflushed:
+                segment, entries = self._unflushed[0]
+                for start in range(0, len(entries), self.max_items):
+                    await self.store.write_batch(entries[start:start + self.max_items])
+                await asyncio.to_thread(segment.discard)
+                self._unflushed.pop(0)
+                written += len(entries)
+            if written:
+                self.flushed += written
+                self.last_flush = datetime.utcnow()
+            return written
+
+    async def _run(self):
+        retry_seconds = 0.0
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+                retry_seconds = 0.0
+                self.last_error = None
+            except Exception as e:
+                # Submissions keep being accepted into the spill file meanwhile
+                self.failures += 1
+                self.last_error = str(e)
+                retry_seconds = min(max(retry_seconds * 2, 1.0), MAX_RETRY_SECONDS)
+                logging.error(f"❌ Lead buffer flush failed, retrying in {retry_seconds:.0f}s: {e}")
+                await asyncio.sleep(retry_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._pending) + sum(len(entries) for _, entries in self._unflushed),
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "syncs": self.syncs,
+            "failures": self.failures,
+            "last_flush": self.last_flush.isoformat() if self.last_flush else None,
+            "last_error": self.last_error,
+        }
+
+
+lead_buffer = LeadBuffer()
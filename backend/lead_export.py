@@ -0,0 +1,75 @@
+"""
+Streaming lead export (CSV or NDJSON).
+
+Rows are read from a Motor cursor in batches and written to the response as
+they arrive, so memory stays flat however many leads match. Output is flushed
+in chunks of roughly CHUNK_BYTES rather than per row to keep the number of
+ASGI sends down.
+"""
+import io
+import csv
+import json
+from datetime import datetime
+from typing import Dict, Any, AsyncIterator
+
+from lead_queries import LEAD_SORT
+from lead_store import format_timestamp
+
+CSV = "csv"
+NDJSON = "ndjson"
+EXPORT_MEDIA_TYPES = {
+    CSV: "text/csv",
+    NDJSON: "application/x-ndjson",
+}
+
+EXPORT_FIELDS = ["name", "email", "phone", "course", "type", "source", "message", "interactions", "timestamp"]
+EXPORT_PROJECTION = {field: 1 for field in EXPORT_FIELDS}
+CSV_HEADERS = ["Name", "Email", "Phone", "Course", "Type", "Source", "Message", "Interactions", "Last Activity"]
+
+CURSOR_BATCH_SIZE = 1000
+CHUNK_BYTES = 64 * 1024
+
+
+def export_filename(fmt: str) -> str:
+    return f"grras-leads-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+
+
+def _spreadsheet_safe(value: str) -> str:
+    # Stop Excel/Sheets from evaluating submitted text as a formula; "+91..." phones stay as they are
+    if value and (value[0] in "=@\t\r" or (value[0] in "+-" and not value[1:2].isdigit())):
+        return "'" + value
+    return value
+
+
+def export_row(lead: Dict[str, Any]) -> Dict[str, Any]:
+    row = {"id": str(lead["_id"])}
+    row.update((field, lead.get(field)) for field in EXPORT_FIELDS)
+    row["interactions"] = lead.get("interactions", 1)
+    row["timestamp"] = format_timestamp(lead.get("timestamp"))
+    return row
+
+
+async def stream_leads(collection, query: Dict[str, Any], fmt: str) -> AsyncIterator[str]:
+    cursor = collection.find(query, EXPORT_PROJECTION).sort(LEAD_SORT).batch_size(CURSOR_BATCH_SIZE)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == CSV:
+        # BOM so Excel opens the file as UTF-8
+        buffer.write("\ufeff")
+        writer.writerow(CSV_HEADERS)
+    try:
+        async for lead in cursor:
+            row = export_row(lead)
+            if fmt == CSV:
+                writer.writerow([_spreadsheet_safe(str(row[f] if row[f] is not None else "")) for f in EXPORT_FIELDS])
+            else:
+                buffer.write(json.dumps(row, ensure_ascii=False, default=str))
+                buffer.write("\n")
+            if buffer.tell() >= CHUNK_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    finally:
+        # Client went away mid-download - release the server-side cursor now
+        await cursor.close()
@@ -0,0 +1,255 @@
+"""
+Live lead feed for the admin dashboard (GET /api/admin/leads/stream, SSE).
+
+The feed follows a MongoDB change stream on `leads`, so it sees submissions
+handled by every backend process. New leads arrive as inserts; a repeat
+submission merged into an existing lead is an update that raises
+`interactions` past 1 (migrations that only set it to 1 are left out). Change
+streams need a replica set - Atlas always has one. On a standalone server, or
+while the stream is reconnecting, the feed falls back to in-process pub/sub:
+LeadStore notifies it after every write and it loads the leads itself, which
+only covers this process.
+
+Each SSE client gets a bounded queue. Streams close after
+LEAD_FEED_MAX_STREAM_SECONDS - uvicorn waits for open responses before it
+runs lifespan shutdown - and EventSource reconnects on its own. Every event
+carries an id, and the most recent events are kept, so a reconnect sending
+Last-Event-ID gets exactly what it missed. A client that falls too far behind,
+or whose id this process does not know (restart, another replica), gets a
+`resync` event instead and should reload its first page.
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Any, List, Optional, Set, Tuple, AsyncIterator, Callable, Awaitable
+
+from bson import ObjectId
+from pymongo.errors import ConnectionFailure, OperationFailure
+
+from lead_queries import LEAD_LIST_PROJECTION, serialize_lead
+
+CHANGE_STREAM = "change_stream"
+LOCAL = "local"
+
+MAX_CLIENTS = int(os.environ.get("LEAD_FEED_MAX_CLIENTS", "20"))
+CLIENT_QUEUE_SIZE = 256
+HEARTBEAT_SECONDS = 15
+MAX_STREAM_SECONDS = float(os.environ.get("LEAD_FEED_MAX_STREAM_SECONDS", "60"))
+# Events kept for Last-Event-ID replay, and how long they keep being collected with no client connected
+RECENT_EVENTS = 256
+REPLAY_GRACE_SECONDS = 60
+RECONNECT_SECONDS = 5
+MAX_RECONNECT_SECONDS = 60
+
+CHANGE_PIPELINE = [
+    {"$match": {"$or": [
+        {"operationType": "insert"},
+        {"operationType": "update", "updateDescription.updatedFields.interactions": {"$gt": 1}},
+    ]}},
+    # fullDocument._id is not kept by default inside a sub-document projection - serialize_lead needs it
+    {"$project": {"operationType": 1, "fullDocument._id": 1, **{f"fullDocument.{field}": 1 for field in LEAD_LIST_PROJECTION}}},
+]
+
+RESYNC = {"event": "resync", "data": {}}
+
+
+class FeedFull(Exception):
+    """Too many live clients connected"""
+
+
+def format_event(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class LeadFeed:
+    def __init__(self, max_clients: int = MAX_CLIENTS):
+        self.max_clients = max_clients
+        self.mode = LOCAL
+        self.db = None
+        self.store = None
+        self._clients: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token = None
+        # Event ids are "<epoch>-<seq>"; the epoch tells ids from an earlier process apart
+        self._epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._recent: deque = deque(maxlen=RECENT_EVENTS)
+        self._idle_since = 0.0
+        self.published = 0
+
+    async def start(self, db, store):
+        self.db = db
+        self.store = store
+        store.feed = self
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self.store is not None:
+            self.store.feed = None
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Ends every open stream so shutdown does not wait on idle dashboards
+        for queue in list(self._clients):
+            self._offer(queue, None)
+
+    # --- sources ------------------------------------------------------------------
+
+    async def _watch(self):
+        delay = RECONNECT_SECONDS
+        opened = False
+        while True:
+            try:
+                async with self.db.leads.watch(
+                    CHANGE_PIPELINE, full_document="updateLookup", resume_after=self._resume_token
+                ) as stream:
+                    if self.mode != CHANGE_STREAM:
+                        logging.info("📡 Lead feed following the leads change stream")
+                    self.mode = CHANGE_STREAM
+                    opened = True
+                    delay = RECONNECT_SECONDS
+                    async for change in stream:
+                        self._resume_token = stream.resume_token
+                        lead = change.get("fullDocument")
+                        if lead is not None:
+                            self._publish(lead, created=change["operationType"] == "insert")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.mode = LOCAL
+                if isinstance(e, OperationFailure) and self._resume_token is not None:
+                    # Most likely the resume point has left the oplog - start again from now
+                    logging.warning(f"⚠️ Lead feed could not resume its change stream: {e}")
+                    self._resume_token = None
+                    continue
+                if not opened and not isinstance(e, ConnectionFailure):
+                    # Standalone server or a driver without change streams - not worth retrying
+                    logging.info(f"📡 Lead feed using in-process updates (change streams unavailable: {e})")
+                    return
+                logging.warning(f"⚠️ Lead feed change stream lost, retrying in {delay}s: {e}")
+            self.mode = LOCAL
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_SECONDS)
+
+    async def notify(self, changes: List[Tuple[ObjectId, bool]]):
+        """Called by LeadStore after a write with (lead_id, created) pairs"""
+        if self.mode == CHANGE_STREAM or not self._listening() or not changes:
+            return
+        created = dict(changes)
+        leads = await self.db.leads.find(
+            {"_id": {"$in": list(created)}}, LEAD_LIST_PROJECTION
+        ).to_list(length=len(created))
+        for lead in leads:
+            self._publish(lead, created=created[lead["_id"]])
+
+    def _listening(self) -> bool:
+        """True while a client is connected or may be about to reconnect"""
+        return bool(self._clients) or time.monotonic() - self._idle_since < REPLAY_GRACE_SECONDS
+
+    def _publish(self, lead: Dict[str, Any], created: bool):
+        if not self._listening():
+            return
+        try:
+            data = {"op": "created" if created else "updated", "lead": serialize_lead(lead)}
+        except Exception as e:
+            # One malformed document must not tear down the change stream
+            logging.warning(f"⚠️ Lead feed skipped a lead it could not serialize: {e!r}")
+            return
+        self._seq += 1
+        event = {"seq": self._seq, "event": "lead", "data": data}
+        self._recent.append(event)
+        for queue in list(self._clients):
+            self._offer(queue, event)
+        self.published += 1
+
+    def since(self, last_event_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Events after `last_event_id`, or None if they cannot all be replayed"""
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self._epoch or not seq.isdigit() or int(seq) > self._seq:
+            return None
+        last = int(seq)
+        if last < self._seq and (not self._recent or self._recent[0]["seq"] > last + 1):
+            return None
+        return [event for event in self._recent if event["seq"] > last]
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: Optional[Dict[str, Any]]):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Replace the backlog with a single resync - the client reloads instead
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC if event is not None else None)
+
+    # --- clients -----------------------------------------------------------------
+
+    def subscribe(self) -> asyncio.Queue:
+        if len(self._clients) >= self.max_clients:
+            raise FeedFull(f"At most {self.max_clients} live lead feeds can be open")
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._clients.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._clients.discard(queue)
+        if not self._clients:
+            self._idle_since = time.monotonic()
+
+    def _format(self, event: Dict[str, Any]) -> str:
+        event_id = f"{self._epoch}-{event['seq']}" if "seq" in event else None
+        return format_event(event["event"], event["data"], event_id)
+
+    async def events(
+        self,
+        queue: asyncio.Queue,
+        is_disconnected: Callable[[], Awaitable[bool]],
+        last_event_id: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """SSE body for one subscribed client"""
+        deadline = time.monotonic() + MAX_STREAM_SECONDS
+        sent = 0
+        try:
+            yield "retry: 5000\n\n"
+            yield format_event("ready", {"mode": self.mode})
+            if last_event_id:
+                missed = self.since(last_event_id)
+                if missed is None:
+                    yield self._format(RESYNC)
+                for event in missed or []:
+                    yield self._format(event)
+                    sent = event["seq"]
+            while not await is_disconnected():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=min(HEARTBEAT_SECONDS, remaining))
+                except asyncio.TimeoutError:
+                    # Comment line: keeps proxies from closing an idle connection
+                    yield ": ping\n\n"
+                    continue
+                if event is None:
+                    break
+                if event.get("seq", sent + 1) <= sent:
+                    # Already sent while replaying
+                    continue
+                yield self._format(event)
+                sent = event.get("seq", sent)
+        finally:
+            self.unsubscribe(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "clients": len(self._clients), "published": self.published}
+
+
+lead_feed = LeadFeed()
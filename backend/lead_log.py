@@ -0,0 +1,270 @@
+"""
+Append-only NDJSON lead log for railway_server's JSON storage mode.
+
+Each lead is one JSON line appended to `leads.ndjson`, so saving a lead costs
+one small write no matter how many leads exist. A single asyncio lock makes
+this process the only writer. An in-memory index of line offsets is built once
+when the log is opened and grows with every append; reading the newest leads
+seeks straight to them and reads backwards in blocks instead of parsing the
+whole file.
+
+LEAD_LOG_FSYNC controls durability:
+  always   - fsync after every lead (the request returns once it is on disk)
+  interval - fsync at most every LEAD_LOG_FSYNC_INTERVAL seconds (default)
+  never    - leave it to the OS
+
+A write torn by a crash is cut off when the log is next opened. Compaction
+rewrites the log without unreadable lines or repeated lead ids, through a temp
+file and os.replace(), and only runs when there is something to drop: the
+index counts unreadable lines and repeats found when the log was opened, and
+every append whose id is already in the log.
+On first open an existing legacy `leads.json` array is imported; the old file
+is left untouched.
+"""
+import os
+import json
+import asyncio
+import logging
+from array import array
+from pathlib import Path
+from typing import Dict, Any, List, Optional, AsyncIterator
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+LEAD_LOG_FSYNC = os.environ.get("LEAD_LOG_FSYNC", "interval")
+LEAD_LOG_FSYNC_INTERVAL = float(os.environ.get("LEAD_LOG_FSYNC_INTERVAL", "1.0"))
+LEAD_LOG_COMPACT_INTERVAL = float(os.environ.get("LEAD_LOG_COMPACT_INTERVAL_SECONDS", "3600"))
+
+READ_BLOCK_BYTES = 64 * 1024
+
+
+def _encode(lead: Dict[str, Any]) -> bytes:
+    return (json.dumps(lead, default=str, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _decode(line: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        lead = json.loads(line)
+    except ValueError:
+        return None
+    return lead if isinstance(lead, dict) else None
+
+
+class LeadLog:
+    def __init__(
+        self,
+        path: Path,
+        legacy_file: Optional[Path] = None,
+        fsync: str = LEAD_LOG_FSYNC,
+        fsync_interval: float = LEAD_LOG_FSYNC_INTERVAL,
+        compact_interval: float = LEAD_LOG_COMPACT_INTERVAL,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"LEAD_LOG_FSYNC must be one of {', '.join(FSYNC_POLICIES)}")
+        self.path = Path(path)
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.compact_interval = compact_interval
+        self._lock = asyncio.Lock()
+        self._file = None
+        # Start offset of every complete line; the list object is replaced, never shrunk, by compaction
+        self._offsets = array("q")
+        self._size = 0
+        self._garbage = 0
+        # Lead ids already in the log, so appends that repeat one count as garbage
+        self._ids: set = set()
+        self._dirty = False
+        self._tasks: List[asyncio.Task] = []
+
+    # --- opening and indexing -------------------------------------------------
+
+    def _scan(self):
+        """Index every line, cutting off a torn final write"""
+        offsets, garbage, seen = array("q"), 0, set()
+        position = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    logging.warning(f"⚠️ Lead log {self.path.name}: dropping torn final line ({len(line)} bytes)")
+                    break
+                offsets.append(position)
+                position += len(line)
+                lead = _decode(line)
+                if lead is None or lead.get("id") in seen:
+                    garbage += 1
+                elif lead.get("id"):
+                    seen.add(lead["id"])
+        if position != self.path.stat().st_size:
+            os.truncate(self.path, position)
+        return offsets, position, garbage, seen
+
+    def _import_legacy(self):
+        with open(self.legacy_file, "r") as f:
+            leads = json.load(f)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "wb") as out:
+            for lead in leads:
+                out.write(_encode(lead))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, self.path)
+        logging.info(f"📥 Imported {len(leads)} leads from {self.legacy_file.name} into {self.path.name}")
+
+    def _open_sync(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists() and self.legacy_file and self.legacy_file.exists():
+            self._import_legacy()
+        self.path.touch(exist_ok=True)
+        self._offsets, self._size, self._garbage, self._ids = self._scan()
+        self._file = open(self.path, "ab")
+
+    async def _ensure_open(self):
+        if self._file is None:
+            await asyncio.to_thread(self._open_sync)
+            logging.info(f"✅ Lead log opened: {len(self._offsets)} leads, fsync={self.fsync}")
+
+    async def start(self):
+        async with self._lock:
+            await self._ensure_open()
+        if self.fsync == "interval":
+            self._tasks.append(asyncio.create_task(self._fsync_loop()))
+        if self.compact_interval > 0:
+            self._tasks.append(asyncio.create_task(self._compact_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        async with self._lock:
+            if self._file is not None:
+                await asyncio.to_thread(self._close_sync)
+
+    def _close_sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        self._dirty = False
+
+    # --- writing ----------------------------------------------------------------
+
+    def _append_sync(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync == "always":
+            os.fsync(self._file.fileno())
+        else:
+            self._dirty = True
+
+    async def append(self, lead: Dict[str, Any]) -> Dict[str, Any]:
+        data = _encode(lead)
+        async with self._lock:
+            await self._ensure_open()
+            await asyncio.to_thread(self._append_sync, data)
+            # Index only after the write, so readers never see a partial line
+            self._offsets.append(self._size)
+            self._size += len(data)
+            lead_id = lead.get("id")
+            if lead_id in self._ids:
+                self._garbage += 1
+            elif lead_id:
+                self._ids.add(lead_id)
+        return lead
+
+    async def _fsync_loop(self):
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            if self._dirty and self._file is not None:
+                self._dirty = False
+                try:
+                    await asyncio.to_thread(os.fsync, self._file.fileno())
+                except Exception as e:
+                    self._dirty = True
+                    logging.error(f"Lead log fsync error: {e}")
+
+    # --- reading ----------------------------------------------------------------
+
+    def __len__(self):
+        return len(self._offsets)
+
+    async def iter_newest(self, skip: int = 0, limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Leads newest first, read backwards from the end of the file"""
+        async with self._lock:
+            await self._ensure_open()
+            # Snapshot: compaction swaps in a new file and offset array, so this pair stays consistent
+            f = open(self.path, "rb")
+            offsets, size = self._offsets, self._size
+        try:
+            last = len(offsets) - 1 - skip
+            remaining = limit if limit is not None else len(offsets)
+            while last >= 0 and remaining > 0:
+                end = offsets[last + 1] if last + 1 < len(offsets) else size
+                first = last
+                while first > 0 and end - offsets[first - 1] <= READ_BLOCK_BYTES and last - first + 1 < remaining:
+                    first -= 1
+                block = await asyncio.to_thread(self._read_block, f, offsets[first], end)
+                for line in reversed(block.splitlines()):
+                    lead = _decode(line)
+                    if lead is not None:
+                        yield lead
+                        remaining -= 1
+                        if remaining == 0:
+                            break
+                last = first - 1
+        finally:
+            f.close()
+
+    @staticmethod
+    def _read_block(f, start: int, end: int) -> bytes:
+        f.seek(start)
+        return f.read(end - start)
+
+    async def newest(self, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return [lead async for lead in self.iter_newest(skip, limit)]
+
+    # --- compaction ---------------------------------------------------------------
+
+    def _compact_sync(self) -> int:
+        tmp = self.path.with_suffix(".compact")
+        seen, kept = set(), 0
+        with open(self.path, "rb") as src, open(tmp, "wb") as out:
+            for line in src:
+                lead = _decode(line)
+                if lead is None or (lead.get("id") and lead["id"] in seen):
+                    continue
+                if lead.get("id"):
+                    seen.add(lead["id"])
+                out.write(line)
+                kept += 1
+            out.flush()
+            os.fsync(out.fileno())
+        self._file.close()
+        os.replace(tmp, self.path)
+        self._offsets, self._size, self._garbage, self._ids = self._scan()
+        self._file = open(self.path, "ab")
+        self._dirty = False
+        return kept
+
+    async def compact(self) -> Dict[str, int]:
+        """Rewrite the log without unreadable lines or repeated lead ids"""
+        async with self._lock:
+            await self._ensure_open()
+            before = len(self._offsets)
+            if self._garbage == 0:
+                return {"before": before, "after": before}
+            kept = await asyncio.to_thread(self._compact_sync)
+        logging.info(f"🧹 Lead log compacted: {before} -> {kept} lines")
+        return {"before": before, "after": kept}
+
+    async def _compact_loop(self):
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                await self.compact()
+            except Exception as e:
+                logging.error(f"Lead log compaction error: {e}")
@@ -0,0 +1,204 @@
+"""
+Batched, resumable data migrations for the leads collection.
+
+Each migration walks leads in _id order, a batch at a time, and records the
+last _id it finished in the `migrations` collection after every batch. A run
+that is interrupted (deploy, crash, cancelled job) picks up from that
+checkpoint the next time it is started. Migrations run as background jobs (see
+background_jobs) and report progress through Job.progress().
+"""
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from background_jobs import Job
+from lead_store import LeadStore, to_bson_date, identity_keys, lead_event, merge_update
+
+TIMESTAMP_MIGRATION = "lead_timestamps"
+TIMESTAMP_JOB_KIND = "lead_timestamp_backfill"
+IDENTITY_MIGRATION = "lead_identities"
+IDENTITY_JOB_KIND = "lead_identity_backfill"
+
+BATCH_SIZE = int(os.environ.get("LEAD_MIGRATION_BATCH_SIZE", "500"))
+# Pause between batches so a backfill on Atlas does not starve live traffic
+BATCH_PAUSE_SECONDS = float(os.environ.get("LEAD_MIGRATION_BATCH_PAUSE_SECONDS", "0.05"))
+
+
+async def load_checkpoint(db, name: str) -> Optional[Dict[str, Any]]:
+    return await db.migrations.find_one({"_id": name})
+
+
+async def save_checkpoint(db, name: str, **fields):
+    await db.migrations.update_one(
+        {"_id": name},
+        {"$set": {**fields, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+
+async def backfill_lead_timestamps(job: Job, db, restart: bool = False) -> Dict[str, Any]:
+    """Job runner: convert every non-date lead `timestamp` to a BSON date"""
+    checkpoint = None if restart else await load_checkpoint(db, TIMESTAMP_MIGRATION)
+    if checkpoint and checkpoint.get("completed_at"):
+        # A finished run is repeated from the start - cheap, since converted leads no longer match
+        checkpoint = None
+    last_id = checkpoint.get("last_id") if checkpoint else None
+    counts = {key: (checkpoint or {}).get(key, 0) for key in ("scanned", "converted", "unreadable")}
+
+    pending = {"timestamp": {"$not": {"$type": "date"}}}
+    total = await db.leads.count_documents({**pending, "_id": {"$gt": last_id}} if last_id else pending)
+    job.progress(done=0, total=total, message="Resuming from checkpoint" if last_id else "Converting timestamps")
+    await save_checkpoint(db, TIMESTAMP_MIGRATION, started_at=datetime.utcnow(), completed_at=None)
+
+    while True:
+        query = {**pending, "_id": {"$gt": last_id}} if last_id else pending
+        batch = await db.leads.find(query, {"timestamp": 1}).sort("_id", 1).limit(BATCH_SIZE).to_list(length=BATCH_SIZE)
+        if not batch:
+            break
+
+        updates = []
+        for lead in batch:
+            original = lead.get("timestamp")
+            converted = to_bson_date(original)
+            fields = {"timestamp": converted}
+            if converted is None:
+                # Fall back to the insert time encoded in the ObjectId, keeping the original value
+                fields = {"timestamp": lead["_id"].generation_time.replace(tzinfo=None)}
+                if original is not None:
+                    fields["timestamp_raw"] = original
+                counts["unreadable"] += 1
+            # Only touch the document if nobody changed the timestamp meanwhile
+            updates.append(UpdateOne({"_id": lead["_id"], "timestamp": original}, {"$set": fields}))
+        result = await db.leads.bulk_write(updates, ordered=False)
+
+        counts["scanned"] += len(batch)
+        counts["converted"] += result.modified_count
+        last_id = batch[-1]["_id"]
+        await save_checkpoint(db, TIMESTAMP_MIGRATION, last_id=last_id, **counts)
+        job.progress(done=job.done + len(batch))
+        await asyncio.sleep(BATCH_PAUSE_SECONDS)
+
+    await save_checkpoint(db, TIMESTAMP_MIGRATION, completed_at=datetime.utcnow(), **counts)
+    logging.info(f"✅ Lead timestamp backfill complete: {counts['converted']} converted, {counts['unreadable']} unreadable")
+    job.progress(message="Complete")
+    return counts
+
+
+async def _merge_into(db, lead: Dict[str, Any], target: ObjectId, keys) -> bool:
+    """Fold `lead` into `target` and delete it; False if the target no longer exists"""
+    events = lead.get("events") or [lead_event(lead, event_id=lead["_id"])]
+    target_doc = await db.leads.find_one({"_id": target}, {"timestamp": 1})
+    if target_doc is None:
+        return False
+    # Top-level fields follow whichever of the two saw the latest submission
+    newer = not isinstance(target_doc.get("timestamp"), datetime) or lead["timestamp"] > target_doc["timestamp"]
+    update = merge_update(lead, events, keys, latest=newer)
+    del update["$setOnInsert"]
+    update["$min"] = {"first_seen": lead.get("first_seen") or lead["timestamp"]}
+    # The event-id guard makes a repeated merge (after an interrupted run) a no-op
+    await db.leads.update_one(
+        {"_id": target, "events.id": {"$nin": [e["id"] for e in events]}},
+        update,
+    )
+    await db.leads.delete_one({"_id": lead["_id"]})
+    await db.lead_identities.update_many({"lead_id": lead["_id"]}, {"$set": {"lead_id": target}})
+    return True
+
+
+async def merge_duplicate_leads(job: Job, db, restart: bool = False) -> Dict[str, Any]:
+    """Job runner: register identity keys for every lead and fold duplicates into the oldest one"""
+    store = LeadStore(dedup=True)
+    store.attach(db)
+    checkpoint = None if restart else await load_checkpoint(db, IDENTITY_MIGRATION)
+    if checkpoint and checkpoint.get("completed_at"):
+        checkpoint = None
+    last_id = checkpoint.get("last_id") if checkpoint else None
+    counts = {key: (checkpoint or {}).get(key, 0) for key in ("scanned", "merged", "unkeyed")}
+
+    total = await db.leads.count_documents({"_id": {"$gt": last_id}} if last_id else {})
+    job.progress(done=0, total=total, message="Resuming from checkpoint" if last_id else "Merging duplicate leads")
+    await save_checkpoint(db, IDENTITY_MIGRATION, started_at=datetime.utcnow(), completed_at=None)
+
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id else {}
+        batch = await db.leads.find(query).sort("_id", 1).limit(BATCH_SIZE).to_list(length=BATCH_SIZE)
+        if not batch:
+            break
+
+        for lead in batch:
+            counts["scanned"] += 1
+            keys = identity_keys(lead)
+            if not keys:
+                counts["unkeyed"] += 1
+                if "identity_keys" not in lead:
+                    # An unusable phone gets past the pending query - mark it as seen
+                    await db.leads.update_one({"_id": lead["_id"]}, {"$set": {"identity_keys": []}})
+                continue
+            lead["timestamp"] = to_bson_date(lead.get("timestamp")) or lead["_id"].generation_time.replace(tzinfo=None)
+
+            target = await store.resolve(keys, lead["_id"])
+            if target != lead["_id"]:
+                if await _merge_into(db, lead, target, keys):
+                    counts["merged"] += 1
+                    continue
+                # Keys pointed at a lead that has since been deleted - this lead takes them over
+                await db.lead_identities.update_many({"lead_id": target}, {"$set": {"lead_id": lead["_id"]}})
+
+            if "events" not in lead:
+                # Legacy single-submission lead: give it the merged-lead shape
+                await db.leads.update_one({"_id": lead["_id"]}, {"$set": {
+                    "events": [lead_event(lead, event_id=lead["_id"])],
+                    "timestamp": lead["timestamp"],
+                    "interactions": 1,
+                    "first_seen": lead["timestamp"],
+                    "identity_keys": keys,
+                    "courses": [lead["course"]] if lead.get("course") else [],
+                }})
+            else:
+                await db.leads.update_one({"_id": lead["_id"]}, {"$addToSet": {"identity_keys": {"$each": keys}}})
+
+        last_id = batch[-1]["_id"]
+        await save_checkpoint(db, IDENTITY_MIGRATION, last_id=last_id, **counts)
+        job.progress(done=job.done + len(batch))
+        await asyncio.sleep(BATCH_PAUSE_SECONDS)
+
+    await save_checkpoint(db, IDENTITY_MIGRATION, completed_at=datetime.utcnow(), **counts)
+    logging.info(f"✅ Lead identity backfill complete: {counts['merged']} duplicates merged")
+    job.progress(message="Complete")
+    return counts
+
+
+def checkpoint_to_dict(checkpoint: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not checkpoint:
+        return None
+    return {
+        key: (value.isoformat() if isinstance(value, datetime) else str(value) if key == "last_id" and value is not None else value)
+        for key, value in checkpoint.items()
+        if key != "_id"
+    }
+
+
+# Migrations the admin API can start, by URL name
+MIGRATIONS: Dict[str, Dict[str, Any]] = {
+    "timestamps": {
+        "checkpoint": TIMESTAMP_MIGRATION,
+        "job_kind": TIMESTAMP_JOB_KIND,
+        "runner": backfill_lead_timestamps,
+        "pending": {"timestamp": {"$not": {"$type": "date"}}},
+    },
+    "identities": {
+        "checkpoint": IDENTITY_MIGRATION,
+        "job_kind": IDENTITY_JOB_KIND,
+        "runner": merge_duplicate_leads,
+        # Leads without an email or phone never get identity keys, so they are not pending
+        "pending": {
+            "identity_keys": {"$exists": False},
+            "$or": [{"email": {"$regex": "@"}}, {"phone": {"$nin": [None, ""]}}],
+        },
+    },
+}
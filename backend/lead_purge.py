@@ -0,0 +1,104 @@
+"""
+Filter-based lead purge.
+
+A purge job copies every lead matching a filter into `leads_archive` (same
+_id, plus archived_at and the job id) and then deletes it from `leads`, a
+bounded batch at a time with a short pause between batches. Archiving before
+deleting means an interrupted job loses nothing: re-running it overwrites the
+archived copy of a lead that is still live with its current state and carries
+on. Each delete is guarded by the purge filter and the archived snapshot
+(timestamp and interactions), so a submission merged into a lead after it was
+archived is not lost - the lead is archived again and retried, or kept if the
+merge moved it out of the filter. Daily rollups are history and are not
+decremented - pass rebuild_stats to recompute them afterwards.
+"""
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, List
+
+from pymongo import DeleteOne
+from pymongo.errors import BulkWriteError
+
+from background_jobs import Job
+from lead_queries import lead_count_cache
+from lead_rollups import rebuild_rollups
+from lead_store import lead_store
+
+ARCHIVE_COLLECTION = "leads_archive"
+PURGE_JOB_KIND = "lead_purge"
+
+PURGE_BATCH_SIZE = int(os.environ.get("LEAD_PURGE_BATCH_SIZE", "500"))
+PURGE_BATCH_PAUSE_SECONDS = float(os.environ.get("LEAD_PURGE_BATCH_PAUSE_SECONDS", "0.1"))
+
+DUPLICATE_KEY = 11000
+
+
+async def _archive(db, leads, job_id: str):
+    archived_at = datetime.utcnow()
+    docs = [{**lead, "archived_at": archived_at, "purge_job": job_id} for lead in leads]
+    try:
+        await db[ARCHIVE_COLLECTION].insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY for error in errors):
+            raise
+        # Archived before (interrupted run, retried batch, or a lead re-created under
+        # the same _id) - the copy must hold the state that is about to be deleted
+        for error in errors:
+            doc = docs[error["index"]]
+            await db[ARCHIVE_COLLECTION].replace_one({"_id": doc["_id"]}, doc, upsert=True)
+
+
+def _guarded_deletes(query: Dict[str, Any], leads: List[Dict[str, Any]]) -> List[DeleteOne]:
+    """Deletes that only match a lead still in the filter and unchanged since it was archived"""
+    # Every merge bumps `interactions`; None also matches a missing field
+    return [
+        DeleteOne({"$and": [query, {
+            "_id": lead["_id"],
+            "timestamp": lead.get("timestamp"),
+            "interactions": lead.get("interactions"),
+        }]})
+        for lead in leads
+    ]
+
+
+async def purge_leads(job: Job, db, query: Dict[str, Any], rebuild_stats: bool = False) -> Dict[str, Any]:
+    """Job runner: archive and delete every lead matching `query`"""
+    total = await db.leads.count_documents(query)
+    job.progress(done=0, total=total, message="Archiving and deleting leads")
+    deleted = 0
+
+    while True:
+        batch = await db.leads.find(query).sort("_id", 1).limit(PURGE_BATCH_SIZE).to_list(length=PURGE_BATCH_SIZE)
+        if not batch:
+            break
+        ids = [lead["_id"] for lead in batch]
+        await _archive(db, batch, job.id)
+        result = await db.leads.bulk_write(_guarded_deletes(query, batch), ordered=False)
+        if result.deleted_count < len(ids):
+            # Changed after archiving. Leads still in the filter come round again in the
+            # next batch and are archived afresh; the rest stay, minus this job's copy
+            live = await db.leads.find({"_id": {"$in": ids}}, {"_id": 1}).to_list(length=len(ids))
+            live_ids = {lead["_id"] for lead in live}
+            matching = await db.leads.find({"$and": [query, {"_id": {"$in": list(live_ids)}}]}, {"_id": 1}).to_list(length=len(ids))
+            left_filter = live_ids - {lead["_id"] for lead in matching}
+            if left_filter:
+                await db[ARCHIVE_COLLECTION].delete_many({"_id": {"$in": list(left_filter)}, "purge_job": job.id})
+            ids = [lead_id for lead_id in ids if lead_id not in live_ids]
+        await lead_store.forget(ids)
+        deleted += result.deleted_count
+        job.progress(done=deleted, total=max(total, deleted))
+        await asyncio.sleep(PURGE_BATCH_PAUSE_SECONDS)
+
+    lead_count_cache.clear()
+    logging.info(f"🗑️ Lead purge {job.id} archived and deleted {deleted} leads")
+
+    result = {"deleted": deleted, "archive_collection": ARCHIVE_COLLECTION, "stats_rebuilt": False}
+    if rebuild_stats and deleted:
+        job.progress(message="Rebuilding lead stats")
+        await rebuild_rollups(job, db)
+        result["stats_rebuilt"] = True
+    job.progress(message="Complete")
+    return result
@@ -0,0 +1,176 @@
+"""
+Read-side helpers for the leads admin API: filters, keyset cursors and counts.
+
+Leads are listed newest first on (timestamp, _id), which the timestamp_id and
+<field>_timestamp indexes in db_indexes serve directly. A page cursor is the
+(timestamp, _id) of the last lead returned, so fetching page N costs the same
+as page 1 - no skip(). Totals come from estimated_document_count() when there
+is no filter and from a short-lived cache of count_documents() otherwise.
+"""
+import re
+import json
+import time
+import base64
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from lead_store import to_bson_date, format_timestamp
+
+# Fields the admin table shows - everything else stays on the server
+LEAD_LIST_PROJECTION = {
+    "name": 1, "email": 1, "phone": 1, "message": 1, "course": 1,
+    "type": 1, "source": 1, "timestamp": 1, "interactions": 1, "courses": 1,
+}
+LEAD_SORT = [("timestamp", -1), ("_id", -1)]
+
+MAX_SEARCH_LENGTH = 100
+
+
+class LeadQueryError(ValueError):
+    """Invalid filter or cursor supplied by the client"""
+
+
+def parse_date_bound(value: Optional[str], end: bool = False) -> Optional[Tuple[str, datetime]]:
+    """($gte/$lte/$lt, datetime) for a date filter; a bare date as `end` covers that whole day"""
+    if not value:
+        return None
+    parsed = to_bson_date(value)
+    if parsed is None:
+        raise LeadQueryError(f"Invalid date: {value}")
+    if end and len(value.strip()) == 10:
+        return "$lt", parsed + timedelta(days=1)
+    return ("$lte" if end else "$gte"), parsed
+
+
+def wildcard_regex(pattern: str) -> str:
+    """Anchored regex for a `*`/`?` wildcard such as "*@test.com"; everything else is literal"""
+    pattern = pattern.strip()[:MAX_SEARCH_LENGTH]
+    body = "".join(".*" if ch == "*" else "." if ch == "?" else re.escape(ch) for ch in pattern)
+    return f"^{body}$"
+
+
+def build_lead_filter(
+    course: Optional[str] = None,
+    lead_type: Optional[str] = None,
+    source: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    q: Optional[str] = None,
+    email_pattern: Optional[str] = None,
+) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    alternatives = []
+    if course:
+        # Merged leads list every course they asked about; older single-submission leads only have `course`
+        alternatives.append([{"courses": course}, {"course": course}])
+    if lead_type:
+        query["type"] = lead_type
+    if source:
+        query["source"] = source
+    if email_pattern:
+        query["email"] = {"$regex": wildcard_regex(email_pattern), "$options": "i"}
+
+    bounds = [b for b in (parse_date_bound(date_from), parse_date_bound(date_to, end=True)) if b]
+    if bounds:
+        query["timestamp"] = dict(bounds)
+
+    if q and q.strip():
+        text = q.strip()[:MAX_SEARCH_LENGTH]
+        pattern = {"$regex": re.escape(text), "$options": "i"}
+        clauses = [{"name": pattern}, {"email": pattern}, {"phone": pattern}]
+        digits = re.sub(r"\D", "", text)
+        if digits and digits != text:
+            # "+91 98765-43210" should still find 9876543210
+            clauses.append({"phone": {"$regex": re.escape(digits[-10:])}})
+        alternatives.append(clauses)
+
+    if len(alternatives) == 1:
+        query["$or"] = alternatives[0]
+    elif alternatives:
+        query["$and"] = [{"$or": clauses} for clauses in alternatives]
+    return query
+
+
+def encode_cursor(lead: Dict[str, Any]) -> str:
+    # Leads whose timestamp is not yet a BSON date (see lead_migrations) sort after
+    # every dated lead; a cursor that reaches them ends the listing
+    timestamp = to_bson_date(lead.get("timestamp")) or datetime.min
+    raw = json.dumps({"t": timestamp.isoformat(), "id": str(lead["_id"])})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), ObjectId(data["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise LeadQueryError("Invalid cursor")
+
+
+def after_cursor(query: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """Restrict `query` to leads that sort after the cursor position"""
+    if not cursor:
+        return query
+    timestamp, lead_id = decode_cursor(cursor)
+    keyset = {"$or": [
+        {"timestamp": {"$lt": timestamp}},
+        {"timestamp": timestamp, "_id": {"$lt": lead_id}},
+    ]}
+    return {"$and": [query, keyset]} if query else keyset
+
+
+def serialize_lead(lead: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(lead["_id"]),
+        "name": lead.get("name", "No Name"),
+        "email": lead.get("email", "No Email"),
+        "phone": lead.get("phone", "No Phone"),
+        "message": lead.get("message", ""),
+        "course": lead.get("course") or "General",
+        "type": lead.get("type", ""),
+        "source": lead.get("source", "website"),
+        "timestamp": format_timestamp(lead.get("timestamp")),
+        "interactions": lead.get("interactions", 1),
+        "courses": lead.get("courses") or ([lead["course"]] if lead.get("course") else []),
+    }
+
+
+class LeadCountCache:
+    """Cached totals per filter, so paging through a filtered list does not re-count every time"""
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 256, max_time_ms: int = 2000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_time_ms = max_time_ms
+        self._counts: Dict[str, Tuple[float, int]] = {}
+
+    async def count(self, collection, query: Dict[str, Any]) -> Tuple[Optional[int], bool]:
+        """(total, is_estimate); total is None when counting exceeded max_time_ms"""
+        if not query:
+            return await collection.estimated_document_count(), True
+
+        key = json.dumps(query, sort_keys=True, default=str)
+        cached = self._counts.get(key)
+        if cached and time.monotonic() - cached[0] < self.ttl_seconds:
+            return cached[1], False
+        try:
+            total = await collection.count_documents(query, maxTimeMS=self.max_time_ms)
+        except Exception as e:
+            logging.warning(f"Lead count skipped: {e}")
+            return None, True
+
+        if len(self._counts) >= self.max_entries:
+            self._counts.pop(next(iter(self._counts)))
+        self._counts[key] = (time.monotonic(), total)
+        return total, False
+
+    def clear(self):
+        self._counts.clear()
+
+
+lead_count_cache = LeadCountCache()
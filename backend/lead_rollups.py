@@ -0,0 +1,234 @@
+"""
+Daily lead rollups for the admin stats API.
+
+One document per (day, course, type, source) in `lead_rollups_daily` counts
+submissions and new leads. LeadStore.insert() bumps the matching document
+with $inc, so GET /api/admin/leads/stats reads at most days x combinations
+rollup rows no matter how many leads exist. rebuild_rollups() recomputes the
+counts from the leads (and their merged `events`) with an aggregation
+pipeline - use it after bulk deletes or imports, since deleting leads does not
+decrement the counters. Ingest does not need to pause: the rebuild counts the
+events from before it started and moves each existing row to that figure with
+$inc, so submissions counted while it runs are kept. Only a submission in
+flight at the moment the rebuild starts can be counted twice or not at all.
+
+Days are calendar days at LEAD_STATS_UTC_OFFSET (IST by default), as strings
+like "2025-09-01" so they sort and range-query as-is.
+"""
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from pymongo import UpdateOne, DeleteMany
+
+from background_jobs import Job
+
+ROLLUP_COLLECTION = "lead_rollups_daily"
+DIMENSIONS = ("course", "type", "source")
+DIMENSION_DEFAULTS = {"course": "General", "type": "unknown", "source": "website"}
+INTERVALS = ("day", "week", "month")
+REBUILD_JOB_KIND = "lead_rollup_rebuild"
+
+STATS_UTC_OFFSET = os.environ.get("LEAD_STATS_UTC_OFFSET", "+05:30")
+MAX_RANGE_DAYS = 731
+
+
+def _offset(value: str) -> timedelta:
+    sign = -1 if value.startswith("-") else 1
+    hours, minutes = value.lstrip("+-").split(":")
+    return sign * timedelta(hours=int(hours), minutes=int(minutes))
+
+
+STATS_OFFSET = _offset(STATS_UTC_OFFSET)
+
+
+def stats_day(timestamp: datetime) -> str:
+    """Calendar day of a naive-UTC timestamp in the stats timezone"""
+    return (timestamp + STATS_OFFSET).strftime("%Y-%m-%d")
+
+
+def today() -> str:
+    return stats_day(datetime.utcnow())
+
+
+def dimensions(lead: Dict[str, Any]) -> Dict[str, str]:
+    return {d: str(lead.get(d) or DIMENSION_DEFAULTS[d]) for d in DIMENSIONS}
+
+
+def rollup_id(day: str, dims: Dict[str, str]) -> str:
+    return "|".join([day] + [dims[d] for d in DIMENSIONS])
+
+
+def rollup_increment(lead: Dict[str, Any], new_lead: bool) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(filter, update) that counts one submission in its daily rollup"""
+    day = stats_day(lead["timestamp"])
+    dims = dimensions(lead)
+    return (
+        {"_id": rollup_id(day, dims)},
+        {
+            "$setOnInsert": {"day": day, **dims},
+            "$inc": {"submissions": 1, "new_leads": 1 if new_lead else 0},
+        },
+    )
+
+
+async def record_submission(db, lead: Dict[str, Any], new_lead: bool):
+    """Count one submission in its daily rollup"""
+    await db[ROLLUP_COLLECTION].update_one(*rollup_increment(lead, new_lead), upsert=True)
+
+
+async def record_submissions(db, submissions: List[Tuple[Dict[str, Any], bool]]):
+    """Count a batch of (lead, new_lead) submissions in one round trip"""
+    if submissions:
+        ops = [UpdateOne(*rollup_increment(lead, new_lead), upsert=True) for lead, new_lead in submissions]
+        await db[ROLLUP_COLLECTION].bulk_write(ops, ordered=False)
+
+
+def dimension_expression(field: str, default: str) -> Dict[str, Any]:
+    """Aggregation counterpart of dimensions(): missing, null and "" all become the default"""
+    return {"$cond": [{"$in": [{"$ifNull": [field, None]}, [None, ""]]}, default, field]}
+
+
+def rebuild_pipeline(before: datetime) -> List[Dict[str, Any]]:
+    """Leads -> one row per (day, course, type, source), counting events older than `before`"""
+    # Single-submission leads without `events` count as one event built from their own fields
+    legacy_event = {"timestamp": "$timestamp", **{d: f"${d}" for d in DIMENSIONS}}
+    group_key = {"day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$event.timestamp", "timezone": STATS_UTC_OFFSET}}}
+    group_key.update({d: dimension_expression(f"$event.{d}", DIMENSION_DEFAULTS[d]) for d in DIMENSIONS})
+    return [
+        {"$project": {
+            "events": {"$ifNull": ["$events", [legacy_event]]},
+            "first": {"$ifNull": ["$first_seen", "$timestamp"]},
+        }},
+        {"$unwind": "$events"},
+        {"$project": {"event": "$events", "is_first": {"$eq": ["$events.timestamp", "$first"]}}},
+        {"$match": {"event.timestamp": {"$type": "date", "$lt": before}}},
+        {"$group": {
+            "_id": group_key,
+            "submissions": {"$sum": 1},
+            "new_leads": {"$sum": {"$cond": ["$is_first", 1, 0]}},
+        }},
+        {"$project": {
+            "_id": {"$concat": ["$_id.day"] + [x for d in DIMENSIONS for x in ("|", f"$_id.{d}")]},
+            "day": "$_id.day",
+            **{d: f"$_id.{d}" for d in DIMENSIONS},
+            "submissions": 1,
+            "new_leads": 1,
+        }},
+    ]
+
+
+def correction_ops(current: List[Dict[str, Any]], rebuilt: List[Dict[str, Any]]) -> List[UpdateOne]:
+    """$inc updates that move each row from its `current` counts to the `rebuilt` ones"""
+    counts = {row["_id"]: row for row in current}
+    ops: List[UpdateOne] = []
+    for row in rebuilt:
+        old = counts.pop(row["_id"], {})
+        inc = {key: row[key] - old.get(key, 0) for key in ("submissions", "new_leads")}
+        if any(inc.values()):
+            ops.append(UpdateOne(
+                {"_id": row["_id"]},
+                {"$setOnInsert": {"day": row["day"], **{d: row[d] for d in DIMENSIONS}}, "$inc": inc},
+                upsert=True,
+            ))
+    for row_id, old in counts.items():
+        inc = {key: -old.get(key, 0) for key in ("submissions", "new_leads")}
+        if any(inc.values()):
+            ops.append(UpdateOne({"_id": row_id}, {"$inc": inc}))
+    return ops
+
+
+async def apply_rebuilt_counts(db, current: List[Dict[str, Any]], rebuilt: List[Dict[str, Any]]) -> int:
+    """Correct the live rows from the `current` snapshot to `rebuilt`, keeping later increments"""
+    ops = correction_ops(current, rebuilt)
+    if ops:
+        # Then drop rows with no submissions left; one bumped meanwhile no longer matches
+        await db[ROLLUP_COLLECTION].bulk_write(ops + [DeleteMany({"submissions": {"$lte": 0}})], ordered=True)
+    return len(ops)
+
+
+async def rebuild_rollups(job: Job, db) -> Dict[str, Any]:
+    """Job runner: recompute every rollup document from the leads collection"""
+    job.progress(message="Reading current rollups")
+    current = await db[ROLLUP_COLLECTION].find({}).to_list(length=None)
+    # Submissions from here on are counted by LeadStore's $inc, not by the pipeline
+    started = datetime.utcnow()
+    job.progress(message="Aggregating leads")
+    rebuilt = await db.leads.aggregate(rebuild_pipeline(started), allowDiskUse=True).to_list(length=None)
+    corrected = await apply_rebuilt_counts(db, current, rebuilt)
+    rows = await db[ROLLUP_COLLECTION].count_documents({})
+    logging.info(f"✅ Lead rollups rebuilt: {rows} daily rows, {corrected} corrected")
+    job.progress(message="Complete")
+    return {"rows": rows, "corrected": corrected}
+
+
+def _bucket(day: str, interval: str) -> str:
+    if interval == "month":
+        return day[:7]
+    if interval == "week":
+        date = datetime.strptime(day, "%Y-%m-%d")
+        return (date - timedelta(days=date.weekday())).strftime("%Y-%m-%d")
+    return day
+
+
+def _parse_day(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"Invalid date (expected YYYY-MM-DD): {value}")
+
+
+async def query_stats(
+    db,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    interval: str = "day",
+    filters: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """Totals, a zero-filled time series and per-dimension breakdowns for a day range"""
+    if interval not in INTERVALS:
+        raise ValueError(f"interval must be one of {', '.join(INTERVALS)}")
+    end = _parse_day(date_to or today())
+    start = _parse_day(date_from) if date_from else end - timedelta(days=29)
+    if start > end:
+        raise ValueError("date_from must not be after date_to")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"Date range is limited to {MAX_RANGE_DAYS} days")
+
+    query: Dict[str, Any] = {"day": {"$gte": start.strftime("%Y-%m-%d"), "$lte": end.strftime("%Y-%m-%d")}}
+    query.update({d: v for d, v in (filters or {}).items() if d in DIMENSIONS and v})
+    rows = await db[ROLLUP_COLLECTION].find(query, {"_id": 0}).to_list(length=None)
+
+    series: Dict[str, Dict[str, int]] = {}
+    day = start
+    while day <= end:
+        series.setdefault(_bucket(day.strftime("%Y-%m-%d"), interval), {"submissions": 0, "new_leads": 0})
+        day += timedelta(days=1)
+    breakdown: Dict[str, Dict[str, Dict[str, int]]] = {d: {} for d in DIMENSIONS}
+    totals = {"submissions": 0, "new_leads": 0}
+
+    for row in rows:
+        counts = {"submissions": row.get("submissions", 0), "new_leads": row.get("new_leads", 0)}
+        targets = [totals, series[_bucket(row["day"], interval)]]
+        targets += [breakdown[d].setdefault(row[d], {"submissions": 0, "new_leads": 0}) for d in DIMENSIONS]
+        for target in targets:
+            for key, value in counts.items():
+                target[key] += value
+
+    return {
+        "date_from": start.strftime("%Y-%m-%d"),
+        "date_to": end.strftime("%Y-%m-%d"),
+        "interval": interval,
+        "utc_offset": STATS_UTC_OFFSET,
+        "totals": totals,
+        "series": [{"period": period, **counts} for period, counts in sorted(series.items())],
+        "breakdown": {
+            d: sorted(
+                ({"key": key, **counts} for key, counts in values.items()),
+                key=lambda item: item["submissions"],
+                reverse=True,
+            )
+            for d, values in breakdown.items()
+        },
+    }
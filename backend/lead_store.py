@@ -0,0 +1,325 @@
+"""
+Write path for the leads collection.
+
+Every lead is stored with `timestamp` as a native BSON date (naive UTC, as
+Motor returns it). Older documents carry ISO strings from the syllabus route
+or str(datetime) from railway_server's JSON store; Mongo sorts by BSON type
+before value, so mixed types break the newest-first order and the
+timestamp indexes. lead_migrations.backfill_lead_timestamps converts those.
+
+One person is one lead. Each lead owns identity keys - lower-cased email and
+E.164 phone - held in `lead_identities` under a unique index. Ingest claims
+the keys with an upsert (so two concurrent submissions cannot both create a
+lead), then upserts the lead and appends the submission to its `events`. If
+that lead write fails, keys just claimed for a new lead are released again so
+they do not point at a lead that was never stored.
+The lead's top-level fields and `timestamp` reflect the latest submission.
+lead_migrations.merge_duplicate_leads folds historical duplicates together.
+
+With a write-behind buffer attached (see lead_buffer), insert() only enqueues
+the submission; write_batch() later stores a whole batch in a couple of round
+trips.
+"""
+import os
+import re
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+
+from lead_rollups import record_submission, record_submissions
+
+DEDUP_ENABLED = os.environ.get("LEAD_DEDUP_ENABLED", "true").lower() not in ("0", "false", "no")
+DEFAULT_COUNTRY_CODE = os.environ.get("LEAD_DEFAULT_COUNTRY_CODE", "91")
+# Oldest events are dropped beyond this so a lead document cannot grow without bound
+MAX_EVENTS = 200
+EVENT_FIELDS = ("type", "course", "source", "message")
+
+DUPLICATE_KEY = 11000
+
+
+def to_bson_date(value: Any) -> Optional[datetime]:
+    """Naive UTC datetime for a stored timestamp, or None if it cannot be read"""
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Epoch seconds, or milliseconds from JavaScript clients
+        seconds = value / 1000 if value > 1e11 else value
+        dt = datetime.fromtimestamp(seconds, tz=timezone.utc)
+    elif isinstance(value, str) and value.strip():
+        text = value.strip()
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    else:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def format_timestamp(value: Any) -> str:
+    """ISO string for API responses, whatever type the document holds"""
+    dt = to_bson_date(value)
+    if dt is None:
+        return str(value) if value is not None else "Unknown Date"
+    return dt.isoformat()
+
+
+def normalize_lead(lead: Dict[str, Any]) -> Dict[str, Any]:
+    """Coerce `timestamp` to a BSON date in place; a missing or unreadable value becomes now"""
+    timestamp = to_bson_date(lead.get("timestamp"))
+    if timestamp is None:
+        if lead.get("timestamp") is not None:
+            logging.warning(f"Unreadable lead timestamp {lead.get('timestamp')!r}, using current time")
+        timestamp = datetime.utcnow()
+    lead["timestamp"] = timestamp
+    return lead
+
+
+def normalize_email(email: Any) -> Optional[str]:
+    if not isinstance(email, str) or "@" not in email:
+        return None
+    return email.strip().lower()
+
+
+def normalize_phone(phone: Any) -> Optional[str]:
+    """E.164 form; bare 10-digit and 0-prefixed numbers are taken as DEFAULT_COUNTRY_CODE"""
+    if not isinstance(phone, (str, int)):
+        return None
+    text = str(phone).strip()
+    digits = re.sub(r"\D", "", text)
+    if text.startswith("00"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = DEFAULT_COUNTRY_CODE + digits[1:]
+    elif len(digits) == 10 and not text.startswith("+"):
+        digits = DEFAULT_COUNTRY_CODE + digits
+    if not 8 <= len(digits) <= 15:
+        return None
+    return "+" + digits
+
+
+def identity_keys(lead: Dict[str, Any]) -> List[str]:
+    """Identity keys of a lead, strongest first"""
+    keys = []
+    email = normalize_email(lead.get("email"))
+    if email:
+        keys.append(f"email:{email}")
+    phone = normalize_phone(lead.get("phone"))
+    if phone:
+        keys.append(f"phone:{phone}")
+    return keys
+
+
+def lead_event(lead: Dict[str, Any], event_id: Optional[ObjectId] = None) -> Dict[str, Any]:
+    """One submission, as stored in a lead's `events`"""
+    event = {"id": event_id or ObjectId(), "timestamp": lead["timestamp"]}
+    event.update((field, lead.get(field)) for field in EVENT_FIELDS if lead.get(field) is not None)
+    return event
+
+
+def merge_update(lead: Dict[str, Any], events: List[Dict[str, Any]], keys: List[str], latest: bool = True) -> Dict[str, Any]:
+    """Update that folds `events` into an existing (or upserted) lead"""
+    update: Dict[str, Any] = {
+        "$setOnInsert": {"first_seen": min(e["timestamp"] for e in events)},
+        "$max": {"timestamp": max(e["timestamp"] for e in events)},
+        "$inc": {"interactions": len(events)},
+        "$push": {"events": {"$each": events, "$slice": -MAX_EVENTS}},
+        "$addToSet": {"identity_keys": {"$each": keys}},
+    }
+    courses = sorted({e["course"] for e in events if e.get("course")})
+    if courses:
+        update["$addToSet"]["courses"] = {"$each": courses}
+    if latest:
+        update["$set"] = {
+            k: v for k, v in lead.items()
+            if k not in ("_id", "timestamp", "events", "interactions", "identity_keys", "courses", "first_seen")
+        }
+    return update
+
+
+def _duplicate_indexes(error: BulkWriteError) -> set:
+    """Indexes of the duplicate-key failures in a bulk write; any other failure is re-raised"""
+    errors = error.details.get("writeErrors", [])
+    if any(e.get("code") != DUPLICATE_KEY for e in errors):
+        raise error
+    return {e["index"] for e in errors}
+
+
+class LeadStore:
+    def __init__(self, dedup: bool = DEDUP_ENABLED):
+        self.dedup = dedup
+        self.db = None
+        self.created = 0
+        self.merged = 0
+        # Set by LeadBuffer.start() when write-behind ingest is enabled
+        self.buffer = None
+        # Set by LeadFeed.start(); told about every lead written, for the live admin feed
+        self.feed = None
+
+    def attach(self, db):
+        self.db = db
+
+    async def claim(self, key: str, lead_id: ObjectId) -> ObjectId:
+        """Owner of an identity key, registering `lead_id` as owner if the key is new"""
+        for _ in range(3):
+            try:
+                identity = await self.db.lead_identities.find_one_and_update(
+                    {"key": key},
+                    {"$setOnInsert": {"lead_id": lead_id, "created_at": datetime.utcnow()}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+                return identity["lead_id"]
+            except DuplicateKeyError:
+                # A concurrent upsert of the same key won the race - read its owner
+                continue
+        identity = await self.db.lead_identities.find_one({"key": key})
+        return identity["lead_id"]
+
+    async def resolve(self, keys: List[str], candidate: ObjectId) -> ObjectId:
+        """Lead that owns any of `keys`, or `candidate` if none does; all keys end up owned by the result"""
+        owners = [await self.claim(key, candidate) for key in keys]
+        lead_id = next((owner for owner in owners if owner != candidate), candidate)
+        if lead_id != candidate:
+            # Keys just claimed for the candidate belong to the existing lead instead
+            await self.db.lead_identities.update_many({"lead_id": candidate}, {"$set": {"lead_id": lead_id}})
+        return lead_id
+
+    async def insert(self, lead: Dict[str, Any]) -> Dict[str, Any]:
+        """Record one submission; returns {"lead_id", "merged"}"""
+        lead = normalize_lead(lead)
+        if self.buffer is not None:
+            return await self.buffer.enqueue(lead)
+        keys = identity_keys(lead)
+        if not self.dedup or not keys:
+            result = await self.db.leads.insert_one(lead)
+            self.created += 1
+            await self._count(lead, new_lead=True)
+            await self._notify([(result.inserted_id, True)])
+            return {"lead_id": result.inserted_id, "merged": False}
+
+        candidate = ObjectId()
+        lead_id = await self.resolve(keys, candidate)
+        merged = lead_id != candidate
+        try:
+            await self.db.leads.update_one(
+                {"_id": lead_id},
+                merge_update(lead, [lead_event(lead)], keys),
+                upsert=True,
+            )
+        except Exception:
+            if not merged:
+                await self._release(candidate)
+            raise
+        if merged:
+            self.merged += 1
+            logging.info(f"🔗 Submission merged into existing lead {lead_id}")
+        else:
+            self.created += 1
+        await self._count(lead, new_lead=not merged)
+        await self._notify([(lead_id, not merged)])
+        return {"lead_id": lead_id, "merged": merged}
+
+    async def _release(self, candidate: ObjectId):
+        """Drop identity keys claimed for a lead whose first write failed"""
+        try:
+            # A concurrent submission may have resolved to the candidate and stored it meanwhile
+            if await self.db.leads.find_one({"_id": candidate}, {"_id": 1}) is None:
+                await self.db.lead_identities.delete_many({"lead_id": candidate})
+        except Exception as e:
+            logging.warning(f"Failed to release identity keys of unwritten lead {candidate}: {e}")
+
+    async def write_batch(self, entries: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Store buffered {"id", "lead"} entries; entries already stored by an interrupted flush are skipped"""
+        plain: List[Dict[str, Any]] = []
+        groups: Dict[ObjectId, Dict[str, Any]] = {}
+        for entry in entries:
+            lead, entry_id = entry["lead"], entry["id"]
+            keys = identity_keys(lead)
+            if not self.dedup or not keys:
+                plain.append({**lead, "_id": entry_id})
+                continue
+            # The entry id doubles as candidate lead id and event id, so a replay resolves the same way
+            lead_id = await self.resolve(keys, entry_id)
+            group = groups.setdefault(lead_id, {"leads": [], "events": [], "keys": [], "new": lead_id == entry_id})
+            group["leads"].append(lead)
+            group["events"].append(lead_event(lead, event_id=entry_id))
+            group["keys"] += [key for key in keys if key not in group["keys"]]
+
+        skipped_plain: set = set()
+        if plain:
+            try:
+                await self.db.leads.insert_many(plain, ordered=False)
+            except BulkWriteError as e:
+                skipped_plain = _duplicate_indexes(e)
+
+        targets = list(groups.items())
+        skipped_groups: set = set()
+        if targets:
+            ops = [
+                UpdateOne(
+                    {"_id": lead_id, "events.id": {"$nin": [event["id"] for event in group["events"]]}},
+                    merge_update(group["leads"][-1], group["events"], group["keys"]),
+                    upsert=True,
+                )
+                for lead_id, group in targets
+            ]
+            try:
+                await self.db.leads.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                # Events already present: the guard fails to match and the upsert collides on _id
+                skipped_groups = _duplicate_indexes(e)
+
+        submissions = [(doc, True) for i, doc in enumerate(plain) if i not in skipped_plain]
+        for i, (lead_id, group) in enumerate(targets):
+            if i not in skipped_groups:
+                submissions += [(lead, group["new"] and n == 0) for n, lead in enumerate(group["leads"])]
+        new_leads = sum(1 for _, new_lead in submissions if new_lead)
+        self.created += new_leads
+        self.merged += len(submissions) - new_leads
+        try:
+            await record_submissions(self.db, submissions)
+        except Exception as e:
+            logging.warning(f"Failed to update lead rollups: {e}")
+        changes = [(doc["_id"], True) for i, doc in enumerate(plain) if i not in skipped_plain]
+        changes += [(lead_id, group["new"]) for i, (lead_id, group) in enumerate(targets) if i not in skipped_groups]
+        await self._notify(changes)
+        return {"written": len(submissions), "replayed": len(skipped_plain) + len(skipped_groups)}
+
+    async def _count(self, lead: Dict[str, Any], new_lead: bool):
+        # Stats are best effort - never fail a submission over them
+        try:
+            await record_submission(self.db, lead, new_lead)
+        except Exception as e:
+            logging.warning(f"Failed to update lead rollup: {e}")
+
+    async def _notify(self, changes: List[Tuple[ObjectId, bool]]):
+        if self.feed is None:
+            return
+        try:
+            await self.feed.notify(changes)
+        except Exception as e:
+            logging.warning(f"Failed to publish lead to live feed: {e}")
+
+    async def forget(self, lead_ids: List[ObjectId]):
+        """Drop the identity keys of deleted leads so new submissions start fresh leads"""
+        await self.db.lead_identities.delete_many({"lead_id": {"$in": list(lead_ids)}})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "dedup": self.dedup,
+            "created": self.created,
+            "merged": self.merged,
+            "buffer": self.buffer.stats() if self.buffer is not None else None,
+        }
+
+
+lead_store = LeadStore()
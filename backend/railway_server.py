@@ -5,6 +5,7 @@ This file contains the main FastAPI server configured for Railway deployment
 
 from fastapi import FastAPI, APIRouter, HTTPException, Form, Depends, Response, Request, UploadFile, File
 from fastapi.responses import FileResponse, JSONResponse
+from starlette.background import BackgroundTask
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
@@ -17,23 +18,20 @@ from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone
-import json
-import aiofiles
 import secrets
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-from reportlab.lib.units import inch
 import asyncio
-import tempfile
-from urllib.parse import urlparse
-import hashlib
 import jwt
 from content_manager import ContentManager
-import mimetypes
-import shutil
+from syllabus_cache import fingerprint
+from artifact_store import ArtifactStore
+from asset_cache import logo_cache, logo_digest
+from syllabus_renderer import (
+    render as render_syllabus, render_base, personal_lines, generation_date, SYLLABUS_TEMPLATE_VERSION,
+    PERSONAL_FONT, PERSONAL_FONT_SIZE, PERSONAL_LINE_HEIGHT,
+)
+from syllabus_stamp import base_pdf_cache, stamp_lines, STAMPING_AVAILABLE
+from lead_store import normalize_lead
+from lead_log import LeadLog
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -62,6 +60,15 @@ os.makedirs(BACKEND_DIR / 'data' / 'media', exist_ok=True)
 os.makedirs(BACKEND_DIR / 'data' / 'versions', exist_ok=True) 
 os.makedirs(BACKEND_DIR / 'data' / 'backups', exist_ok=True)
 
+# Generated syllabi are written here and deleted after download; the store
+# caps the directory by size and age in case a download never completes
+temp_store = ArtifactStore(
+    BACKEND_DIR / 'temp',
+    max_bytes=int(os.environ.get('TEMP_STORE_MAX_MB', '100')) * 1024 * 1024,
+    max_age_seconds=float(os.environ.get('TEMP_STORE_MAX_AGE_SECONDS', '3600')),
+    sweep_interval=float(os.environ.get('TEMP_STORE_SWEEP_SECONDS', '300')),
+)
+
 # Tools configuration
 TOOLS_CONFIG = {
     "devops-training": [
@@ -147,7 +154,19 @@ def verify_admin_token(request: Request):
 class StorageService:
     def __init__(self):
         self.storage_type = os.environ.get('CONTACT_STORAGE', 'json')
-        self.json_file = BACKEND_DIR / 'storage' / 'leads.json'
+        # Append-only NDJSON log; the old leads.json array is imported into it once
+        self.lead_log = LeadLog(
+            BACKEND_DIR / 'storage' / 'leads.ndjson',
+            legacy_file=BACKEND_DIR / 'storage' / 'leads.json'
+        )
+    
+    async def start(self):
+        if self.storage_type != 'mongo':
+            await self.lead_log.start()
+    
+    async def stop(self):
+        if self.storage_type != 'mongo':
+            await self.lead_log.stop()
     
     async def save_lead(self, lead_data: dict):
         if self.storage_type == 'mongo':
@@ -155,54 +174,41 @@ class StorageService:
         else:
             return await self._save_to_json(lead_data)
     
-    async def get_leads(self):
+    async def get_leads(self, skip: int = 0, limit: Optional[int] = None):
+        """Leads newest first"""
         if self.storage_type == 'mongo':
-            return await self._get_from_mongo()
+            return await self._get_from_mongo(skip, limit)
         else:
-            return await self._get_from_json()
+            return await self._get_from_json(skip, limit)
     
     async def _save_to_json(self, lead_data: dict):
         try:
-            if self.json_file.exists():
-                async with aiofiles.open(self.json_file, 'r') as f:
-                    leads = json.loads(await f.read())
-            else:
-                leads = []
-            
-            leads.append(lead_data)
-            
-            async with aiofiles.open(self.json_file, 'w') as f:
-                await f.write(json.dumps(leads, indent=2, default=str))
-            
-            return lead_data
+            return await self.lead_log.append(lead_data)
         except Exception as e:
             logging.error(f"Error saving to JSON: {e}")
             raise HTTPException(status_code=500, detail="Failed to save lead")
     
-    async def _get_from_json(self):
+    async def _get_from_json(self, skip: int = 0, limit: Optional[int] = None):
         try:
-            if not self.json_file.exists():
-                return []
-            
-            async with aiofiles.open(self.json_file, 'r') as f:
-                leads = json.loads(await f.read())
-            return leads
+            return await self.lead_log.newest(skip, limit)
         except Exception as e:
             logging.error(f"Error reading from JSON: {e}")
             return []
     
     async def _save_to_mongo(self, lead_data: dict):
         try:
-            result = await db.leads.insert_one(lead_data)
+            result = await db.leads.insert_one(normalize_lead(lead_data))
             lead_data['_id'] = str(result.inserted_id)
             return lead_data
         except Exception as e:
             logging.error(f"Error saving to MongoDB: {e}")
             raise HTTPException(status_code=500, detail="Failed to save lead")
     
-    async def _get_from_mongo(self):
+    async def _get_from_mongo(self, skip: int = 0, limit: Optional[int] = None):
         try:
-            cursor = db.leads.find().sort('timestamp', -1)
+            cursor = db.leads.find().sort('timestamp', -1).skip(skip)
+            if limit:
+                cursor = cursor.limit(limit)
             leads = await cursor.to_list(length=None)
             for lead in leads:
                 lead['_id'] = str(lead['_id'])
@@ -256,7 +262,33 @@ class MediaUpload(BaseModel):
     filename: str
     fileData: bytes
 
-# PDF Generation with Railway-compatible paths
+# PDF Generation - shared GRRAS layout from syllabus_renderer
+def _personalised_syllabus_bytes(course: Dict[str, Any], institute: Dict[str, Any], branding: Dict[str, Any], personalization: Dict[str, str], logo: Optional[bytes]) -> bytes:
+    """Stamp the student's lines onto the cached base PDF, rendering the base on first use"""
+    generated_on = generation_date()
+    if not STAMPING_AVAILABLE:
+        return render_syllabus(course, institute, branding, personalization, generated_on, logo)
+
+    # The base carries no personal data - it only changes with the course, institute, logo or day
+    base_key = fingerprint(SYLLABUS_TEMPLATE_VERSION, course, institute, branding, generated_on, logo_digest(logo))
+    base = base_pdf_cache.get(base_key)
+    if base is None:
+        base = render_base(course, institute, branding, generated_on, logo)
+        if base is None:
+            # Slot was never laid out - fall back to a full render
+            return render_syllabus(course, institute, branding, personalization, generated_on, logo)
+        base_pdf_cache.put(base_key, base)
+        logging.info(f"✅ Base syllabus PDF cached for {course.get('slug')}")
+
+    return stamp_lines(
+        base,
+        personal_lines(personalization),
+        font_name=PERSONAL_FONT,
+        font_size=PERSONAL_FONT_SIZE,
+        line_height=PERSONAL_LINE_HEIGHT,
+    )
+
+
 async def generate_syllabus_pdf(course_slug: str, student_name: str) -> str:
     """Generate a professional syllabus PDF using dynamic content"""
     try:
@@ -270,114 +302,20 @@ async def generate_syllabus_pdf(course_slug: str, student_name: str) -> str:
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
         
-        course_name = course.get("title", "Course")
-        tools = course.get("tools", [])
-        duration = course.get("duration", "Contact for details")
-        fees = course.get("fees", "Contact for details")
-        
-        # Create temporary file with Railway-compatible path
-        temp_file = BACKEND_DIR / 'temp' / f"syllabus_{course_slug}_{uuid.uuid4().hex[:8]}.pdf"
-        
-        # Create PDF
-        doc = SimpleDocTemplate(str(temp_file), pagesize=A4, topMargin=1*inch)
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Title'],
-            fontSize=24,
-            textColor=colors.HexColor('#DC2626'),
-            spaceAfter=30,
-            alignment=1  # Center
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading1'],
-            fontSize=16,
-            textColor=colors.HexColor('#DC2626'),
-            spaceAfter=12,
-            spaceBefore=20
-        )
-        
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=11,
-            spaceAfter=6,
-            leading=14
-        )
-        
-        # Content
-        content_elements = []
-        
-        # Header with institute info
-        institute_name = institute.get("name", "GRRAS Solutions Training Institute")
-        content_elements.append(Paragraph(institute_name, title_style))
-        content_elements.append(Spacer(1, 20))
-        
-        # Course title
-        content_elements.append(Paragraph(f"{course_name} - Detailed Syllabus", heading_style))
-        content_elements.append(Spacer(1, 10))
-        
-        # Student name
-        content_elements.append(Paragraph(f"Prepared for: {student_name}", normal_style))
-        content_elements.append(Paragraph(f"Date: {datetime.now().strftime('%B %d, %Y')}", normal_style))
-        content_elements.append(Paragraph(f"Document ID: SYL-{course_slug.upper()}-{datetime.now().strftime('%Y%m%d')}", normal_style))
-        content_elements.append(Spacer(1, 30))
-        
-        # Course Details
-        content_elements.append(Paragraph("Course Information", heading_style))
-        content_elements.append(Paragraph(f"<b>Duration:</b> {duration}", normal_style))
-        content_elements.append(Paragraph(f"<b>Fees:</b> {fees}", normal_style))
-        content_elements.append(Spacer(1, 20))
-        
-        # Tools/Technologies section
-        if tools:
-            content_elements.append(Paragraph("Tools & Technologies Covered", heading_style))
-            for tool in tools:
-                content_elements.append(Paragraph(f"• {tool}", normal_style))
-            content_elements.append(Spacer(1, 20))
-        
-        # Curriculum outline
-        content_elements.append(Paragraph("Curriculum Outline", heading_style))
-        content_elements.append(Paragraph("Detailed curriculum will be shared during counseling session. Our comprehensive program covers:", normal_style))
-        content_elements.append(Paragraph("• Fundamentals and core concepts", normal_style))
-        content_elements.append(Paragraph("• Hands-on practical sessions", normal_style))
-        content_elements.append(Paragraph("• Industry best practices", normal_style))
-        content_elements.append(Paragraph("• Real-world projects", normal_style))
-        content_elements.append(Paragraph("• Certification preparation", normal_style))
-        content_elements.append(Spacer(1, 20))
-        
-        # Learning outcomes
-        content_elements.append(Paragraph("Learning Outcomes", heading_style))
-        content_elements.append(Paragraph("Upon successful completion of this program, students will:", normal_style))
-        content_elements.append(Paragraph("• Master industry-relevant skills and technologies", normal_style))
-        content_elements.append(Paragraph("• Gain practical experience through projects", normal_style))
-        content_elements.append(Paragraph("• Be prepared for industry certifications", normal_style))
-        content_elements.append(Paragraph("• Develop problem-solving capabilities", normal_style))
-        content_elements.append(Spacer(1, 20))
-        
-        # Schedule and fees
-        content_elements.append(Paragraph("Schedule & Fees", heading_style))
-        content_elements.append(Paragraph("For detailed schedule, duration, and fee structure, please contact our admissions team.", normal_style))
-        content_elements.append(Spacer(1, 30))
-        
-        # Footer with institute info
-        content_elements.append(Paragraph("Contact Information", heading_style))
-        content_elements.append(Paragraph(institute_name, normal_style))
-        
-        address = institute.get("address", "A-81, Singh Bhoomi Khatipura Rd, behind Marudhar Hospital, Jaipur, Rajasthan 302012")
-        content_elements.append(Paragraph(address, normal_style))
-        
-        phone = institute.get("phone", "090019 91227")
-        content_elements.append(Paragraph(f"Phone: {phone}", normal_style))
+        branding = content.get("branding", {})
+        logo = await logo_cache.get(branding, content)
+        personalization = {
+            "name": student_name,
+            "document_id": f"SYL-{course_slug.upper()}-{datetime.now().strftime('%Y%m%d')}",
+        }
+        pdf = await asyncio.to_thread(_personalised_syllabus_bytes, course, institute, branding, personalization, logo)
         
-        # Build PDF
-        doc.build(content_elements)
+        # Create temporary file with Railway-compatible path (pinned until released after download)
+        temp_file = await temp_store.put(f"syllabus_{course_slug}", pdf)
         return str(temp_file)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error generating PDF: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate PDF")
@@ -442,9 +380,11 @@ async def create_lead(lead: LeadCreate):
     return {"success": True, "lead_id": saved_lead['id']}
 
 @api_router.get("/leads")
-async def get_leads(credentials: HTTPBasicCredentials = Depends(verify_admin)):
-    """Get all leads (admin only)"""
-    leads = await storage.get_leads()
+async def get_leads(skip: int = 0, limit: Optional[int] = None, credentials: HTTPBasicCredentials = Depends(verify_admin)):
+    """Get leads, newest first (admin only)"""
+    if skip < 0 or (limit is not None and not 1 <= limit <= 1000):
+        raise HTTPException(status_code=400, detail="skip must be >= 0 and limit between 1 and 1000")
+    leads = await storage.get_leads(skip, limit)
     return {"leads": leads}
 
 @api_router.post("/syllabus")
@@ -480,7 +420,8 @@ async def generate_syllabus(request: SyllabusRequest):
         pdf_path, 
         media_type='application/pdf',
         filename=filename,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        background=BackgroundTask(temp_store.release, pdf_path)
     )
 
 # Content Management Routes
@@ -720,8 +661,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def start_temp_store():
+    await temp_store.start()
+    await storage.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await temp_store.stop()
+    await storage.stop()
     client.close()
 
 # Railway-specific startup
@@ -0,0 +1,124 @@
+"""
+Related content engine.
+
+Scores documents against each other with TF-IDF cosine similarity blended
+with tag Jaccard similarity, vectorised with NumPy. It is run when content is
+written so that reads only look up the precomputed neighbour lists.
+"""
+import re
+import math
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+DEFAULT_TOP_K = 3
+TAG_WEIGHT = 0.4  # share of the final score taken by tag Jaccard similarity
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+STOP_WORDS = frozenset("""
+a an and are as at be by can for from has have how in into is it its of on or our
+that the their this to was what when which who why will with you your we us
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens without stop words"""
+    return [t for t in _WORD_RE.findall((text or "").lower()) if t not in STOP_WORDS and len(t) > 1]
+
+
+def tfidf_matrix(documents: Sequence[List[str]]) -> np.ndarray:
+    """L2-normalised TF-IDF rows (sublinear term frequency) for tokenised documents"""
+    vocabulary: Dict[str, int] = {}
+    for tokens in documents:
+        for token in tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+
+    matrix = np.zeros((len(documents), max(len(vocabulary), 1)), dtype=np.float32)
+    for row, tokens in enumerate(documents):
+        for token in tokens:
+            matrix[row, vocabulary[token]] += 1.0
+
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1.0 + len(documents)) / (1.0 + document_frequency)) + 1.0
+    matrix = np.log1p(matrix) * idf
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def jaccard_matrix(tag_sets: Sequence[set]) -> np.ndarray:
+    """Pairwise Jaccard similarity of tag sets"""
+    vocabulary: Dict[str, int] = {}
+    for tags in tag_sets:
+        for tag in tags:
+            vocabulary.setdefault(tag, len(vocabulary))
+
+    membership = np.zeros((len(tag_sets), max(len(vocabulary), 1)), dtype=np.float32)
+    for row, tags in enumerate(tag_sets):
+        for tag in tags:
+            membership[row, vocabulary[tag]] = 1.0
+
+    intersection = membership @ membership.T
+    sizes = membership.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+def top_k_neighbours(scores: np.ndarray, keys: Sequence[str], k: int = DEFAULT_TOP_K) -> List[List[str]]:
+    """For each score row, the keys of the k best columns with a positive score"""
+    if scores.size == 0:
+        return [[] for _ in range(scores.shape[0])]
+    k = min(k, scores.shape[1])
+    best = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return [
+        [keys[column] for column in row_best if scores[row, column] > 0]
+        for row, row_best in enumerate(best)
+    ]
+
+
+class RelatedContentEngine:
+    """Builds top-k related posts per post and related courses per post"""
+
+    def __init__(self, top_k: int = DEFAULT_TOP_K, tag_weight: float = TAG_WEIGHT):
+        self.top_k = top_k
+        self.tag_weight = tag_weight
+
+    def build(
+        self,
+        post_keys: List[str],
+        post_texts: List[str],
+        post_tags: List[set],
+        course_keys: List[str] = (),
+        course_texts: List[str] = (),
+    ) -> Dict[str, Dict[str, List[str]]]:
+        """Return {"posts": {post: [posts]}, "courses": {post: [courses]}}"""
+        if not post_keys:
+            return {"posts": {}, "courses": {}}
+
+        post_tokens = [tokenize(text) for text in post_texts]
+        course_tokens = [tokenize(text) for text in course_texts]
+
+        # One shared vector space so posts and courses are directly comparable
+        vectors = tfidf_matrix(post_tokens + course_tokens)
+        post_vectors = vectors[:len(post_keys)]
+        course_vectors = vectors[len(post_keys):]
+
+        post_scores = (1.0 - self.tag_weight) * (post_vectors @ post_vectors.T)
+        post_scores += self.tag_weight * jaccard_matrix(post_tags)
+        np.fill_diagonal(post_scores, -math.inf)
+
+        related_posts = top_k_neighbours(post_scores, post_keys, self.top_k)
+        related = {
+            "posts": dict(zip(post_keys, related_posts)),
+            "courses": {key: [] for key in post_keys},
+        }
+
+        if course_keys:
+            course_scores = post_vectors @ course_vectors.T
+            related["courses"] = dict(zip(post_keys, top_k_neighbours(course_scores, list(course_keys), self.top_k)))
+
+        return related
+
+
+related_content_engine = RelatedContentEngine()
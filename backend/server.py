@@ -1,29 +1,48 @@
 # FastAPI Server with Enhanced Blog Date Management and Newsletter Subscription
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, Response
+from fastapi.responses import RedirectResponse, Response, FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from motor.motor_asyncio import AsyncIOMotorClient
-from content_manager import ContentManager
+from content_manager import ContentManager, content_revision
+from blog_index import (
+    blog_index_cache, precompute_post_fields, rebuild_blog_facets, update_blog_facets,
+    refresh_related_content
+)
+from blog_scheduler import publish_scheduler, apply_publish_schedule, apply_publish_schedules
+from blog_feeds import feed_cache, RSS, ATOM, JSON_FEED
+from syllabus_renderer import generation_date, SyllabusRenderError
+from syllabus_pool import syllabus_render_pool, SyllabusRenderTimeout, SyllabusQueueFull
+from syllabus_cache import syllabus_cache
+from asset_cache import logo_cache, logo_digest
+from syllabus_prerender import syllabus_prerenderer
+from syllabus_export import export_store, export_syllabus_pack, EXPORT_JOB_KIND
+from background_jobs import job_registry
+from db_indexes import index_registry
+from lead_store import lead_store, format_timestamp
+from lead_buffer import lead_buffer, LEAD_BUFFER_ENABLED
+from lead_feed import lead_feed, FeedFull
+from lead_queries import (
+    build_lead_filter, after_cursor, encode_cursor, serialize_lead,
+    lead_count_cache, LeadQueryError, LEAD_LIST_PROJECTION, LEAD_SORT
+)
+from lead_export import stream_leads, export_filename as lead_export_filename, EXPORT_MEDIA_TYPES
+from lead_rollups import query_stats, rebuild_rollups, REBUILD_JOB_KIND
+from lead_purge import purge_leads, PURGE_JOB_KIND
+from lead_migrations import load_checkpoint, checkpoint_to_dict, MIGRATIONS as LEAD_MIGRATIONS
 from email_service import email_service
 import uvicorn
 import os
 import logging
 from dotenv import load_dotenv
 from datetime import datetime
+from contextlib import asynccontextmanager
 from typing import Dict, Any, Optional, List
 import hashlib
 import uuid
 from pydantic import BaseModel
 from typing import Optional
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, KeepTogether
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import mm
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT, TA_CENTER
-import requests
-from io import BytesIO
 from bson import ObjectId
 from bson.errors import InvalidId
 from fastapi.staticfiles import StaticFiles
@@ -52,11 +71,35 @@ content_manager = ContentManager(
     db_name=os.environ.get('DB_NAME', 'grras_database')
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background services"""
+    lead_store.attach(db)
+    if LEAD_BUFFER_ENABLED:
+        await lead_buffer.start(lead_store)
+    await lead_feed.start(db, lead_store)
+    await index_registry.start(db)
+    await publish_scheduler.start(content_manager)
+    syllabus_render_pool.start()
+    await syllabus_prerenderer.start(content_manager)
+    await export_store.start()
+    yield
+    await lead_feed.stop()
+    if LEAD_BUFFER_ENABLED:
+        await lead_buffer.stop()
+    await job_registry.shutdown()
+    await export_store.stop()
+    await syllabus_prerenderer.stop()
+    await publish_scheduler.stop()
+    syllabus_render_pool.shutdown()
+    await index_registry.stop()
+
 # Create FastAPI app
 app = FastAPI(
     title="GRRAS Solutions Training Institute API",
     description="Professional IT Training Institute API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Configuration 
@@ -246,11 +289,20 @@ async def save_content(request: ContentRequest, admin_verified: bool = Depends(v
         request.content['lastUpdated'] = datetime.utcnow().isoformat()
         request.content['adminSyncId'] = str(uuid.uuid4())[:8]
         
+        # Bulk saves may touch any post or course - apply publish schedules,
+        # recount blog facets and recompute related content once on write
+        apply_publish_schedules(request.content)
+        rebuild_blog_facets(request.content)
+        refresh_related_content(request.content)
+        
         updated_content = await content_manager.save_content(
             request.content, 
             user="admin", 
             is_draft=request.isDraft
         )
+        publish_scheduler.notify(updated_content)
+        # Re-render changed course syllabi in the background so downloads hit a warm cache
+        syllabus_prerenderer.notify(updated_content)
         
         logging.info(f"✅ Content saved successfully - AdminSyncId: {request.content.get('adminSyncId', 'N/A')}")
         
@@ -353,7 +405,6 @@ async def get_course(slug: str):
 @api_router.post("/courses/{slug}/syllabus")
 async def generate_syllabus(slug: str, name: str = Form(...), email: str = Form(...), phone: str = Form(...)):
     """Generate and download course syllabus PDF"""
-    pdf_buffer = None
     try:
         # Get course data from CMS
         content = await content_manager.get_content()
@@ -366,359 +417,33 @@ async def generate_syllabus(slug: str, name: str = Form(...), email: str = Form(
         # Get institute data from CMS
         institute = content.get("institute", {})
         branding = content.get("branding", {})
-        
-        # Extract course details with NULL SAFETY
         course_name = course.get("title") or course.get("name") or slug.replace("-", " ").title()
-        course_description = course.get("overview") or course.get("description") or ""
-        highlights = course.get("highlights") or []
-        tools = course.get("tools") or []
-        learning_outcomes = course.get("learningOutcomes") or []
-        career_roles = course.get("careerRoles") or []
-        duration = course.get("duration") or "Contact for details"
-        fees = course.get("fees") or "Contact for details"
-        level = course.get("level") or "All Levels"
-        certificate_info = course.get("certificateInfo") or "Certificate provided on successful completion"
-        eligibility = course.get("eligibility") or "Contact for eligibility criteria"
-        
-        # Ensure all list fields are actually lists
-        if not isinstance(highlights, list):
-            highlights = []
-        if not isinstance(tools, list):
-            tools = []
-        if not isinstance(learning_outcomes, list):
-            learning_outcomes = []
-        if not isinstance(career_roles, list):
-            career_roles = []
-        
-        # Generate PDF IN MEMORY
-        pdf_buffer = BytesIO()
-        
-        # Professional PDF Template with Working Headers/Footers
-        def create_header_footer(canvas_obj, doc):
-            """Create professional header and footer for each page"""
-            canvas_obj.saveState()
-            
-            page_width, page_height = A4
-            
-            # === PROFESSIONAL HEADER ===
-            # Red header background
-            canvas_obj.setFillColor(colors.HexColor('#DC2626'))
-            canvas_obj.rect(0, page_height - 15*mm, page_width, 15*mm, fill=1)
-            
-            # GRRAS logo area (try to load logo)
-            logo_url = branding.get("logoUrl", "")
-            logo_drawn = False
-            if logo_url and logo_url.startswith('http'):
-                try:
-                    response = requests.get(logo_url, timeout=5)
-                    if response.status_code == 200:
-                        logo_data = BytesIO(response.content)
-                        logo_img = Image(logo_data, width=30*mm, height=10*mm)
-                        logo_img.drawOn(canvas_obj, 15*mm, page_height - 13*mm)
-                        logo_drawn = True
-                        logging.info("✅ Logo successfully added to PDF")
-                except Exception as e:
-                    logging.warning(f"Logo load failed: {e}")
-            
-            # Institute name in header
-            canvas_obj.setFillColor(colors.white)
-            canvas_obj.setFont("Helvetica-Bold", 14)
-            institute_name = institute.get("name", "GRRAS Solutions Training Institute")
-            x_pos = 50*mm if logo_drawn else 15*mm
-            canvas_obj.drawString(x_pos, page_height - 8*mm, institute_name)
-            
-            canvas_obj.setFont("Helvetica", 10)
-            canvas_obj.drawString(x_pos, page_height - 12*mm, "www.grras.tech")
-            
-            # === PROFESSIONAL FOOTER ===
-            # Footer line
-            canvas_obj.setStrokeColor(colors.HexColor('#DC2626'))
-            canvas_obj.setLineWidth(0.5)
-            canvas_obj.line(15*mm, 15*mm, page_width - 15*mm, 15*mm)
-            
-            # Page number and contact
-            canvas_obj.setFillColor(colors.HexColor('#666666'))
-            canvas_obj.setFont("Helvetica", 9)
-            page_num = canvas_obj.getPageNumber()
-            canvas_obj.drawString(15*mm, 10*mm, f"Page {page_num}")
-            
-            # Contact info in footer
-            phone = ', '.join(institute.get("phones", ["090019 91227"]))
-            canvas_obj.drawRightString(page_width - 15*mm, 10*mm, f"Phone: {phone}")
-            
-            # Email on second line
-            email = ', '.join(institute.get("emails", ["info@grrassolutions.com"]))
-            canvas_obj.drawRightString(page_width - 15*mm, 6*mm, f"Email: {email}")
-            
-            canvas_obj.restoreState()
-        
-        # Create PDF document with proper margins for header/footer
-        doc = SimpleDocTemplate(
-            pdf_buffer,
-            pagesize=A4,
-            rightMargin=15*mm,
-            leftMargin=15*mm,
-            topMargin=20*mm,  # Space for header
-            bottomMargin=25*mm  # Space for footer
-        )
-        
-        styles = getSampleStyleSheet()
-        
-        # GRRAS PDF Typography Styles - following specific rules
-        title_style = ParagraphStyle(
-            'CourseTitle',
-            parent=styles['Heading1'],
-            fontSize=22,
-            spaceAfter=12,
-            spaceBefore=15,
-            textColor=colors.HexColor('#DC2626'),
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        section_heading_style = ParagraphStyle(
-            'SectionHeading',
-            parent=styles['Heading2'],
-            fontSize=13,
-            spaceBefore=15,
-            spaceAfter=8,
-            textColor=colors.white,
-            fontName='Helvetica-Bold',
-            backColor=colors.HexColor('#DC2626'),
-            borderPadding=6,
-            alignment=TA_LEFT,
-            keepWithNext=True  # Keep heading with content
-        )
-        
-        body_text_style = ParagraphStyle(
-            'BodyText',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=5,
-            leading=13,
-            textColor=colors.HexColor('#374151'),
-            alignment=TA_LEFT,
-            firstLineIndent=0
-        )
-        
-        bullet_list_style = ParagraphStyle(
-            'BulletList',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=3,
-            leading=13,
-            leftIndent=12,
-            bulletIndent=8,
-            textColor=colors.HexColor('#374151')
-        )
-        
-        number_list_style = ParagraphStyle(
-            'NumberList',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=4,
-            leading=13,
-            leftIndent=15,
-            textColor=colors.HexColor('#374151')
-        )
-        
-        certification_box_style = ParagraphStyle(
-            'CertificationBox',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=8,
-            leading=13,
-            textColor=colors.HexColor('#0F766E'),
-            backColor=colors.HexColor('#F0FDFA'),
-            borderColor=colors.HexColor('#14B8A6'),
-            borderWidth=1,
-            borderPadding=8,
-            alignment=TA_LEFT
-        )
-        
-        info_label_style = ParagraphStyle(
-            'InfoLabel',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=2,
-            leading=12,
-            textColor=colors.HexColor('#374151'),
-            fontName='Helvetica'
-        )
-        
-        # PDF Content Generation - Following GRRAS Rules
-        content_elements = []
-        
-        # Course Title
-        content_elements.append(Spacer(1, 10*mm))
-        content_elements.append(Paragraph("COURSE SYLLABUS", title_style))
-        content_elements.append(Paragraph(f"{course_name}", title_style))
-        content_elements.append(Spacer(1, 8*mm))
-        
-        # Course Overview (if available)
-        if course_description:
-            content_elements.append(Paragraph("Course Overview", section_heading_style))
-            content_elements.append(Paragraph(course_description, body_text_style))
-            content_elements.append(Spacer(1, 8*mm))
-        
-        # Course Information - Label: Value format with ₹ for fee
-        content_elements.append(Paragraph("Course Information", section_heading_style))
-        
-        # Format fee with safe rupee symbol (avoid encoding issues)
-        formatted_fee = str(fees) if fees else "Contact for details"
-        if fees and fees.lower() not in ['contact for details', 'on request', 'varies']:
-            # Add Rs. if not already present and contains numbers
-            if not any(symbol in str(fees).lower() for symbol in ['rs', 'inr', 'rupee']) and any(char.isdigit() for char in str(fees)):
-                formatted_fee = f"Rs. {fees}"
-            elif '₹' in str(fees):
-                # Replace ₹ with Rs. to avoid encoding issues
-                formatted_fee = str(fees).replace('₹', 'Rs.')
-            elif '■' in str(fees):
-                # Fix corrupted rupee symbol
-                formatted_fee = str(fees).replace('■', 'Rs. ')
-        
-        course_info_items = [
-            f"<b>Duration:</b> {duration}",
-            f"<b>Level:</b> {level}",
-            f"<b>Fee:</b> {formatted_fee}",
-            f"<b>Eligibility:</b> {eligibility}"
-        ]
-        
-        for item in course_info_items:
-            content_elements.append(Paragraph(item, info_label_style))
-        
-        content_elements.append(Spacer(1, 8*mm))
-        
-        # Course Highlights Section (NO DUPLICATES)
-        if highlights:
-            content_elements.append(Paragraph("Course Highlights", section_heading_style))
-            
-            for highlight in highlights[:8]:  # Limit for space
-                # Clean highlight text - remove any unicode issues
-                clean_highlight = str(highlight).replace('✓', '•').replace('$', '').replace('\\', '')
-                content_elements.append(Paragraph(f"• {clean_highlight}", bullet_list_style))
-            
-            content_elements.append(Spacer(1, 8*mm))
-        
-        # Learning Outcomes Section (NO DUPLICATES)
-        if learning_outcomes:
-            content_elements.append(Paragraph("What You'll Learn", section_heading_style))
-            
-            for i, outcome in enumerate(learning_outcomes[:8], 1):
-                # Clean outcome text
-                clean_outcome = str(outcome).replace('$', '').replace('\\', '')
-                content_elements.append(Paragraph(f"{i}. {clean_outcome}", number_list_style))
-            
-            content_elements.append(Spacer(1, 8*mm))
-        
-        # Tools & Technologies Section (NO DUPLICATES) 
-        if tools:
-            content_elements.append(Paragraph("Tools & Technologies", section_heading_style))
-            
-            # Create clean 2-column layout (better fitting)
-            tools_data = []
-            for i in range(0, len(tools), 2):
-                row = []
-                for j in range(2):
-                    if i + j < len(tools):
-                        clean_tool = str(tools[i + j]).replace('$', '').replace('\\', '')
-                        row.append(f"• {clean_tool}")
-                    else:
-                        row.append("")
-                tools_data.append(row)
-            
-            if tools_data:
-                tools_table = Table(tools_data, colWidths=[80*mm, 80*mm])
-                tools_table.setStyle(TableStyle([
-                    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#374151')),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 5),
-                    ('TOPPADDING', (0, 0), (-1, -1), 3),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-                ]))
-                content_elements.append(tools_table)
-            content_elements.append(Spacer(1, 8*mm))
-        
-        # Career Opportunities Section (NO DUPLICATES)
-        if career_roles:
-            content_elements.append(Paragraph("Career Opportunities", section_heading_style))
-            
-            for role in career_roles[:6]:
-                clean_role = str(role).replace('$', '').replace('\\', '')
-                content_elements.append(Paragraph(f"• {clean_role}", bullet_list_style))
-            
-            content_elements.append(Spacer(1, 8*mm))
-        
-        # Certification Section (NO DUPLICATES) - Clean and Professional
-        content_elements.append(Paragraph("Certification Details", section_heading_style))
-        
-        # Clean certificate info
-        clean_cert_info = str(certificate_info).replace('$', '').replace('\\', '')
-        content_elements.append(Paragraph(clean_cert_info, body_text_style))
-        content_elements.append(Spacer(1, 4*mm))
-        
-        # Certificate benefits - no unicode symbols that cause issues
-        cert_benefits = [
-            "• Industry-recognized certificate upon completion",
-            "• Digital verification available", 
-            "• LinkedIn profile enhancement ready",
-            "• Lifetime validity with institute backing"
-        ]
         
-        for benefit in cert_benefits:
-            content_elements.append(Paragraph(benefit, bullet_list_style))
+        # Serve from the PDF cache - the key changes whenever the course,
+        # institute, branding, template version or date line changes
+        generated_on = generation_date()
+        logo = await logo_cache.get(branding, content)
+        cache_key = syllabus_cache.make_key(course, institute, branding, slug, generated_on, logo_digest(logo))
+        pdf_content = syllabus_cache.get(slug, cache_key)
         
-
-        
-        # Admission Process - Numbered list with consistent punctuation
-        content_elements.append(Paragraph("Admission Process", section_heading_style))
-        
-        admission_steps = [
-            "Submit your inquiry online or visit our campus for course consultation.",
-            "Meet with our expert counselors to discuss career goals and course fit.", 
-            "Complete admission with required documents and secure your seat.",
-            "Join orientation session and begin your learning journey."
-        ]
-        
-        for i, step in enumerate(admission_steps, 1):
-            content_elements.append(Paragraph(f"{i}. {step}", number_list_style))
-        
-        content_elements.append(Spacer(1, 10*mm))
-        
-        # Call-to-Action
-        cta_content = "🚀 <b>Ready to Transform Your Career? Join GRRAS Today!</b><br/><br/>"
-        cta_content += "Contact our counselors for personalized guidance and enrollment assistance.<br/>"
-        cta_content += "Visit us at: https://www.grras.tech"
-        
-        content_elements.append(Paragraph(cta_content, certification_box_style))
-        
-        # Add generation date - DD Mon YYYY format
-        current_date = datetime.now().strftime("%d %b %Y")
-        content_elements.append(Spacer(1, 8*mm))
-        content_elements.append(Paragraph(f"<i>Generated on: {current_date}</i>", body_text_style))
-        
-        # Build PDF with WORKING GRRAS template
-        try:
-            # ENSURE header/footer function is called for EVERY page
-            doc.build(content_elements, 
-                     onFirstPage=create_header_footer, 
-                     onLaterPages=create_header_footer)
-            logging.info(f"✅ GRRAS PDF with headers/footers generated for {course_name}")
-        except Exception as e:
-            logging.error(f"PDF generation error: {e}")
-            # Fallback without headers if main generation fails
+        if pdf_content is None:
             try:
-                pdf_buffer.seek(0)  # Reset buffer
-                pdf_buffer.truncate(0)  # Clear buffer completely
-                simple_doc = SimpleDocTemplate(pdf_buffer, pagesize=A4)
-                simple_doc.build(content_elements)
-                logging.info("✅ Fallback PDF generation (without headers) successful")
-            except Exception as fallback_error:
-                logging.error(f"Complete PDF generation failure: {fallback_error}")
-                raise HTTPException(status_code=422, detail=f"Failed to generate syllabus: {str(fallback_error)}")
+                # Rendered in the worker pool so the event loop keeps serving other requests
+                pdf_content = await syllabus_render_pool.render(course, institute, branding, slug, generated_on, logo)
+            except SyllabusQueueFull as e:
+                # Shed load instead of queueing without bound - clients retry later
+                raise HTTPException(
+                    status_code=503,
+                    detail="Syllabus downloads are busy right now, please try again shortly",
+                    headers={"Retry-After": str(e.retry_after)}
+                )
+            except SyllabusRenderTimeout:
+                raise HTTPException(status_code=503, detail="Syllabus generation is taking too long, please try again")
+            except SyllabusRenderError as e:
+                raise HTTPException(status_code=422, detail=f"Failed to generate syllabus: {str(e)}")
+            syllabus_cache.put(slug, cache_key, pdf_content)
+        else:
+            logging.info(f"✅ Syllabus PDF served from cache for {course_name}")
         
         # Store lead information (non-blocking)
         try:
@@ -728,24 +453,16 @@ async def generate_syllabus(slug: str, name: str = Form(...), email: str = Form(
                 "phone": phone,
                 "course": course_name,
                 "type": "syllabus_download",
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow()
             }
             
             # Save to MongoDB
-            collection = db.leads
-            await collection.insert_one(lead_data)
+            await lead_store.insert(lead_data)
             logging.info(f"✅ Lead saved for syllabus download: {email}")
             
         except Exception as e:
             logging.warning(f"Failed to store lead data: {e}")
         
-        # Return PDF from memory
-        pdf_buffer.seek(0)
-        pdf_content = pdf_buffer.getvalue()
-        
-        if not pdf_content:
-            raise HTTPException(status_code=422, detail="Failed to generate syllabus: PDF content is empty")
-        
         # Create safe filename
         safe_filename = f"{slug}-syllabus.pdf"
         
@@ -765,10 +482,82 @@ async def generate_syllabus(slug: str, name: str = Form(...), email: str = Form(
         error_details = traceback.format_exc()
         logging.error(f"Error generating syllabus for {slug}: {e}\nStack trace: {error_details}")
         raise HTTPException(status_code=422, detail=f"Failed to generate syllabus: {str(e)}")
-    finally:
-        # Clean up resources
-        if pdf_buffer:
-            pdf_buffer.close()
+
+@api_router.get("/admin/syllabi/metrics")
+async def get_syllabus_metrics(admin_verified: bool = Depends(verify_admin_token)):
+    """Syllabus render pool and PDF cache metrics (Admin only)"""
+    return {
+        "render_pool": syllabus_render_pool.metrics(),
+        "pdf_cache": syllabus_cache.stats(),
+        "logo_cache": logo_cache.stats(),
+        "prerender": syllabus_prerenderer.status(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@api_router.get("/admin/syllabi/prerender")
+async def get_syllabus_prerender_status(admin_verified: bool = Depends(verify_admin_token)):
+    """Background syllabus pre-render status with per-course render times (Admin only)"""
+    return {
+        **syllabus_prerenderer.status(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@api_router.post("/admin/syllabi/export")
+async def start_syllabus_export(admin_verified: bool = Depends(verify_admin_token)):
+    """Start a background job that builds a ZIP of every visible course syllabus (Admin only)"""
+    try:
+        content = await content_manager.get_content()
+        revision = content_revision(content)
+        
+        # An export of the same content is already running - report that one
+        job = job_registry.find_active(EXPORT_JOB_KIND, revision=revision)
+        if job is None:
+            job = job_registry.start(
+                EXPORT_JOB_KIND,
+                lambda job: export_syllabus_pack(job, content),
+                params={"revision": revision}
+            )
+        
+        return {
+            **job.to_dict(),
+            "status_url": f"/api/admin/syllabi/export/{job.id}",
+            "download_url": f"/api/admin/syllabi/export/{job.id}/download"
+        }
+    except Exception as e:
+        logging.error(f"Error starting syllabus export: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start syllabus export")
+
+@api_router.get("/admin/syllabi/export/{job_id}")
+async def get_syllabus_export_status(job_id: str, admin_verified: bool = Depends(verify_admin_token)):
+    """Progress of a syllabus export job (Admin only)"""
+    job = job_registry.get(job_id)
+    if not job or job.kind != EXPORT_JOB_KIND:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job.to_dict()
+
+@api_router.get("/admin/syllabi/export/{job_id}/download")
+async def download_syllabus_export(job_id: str, admin_verified: bool = Depends(verify_admin_token)):
+    """Download the ZIP of a finished syllabus export job (Admin only)"""
+    job = job_registry.get(job_id)
+    if not job or job.kind != EXPORT_JOB_KIND:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+    
+    path = export_store.directory / job.result["file"]
+    # Pinned until the response has been sent, so eviction cannot delete it mid-stream
+    export_store.pin(path)
+    if not path.exists():
+        export_store.unpin(path)
+        raise HTTPException(status_code=410, detail="Export has expired, please start a new one")
+    export_store.touch(path)
+    
+    return FileResponse(
+        path,
+        media_type="application/zip",
+        filename=f"grras-syllabi-{job.result['generated_on'].replace(' ', '-')}.zip",
+        background=BackgroundTask(export_store.unpin, path)
+    )
 
 # New Simple Leads API
 @api_router.get("/simple-leads")
@@ -795,7 +584,7 @@ async def get_simple_leads(token: str):
                 "phone": lead.get("phone", "No Phone"),
                 "message": lead.get("message", "No Message"),
                 "course": lead.get("course", "General"),
-                "timestamp": str(lead.get("timestamp", "Unknown Date")),
+                "timestamp": format_timestamp(lead.get("timestamp")),
                 "source": lead.get("source", "website")
             }
             clean_leads.append(clean_lead)
@@ -810,6 +599,183 @@ async def get_simple_leads(token: str):
         logging.error(f"Error fetching leads: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch leads")
 
+@api_router.get("/admin/leads")
+async def list_leads(
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    course: Optional[str] = None,
+    type: Optional[str] = None,
+    source: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    q: Optional[str] = None,
+    admin_verified: bool = Depends(verify_admin_token)
+):
+    """Newest-first leads, one keyset page at a time, filtered in MongoDB (Admin only)"""
+    try:
+        limit = max(1, min(limit, 200))
+        query = build_lead_filter(course, type, source, date_from, date_to, q)
+        page_query = after_cursor(query, cursor)
+
+        leads = await db.leads.find(page_query, LEAD_LIST_PROJECTION).sort(LEAD_SORT).limit(limit + 1).to_list(length=limit + 1)
+        has_more = len(leads) > limit
+        leads = leads[:limit]
+        total, total_is_estimate = await lead_count_cache.count(db.leads, query)
+
+        return {
+            "success": True,
+            "leads": [serialize_lead(lead) for lead in leads],
+            "next_cursor": encode_cursor(leads[-1]) if has_more else None,
+            "has_more": has_more,
+            "total": total,
+            "total_is_estimate": total_is_estimate,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except LeadQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error listing leads: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch leads")
+
+@api_router.get("/admin/leads/export")
+async def export_leads(
+    format: str = "csv",
+    course: Optional[str] = None,
+    type: Optional[str] = None,
+    source: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    q: Optional[str] = None,
+    admin_verified: bool = Depends(verify_admin_token)
+):
+    """Stream every matching lead as CSV or NDJSON (Admin only)"""
+    try:
+        if format not in EXPORT_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+        query = build_lead_filter(course, type, source, date_from, date_to, q)
+        logging.info(f"📤 Streaming lead export ({format})")
+        return StreamingResponse(
+            stream_leads(db.leads, query, format),
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers={
+                "Content-Disposition": f"attachment; filename={lead_export_filename(format)}",
+                "Cache-Control": "no-store"
+            }
+        )
+    except HTTPException:
+        raise
+    except LeadQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error exporting leads: {e}")
+        raise HTTPException(status_code=500, detail="Failed to export leads")
+
+@api_router.get("/admin/leads/stream")
+async def stream_leads_live(request: Request, token: Optional[str] = None):
+    """Newly inserted and merged leads as Server-Sent Events (Admin only)
+
+    EventSource cannot send an Authorization header, so the admin token is
+    also accepted as ?token=, like /api/simple-leads.
+    """
+    header = request.headers.get("authorization", "")
+    supplied = token or (header[7:] if header.lower().startswith("bearer ") else None)
+    expected_token = hashlib.sha256(f"grras_admin_{SIMPLE_ADMIN_TOKEN}".encode()).hexdigest()
+    if supplied != expected_token:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+    try:
+        queue = lead_feed.subscribe()
+    except FeedFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        lead_feed.events(queue, request.is_disconnected, request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.get("/admin/leads/stats")
+async def get_lead_stats(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    interval: str = "day",
+    course: Optional[str] = None,
+    type: Optional[str] = None,
+    source: Optional[str] = None,
+    admin_verified: bool = Depends(verify_admin_token)
+):
+    """Lead time series and breakdowns by course, type and source from the daily rollups (Admin only)"""
+    try:
+        stats = await query_stats(
+            db, date_from, date_to, interval,
+            {"course": course, "type": type, "source": source}
+        )
+        return {**stats, "ingest": lead_store.stats(), "feed": lead_feed.stats(), "timestamp": datetime.utcnow().isoformat()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error fetching lead stats: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch lead stats")
+
+@api_router.post("/admin/leads/stats/rebuild")
+async def rebuild_lead_stats(admin_verified: bool = Depends(verify_admin_token)):
+    """Recompute the daily rollups from all leads in the background (Admin only)"""
+    try:
+        job = job_registry.find_active(REBUILD_JOB_KIND)
+        if job is None:
+            job = job_registry.start(REBUILD_JOB_KIND, lambda job: rebuild_rollups(job, db))
+        return job.to_dict()
+    except Exception as e:
+        logging.error(f"Error starting lead stats rebuild: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start stats rebuild")
+
+@api_router.get("/admin/leads/indexes")
+async def get_lead_indexes(admin_verified: bool = Depends(verify_admin_token)):
+    """Registered indexes with their build status and $indexStats usage (Admin only)"""
+    try:
+        return {
+            **await index_registry.report(db),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logging.error(f"Error fetching index report: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch index report")
+
+@api_router.post("/admin/leads/migrations/{name}")
+async def start_lead_migration(name: str, restart: bool = False, admin_verified: bool = Depends(verify_admin_token)):
+    """Run a lead migration (timestamps, identities) in the background (Admin only)"""
+    migration = LEAD_MIGRATIONS.get(name)
+    if migration is None:
+        raise HTTPException(status_code=404, detail="Unknown migration")
+    try:
+        job = job_registry.find_active(migration["job_kind"])
+        if job is None:
+            job = job_registry.start(
+                migration["job_kind"],
+                lambda job: migration["runner"](job, db, restart=restart),
+                {"restart": restart}
+            )
+        return job.to_dict()
+    except Exception as e:
+        logging.error(f"Error starting lead migration {name}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start migration")
+
+@api_router.get("/admin/leads/migrations/{name}")
+async def get_lead_migration(name: str, admin_verified: bool = Depends(verify_admin_token)):
+    """Checkpoint and latest job of a lead migration (Admin only)"""
+    migration = LEAD_MIGRATIONS.get(name)
+    if migration is None:
+        raise HTTPException(status_code=404, detail="Unknown migration")
+    try:
+        jobs = job_registry.list(migration["job_kind"])
+        return {
+            "checkpoint": checkpoint_to_dict(await load_checkpoint(db, migration["checkpoint"])),
+            "remaining": await db.leads.count_documents(migration["pending"]),
+            "job": jobs[-1].to_dict() if jobs else None
+        }
+    except Exception as e:
+        logging.error(f"Error fetching lead migration {name}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch migration status")
+
 class BulkDeleteRequest(BaseModel):
     lead_ids: List[str]
     
@@ -820,6 +786,25 @@ class BulkDeleteRequest(BaseModel):
             }
         }
 
+class LeadPurgeRequest(BaseModel):
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    type: Optional[str] = None
+    course: Optional[str] = None
+    source: Optional[str] = None
+    email_pattern: Optional[str] = None
+    dry_run: bool = False
+    rebuild_stats: bool = False
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "email_pattern": "*@example.com",
+                "date_to": "2025-08-31",
+                "dry_run": True
+            }
+        }
+
 class BlogPostRequest(BaseModel):
     title: str
     slug: str
@@ -833,34 +818,27 @@ class BlogPostRequest(BaseModel):
     meta_title: Optional[str] = None
     meta_description: Optional[str] = None
     meta_keywords: Optional[str] = None
+    publish_at: Optional[str] = None
+    unpublish_at: Optional[str] = None
 
 @api_router.delete("/leads/bulk")
 async def delete_multiple_leads(request: BulkDeleteRequest, admin_verified: bool = Depends(verify_admin_token)):
     """Delete multiple leads (Admin only)"""
-    logging.info(f"🔍 Bulk delete endpoint called with request: {request}")
-    logging.info(f"🔍 Request lead_ids: {request.lead_ids}")
-    logging.info(f"🔍 Admin verified: {admin_verified}")
     try:
-        logging.info("🔍 Starting bulk delete validation...")
         # Validate all ObjectId formats
         object_ids = []
         for lead_id in request.lead_ids:
             try:
-                logging.info(f"🔍 Converting lead_id: {lead_id} (type: {type(lead_id)})")
-                object_id = ObjectId(lead_id)
-                object_ids.append(object_id)
-                logging.info(f"✅ Successfully converted: {object_id}")
-            except InvalidId as e:
-                logging.error(f"❌ Invalid ObjectId: {lead_id} - {e}")
-                raise HTTPException(status_code=400, detail=f"Invalid lead ID format: {lead_id}")
-            except Exception as e:
-                logging.error(f"❌ Unexpected error converting {lead_id}: {e}")
+                object_ids.append(ObjectId(lead_id))
+            except (InvalidId, TypeError):
+                logging.warning(f"❌ Bulk delete rejected - invalid lead ID: {lead_id}")
                 raise HTTPException(status_code=400, detail=f"Invalid lead ID format: {lead_id}")
         
         collection = db.leads
         result = await collection.delete_many({"_id": {"$in": object_ids}})
+        await lead_store.forget(object_ids)
         
-        logging.info(f"✅ Bulk deleted {result.deleted_count} leads")
+        logging.info(f"✅ Bulk deleted {result.deleted_count} of {len(object_ids)} requested leads")
         return {
             "message": f"Successfully deleted {result.deleted_count} leads",
             "deleted_count": result.deleted_count,
@@ -873,6 +851,43 @@ async def delete_multiple_leads(request: BulkDeleteRequest, admin_verified: bool
         logging.error(f"Error bulk deleting leads: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete leads")
 
+@api_router.post("/admin/leads/purge")
+async def purge_leads_by_filter(request: LeadPurgeRequest, admin_verified: bool = Depends(verify_admin_token)):
+    """Archive and delete every lead matching a filter, in the background (Admin only)"""
+    try:
+        query = build_lead_filter(
+            request.course, request.type, request.source,
+            request.date_from, request.date_to,
+            email_pattern=request.email_pattern
+        )
+        if not query:
+            raise HTTPException(status_code=400, detail="A purge needs at least one filter")
+
+        if request.dry_run:
+            return {"dry_run": True, "matching": await db.leads.count_documents(query)}
+
+        job = job_registry.start(
+            PURGE_JOB_KIND,
+            lambda job: purge_leads(job, db, query, rebuild_stats=request.rebuild_stats),
+            request.dict(exclude={"dry_run"}, exclude_none=True)
+        )
+        return job.to_dict()
+    except HTTPException:
+        raise
+    except LeadQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error starting lead purge: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start lead purge")
+
+@api_router.get("/admin/leads/purge/{job_id}")
+async def get_lead_purge_status(job_id: str, admin_verified: bool = Depends(verify_admin_token)):
+    """Progress of a lead purge job (Admin only)"""
+    job = job_registry.get(job_id)
+    if job is None or job.kind != PURGE_JOB_KIND:
+        raise HTTPException(status_code=404, detail="Purge job not found")
+    return job.to_dict()
+
 @api_router.delete("/leads/{lead_id}")
 async def delete_lead(lead_id: str, admin_verified: bool = Depends(verify_admin_token)):
     """Delete a specific lead (Admin only)"""
@@ -885,6 +900,7 @@ async def delete_lead(lead_id: str, admin_verified: bool = Depends(verify_admin_
         
         collection = db.leads
         result = await collection.delete_one({"_id": object_id})
+        await lead_store.forget([object_id])
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Lead not found")
@@ -922,8 +938,7 @@ async def submit_contact(
             "notes": message  # Use message as notes for email notification
         }
         
-        collection = db.leads
-        result = await collection.insert_one(lead_data)
+        result = await lead_store.insert(lead_data)
         
         # Send email notification to admin
         try:
@@ -953,7 +968,7 @@ async def submit_contact(
             logging.error(f"Email notification error: {email_error}")
             # Don't fail the lead submission if email fails
         
-        logging.info(f"✅ Contact form submitted: {name} ({email}) - MongoDB ID: {result.inserted_id}")
+        logging.info(f"✅ Contact form submitted: {name} ({email}) - MongoDB ID: {result['lead_id']}")
         return {"message": "Contact form submitted successfully", "lead_id": lead_data["id"]}
     except Exception as e:
         logging.error(f"Error submitting contact form: {e}")
@@ -967,50 +982,29 @@ async def get_blog_posts(
     limit: int = 12,
     category: Optional[str] = None,
     tag: Optional[str] = None,
+    tags: Optional[str] = None,
     search: Optional[str] = None
 ):
-    """Get paginated blog posts"""
+    """Get paginated blog post summaries (full bodies are only served by /blog/{slug})
+    
+    `tags` takes a comma-separated list; posts must carry every listed tag.
+    """
     try:
         content = await content_manager.get_content()
-        blog_section = content.get("blog", {})
-        blog_posts = blog_section.get("posts", []) if isinstance(blog_section, dict) else []
-        
-        # Filter published posts only for public API (check status field for existing posts)
-        published_posts = [
-            post for post in blog_posts 
-            if post.get("published", True) or post.get("status") == "published"
-        ]
-        
-        # Apply filters
-        if category:
-            published_posts = [post for post in published_posts if post.get("category", "").lower() == category.lower()]
+        blog_index = blog_index_cache.get(content)
         
+        tag_filters = [t.strip() for t in (tags or "").split(",") if t.strip()]
         if tag:
-            published_posts = [post for post in published_posts if tag.lower() in [t.lower() for t in post.get("tags", [])]]
-        
-        if search:
-            search_lower = search.lower()
-            published_posts = [
-                post for post in published_posts 
-                if search_lower in post.get("title", "").lower() 
-                or search_lower in post.get("content", "").lower()
-                or search_lower in post.get("excerpt", "").lower()
-            ]
+            tag_filters.append(tag)
         
-        # Sort by created date (newest first)
-        published_posts.sort(key=lambda x: x.get("created_at", ""), reverse=True)
+        # Filtering and newest-first ordering come from the per-revision index
+        positions = blog_index.filter_positions(category=category, tags=tag_filters, search=search)
         
         # Pagination
-        total = len(published_posts)
+        total = len(positions)
         start = (page - 1) * limit
         end = start + limit
-        paginated_posts = published_posts[start:end]
-        
-        # Calculate reading time for each post
-        for post in paginated_posts:
-            word_count = len(post.get("content", "").split())
-            reading_time = max(1, round(word_count / 200))  # 200 words per minute
-            post["reading_time"] = reading_time
+        paginated_posts = [blog_index.summaries[i] for i in positions[start:end]]
         
         return {
             "posts": paginated_posts,
@@ -1031,23 +1025,8 @@ async def get_blog_categories():
     """Get all blog categories with post counts"""
     try:
         content = await content_manager.get_content()
-        blog_section = content.get("blog", {})
-        blog_posts = blog_section.get("posts", []) if isinstance(blog_section, dict) else []
-        
-        # Count posts by category
-        category_counts = {}
-        for post in blog_posts:
-            if post.get("published", True) or post.get("status") == "published":
-                # Use category field or derive from tags
-                category = post.get("category")
-                if not category and post.get("tags"):
-                    # Use first tag as category if no category field
-                    category = post.get("tags", ["general"])[0]
-                else:
-                    category = category or "general"
-                category_counts[category] = category_counts.get(category, 0) + 1
-        
-        return {"categories": category_counts}
+        facets = blog_index_cache.get(content).facets
+        return {"categories": facets["categories"]}
     except Exception as e:
         logging.error(f"Error fetching blog categories: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch blog categories")
@@ -1057,17 +1036,8 @@ async def get_blog_tags():
     """Get all blog tags with usage counts"""
     try:
         content = await content_manager.get_content()
-        blog_section = content.get("blog", {})
-        blog_posts = blog_section.get("posts", []) if isinstance(blog_section, dict) else []
-        
-        # Count tags usage
-        tag_counts = {}
-        for post in blog_posts:
-            if post.get("published", True) or post.get("status") == "published":
-                for tag in post.get("tags", []):
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        return {"tags": tag_counts}
+        facets = blog_index_cache.get(content).facets
+        return {"tags": facets["tags"]}
     except Exception as e:
         logging.error(f"Error fetching blog tags: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch blog tags")
@@ -1077,34 +1047,38 @@ async def get_blog_post(slug: str):
     """Get individual blog post by slug"""
     try:
         content = await content_manager.get_content()
-        blog_section = content.get("blog", {})
-        blog_posts = blog_section.get("posts", []) if isinstance(blog_section, dict) else []
+        blog_index = blog_index_cache.get(content)
         
-        # Find post by slug (check both published field and status)
-        post = next((
-            p for p in blog_posts 
-            if p.get("slug") == slug and (p.get("published", True) or p.get("status") == "published")
-        ), None)
+        # Find published post by slug
+        post = blog_index.get_post(slug)
         
         if not post:
             raise HTTPException(status_code=404, detail="Blog post not found")
         
-        # Calculate reading time
-        word_count = len(post.get("body", post.get("content", "")).split())
-        reading_time = max(1, round(word_count / 200))
-        post["reading_time"] = reading_time
-        
-        # Get related posts (same category, different slug)
-        related_posts = [
-            p for p in blog_posts 
-            if p.get("category") == post.get("category") 
-            and p.get("slug") != slug 
-            and p.get("published", True)
-        ][:3]  # Limit to 3 related posts
+        # Index entries are shared between requests - return a copy
+        post = {**post, "reading_time": blog_index.get_summary(slug)["reading_time"]}
+        
+        # Related posts and courses are precomputed when content is written
+        related_posts = blog_index.related_posts(slug)
+        
+        courses_by_slug = {c.get("slug"): c for c in content.get("courses", []) if c.get("visible", True)}
+        related_courses = [
+            {
+                "slug": course_slug,
+                "title": courses_by_slug[course_slug].get("title"),
+                "oneLiner": courses_by_slug[course_slug].get("oneLiner"),
+                "thumbnailUrl": courses_by_slug[course_slug].get("thumbnailUrl"),
+                "duration": courses_by_slug[course_slug].get("duration"),
+                "level": courses_by_slug[course_slug].get("level")
+            }
+            for course_slug in blog_index.related_course_slugs(slug)
+            if course_slug in courses_by_slug
+        ]
         
         return {
             "post": post,
-            "related_posts": related_posts
+            "related_posts": related_posts,
+            "related_courses": related_courses
         }
     except HTTPException:
         raise
@@ -1149,17 +1123,25 @@ async def create_blog_post(post: BlogPostRequest, admin_verified: bool = Depends
             "updated_at": datetime.utcnow().isoformat(),
             "meta_title": post.meta_title or post.title,
             "meta_description": post.meta_description or (post.excerpt or post.content[:160]),
-            "meta_keywords": post.meta_keywords or ", ".join(post.tags)
+            "meta_keywords": post.meta_keywords or ", ".join(post.tags),
+            "publishAt": post.publish_at,
+            "unpublishAt": post.unpublish_at
         }
         
+        apply_publish_schedule(new_post)
+        precompute_post_fields(new_post)
+        
         # Check for duplicate slug
         if any(p.get("slug") == post.slug for p in blog_posts):
             raise HTTPException(status_code=400, detail="Blog post with this slug already exists")
         
         blog_posts.append(new_post)
+        update_blog_facets(content, new_post=new_post)
+        refresh_related_content(content)
         
         # Save content
-        await content_manager.save_content(content, user="admin", is_draft=False)
+        updated_content = await content_manager.save_content(content, user="admin", is_draft=False)
+        publish_scheduler.notify(updated_content)
         
         logging.info(f"✅ Blog post created: {post.title} ({post.slug})")
         return {"message": "Blog post created successfully", "post": new_post}
@@ -1208,14 +1190,24 @@ async def update_blog_post(post_id: str, post: BlogPostRequest, admin_verified:
             "updated_at": datetime.utcnow().isoformat(),
             "meta_title": post.meta_title or post.title,
             "meta_description": post.meta_description or (post.excerpt or post.content[:160]),
-            "meta_keywords": post.meta_keywords or ", ".join(post.tags)
+            "meta_keywords": post.meta_keywords or ", ".join(post.tags),
+            # Omitted keeps the stored schedule; an explicit null or "" clears it
+            "publishAt": (post.publish_at or None) if "publish_at" in post.model_fields_set else existing_post.get("publishAt"),
+            "unpublishAt": (post.unpublish_at or None) if "unpublish_at" in post.model_fields_set else existing_post.get("unpublishAt")
         }
         
+        # Publish state comes from the request and the schedule, not the old status
+        updated_post["status"] = "published" if post.published else "draft"
+        apply_publish_schedule(updated_post)
+        precompute_post_fields(updated_post)
         blog_posts[post_index] = updated_post
         content["blog"]["posts"] = blog_posts
+        update_blog_facets(content, old_post=existing_post, new_post=updated_post)
+        refresh_related_content(content)
         
         # Save content
-        await content_manager.save_content(content, user="admin", is_draft=False)
+        updated_content = await content_manager.save_content(content, user="admin", is_draft=False)
+        publish_scheduler.notify(updated_content)
         
         logging.info(f"✅ Blog post updated: {post.title} ({post.slug})")
         return {"message": "Blog post updated successfully", "post": updated_post}
@@ -1235,16 +1227,18 @@ async def delete_blog_post(post_id: str, admin_verified: bool = Depends(verify_a
         blog_posts = blog_section.get("posts", []) if isinstance(blog_section, dict) else []
         
         # Find and remove post
-        initial_count = len(blog_posts)
-        blog_posts = [p for p in blog_posts if p.get("id") != post_id]
+        removed_post = next((p for p in blog_posts if p.get("id") == post_id), None)
         
-        if len(blog_posts) == initial_count:
+        if removed_post is None:
             raise HTTPException(status_code=404, detail="Blog post not found")
         
-        content["blog"]["posts"] = blog_posts
+        content["blog"]["posts"] = [p for p in blog_posts if p.get("id") != post_id]
+        update_blog_facets(content, old_post=removed_post)
+        refresh_related_content(content)
         
         # Save content
-        await content_manager.save_content(content, user="admin", is_draft=False)
+        updated_content = await content_manager.save_content(content, user="admin", is_draft=False)
+        publish_scheduler.notify(updated_content)
         
         logging.info(f"✅ Blog post deleted: {post_id}")
         return {"message": "Blog post deleted successfully"}
@@ -1455,6 +1449,48 @@ async def sitemap_xml():
     
 # ---------- SITEMAP: end ----------
 
+# ✅ BLOG FEEDS (RSS / Atom / JSON Feed) - rendered once per content revision
+from email.utils import parsedate_to_datetime
+
+async def _serve_feed(request: Request, kind: str, category: Optional[str], tag: Optional[str]):
+    base_url = os.environ.get("BASE_URL", "https://www.grras.tech").rstrip("/")
+    content = await content_manager.get_content()
+    feed = feed_cache.get(blog_index_cache.get(content), content, kind, base_url, category=category, tag=tag)
+
+    headers = {
+        "ETag": feed.etag,
+        "Last-Modified": feed.last_modified_header,
+        "Cache-Control": "public, max-age=300"
+    }
+
+    # Conditional GET - ETag wins over the date when both are sent
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        if feed.etag in [value.strip() for value in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get("if-modified-since"):
+        try:
+            if feed.last_modified <= parsedate_to_datetime(request.headers["if-modified-since"]):
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+
+    return Response(content=feed.body, media_type=feed.media_type, headers=headers)
+
+@app.get("/blog/rss.xml")
+async def blog_rss_feed(request: Request, category: Optional[str] = None, tag: Optional[str] = None):
+    return await _serve_feed(request, RSS, category, tag)
+
+@app.get("/blog/atom.xml")
+async def blog_atom_feed(request: Request, category: Optional[str] = None, tag: Optional[str] = None):
+    return await _serve_feed(request, ATOM, category, tag)
+
+@app.get("/blog/feed.json")
+async def blog_json_feed(request: Request, category: Optional[str] = None, tag: Optional[str] = None):
+    return await _serve_feed(request, JSON_FEED, category, tag)
+
+# ---------- BLOG FEEDS: end ----------
+
 
 # Mount static files from frontend build directory
 static_build_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "build")
@@ -1473,4 +1509,5 @@ else:
 if __name__ == "__main__":
     # Railway deployment
     port = int(os.environ.get("PORT", 8001))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Bounded so open SSE streams cannot hold up lifespan shutdown (and the lead buffer's final flush)
+    uvicorn.run(app, host="0.0.0.0", port=port, timeout_graceful_shutdown=10)
@@ -0,0 +1,154 @@
+"""
+Content-hash keyed cache for generated syllabus PDFs.
+
+A syllabus only depends on the course, the institute/branding settings, the
+logo image, the date line and the render template version, so the hash of those inputs is the
+cache key. Editing a course changes its hash, which makes the old entry
+unreachable; it is dropped as soon as the new PDF is stored.
+
+Entries live in an in-memory LRU bounded by total size and can optionally be
+persisted to disk (SYLLABUS_PDF_CACHE_DIR) so restarts start warm.
+"""
+import os
+import json
+import hashlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Set
+
+from syllabus_renderer import SYLLABUS_TEMPLATE_VERSION, COMPACT_DEFAULT
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable sha256 of JSON-serialisable inputs"""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SyllabusPDFCache:
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._keys_by_slug: Dict[str, Set[str]] = {}
+        self._slug_by_key: Dict[str, str] = {}
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        course: Dict[str, Any],
+        institute: Dict[str, Any],
+        branding: Dict[str, Any],
+        slug: str,
+        generated_on: str,
+        logo_digest: str = "",
+    ) -> str:
+        return fingerprint(SYLLABUS_TEMPLATE_VERSION, COMPACT_DEFAULT, slug, course, institute, branding, generated_on, logo_digest)
+
+    def _disk_path(self, slug: str, key: str) -> Path:
+        return self.disk_dir / f"{slug}-{key[:32]}.pdf"
+
+    def get(self, slug: str, key: str) -> Optional[bytes]:
+        pdf = self._entries.get(key)
+        if pdf is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pdf
+
+        if self.disk_dir:
+            path = self._disk_path(slug, key)
+            try:
+                pdf = path.read_bytes()
+            except FileNotFoundError:
+                pdf = None
+            except OSError as e:
+                logging.warning(f"Syllabus cache disk read failed for {path}: {e}")
+                pdf = None
+            if pdf:
+                self._store(slug, key, pdf)
+                self.hits += 1
+                return pdf
+
+        self.misses += 1
+        return None
+
+    def contains(self, key: str) -> bool:
+        """Membership check that does not count as a hit or refresh recency"""
+        return key in self._entries
+
+    def put(self, slug: str, key: str, pdf: bytes):
+        # A new key for a course means its inputs changed - drop the old versions
+        self.invalidate_course(slug, keep_key=key)
+        self._store(slug, key, pdf)
+
+        if self.disk_dir:
+            path = self._disk_path(slug, key)
+            try:
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_bytes(pdf)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logging.warning(f"Syllabus cache disk write failed for {path}: {e}")
+
+    def _store(self, slug: str, key: str, pdf: bytes):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        if len(pdf) > self.max_bytes:
+            return
+        self._entries[key] = pdf
+        self._size += len(pdf)
+        self._keys_by_slug.setdefault(slug, set()).add(key)
+        self._slug_by_key[key] = slug
+
+        while self._size > self.max_bytes and self._entries:
+            evicted_key, _ = next(iter(self._entries.items()))
+            self._remove(evicted_key)
+
+    def _remove(self, key: str):
+        pdf = self._entries.pop(key, None)
+        if pdf is not None:
+            self._size -= len(pdf)
+        slug = self._slug_by_key.pop(key, None)
+        if slug is not None:
+            self._keys_by_slug.get(slug, set()).discard(key)
+
+    def invalidate_course(self, slug: str, keep_key: Optional[str] = None):
+        """Drop every cached PDF of a course except keep_key (memory and disk)"""
+        for key in list(self._keys_by_slug.get(slug, ())):
+            if key != keep_key:
+                self._remove(key)
+
+        if self.disk_dir:
+            keep_name = self._disk_path(slug, keep_key).name if keep_key else None
+            for path in self.disk_dir.glob(f"{slug}-*.pdf"):
+                # Slugs may share a prefix ("python" / "python-advanced") - match the exact shape
+                if path.name != keep_name and len(path.stem) == len(slug) + 33:
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+        }
+
+
+syllabus_cache = SyllabusPDFCache(
+    max_bytes=int(os.environ.get("SYLLABUS_PDF_CACHE_MAX_MB", "64")) * 1024 * 1024,
+    disk_dir=os.environ.get("SYLLABUS_PDF_CACHE_DIR") or None,
+)
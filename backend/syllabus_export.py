@@ -0,0 +1,108 @@
+"""
+Bulk syllabus pack export.
+
+Renders every visible course through the shared render pool (reusing PDFs
+already in the syllabus cache), writes each PDF into a ZIP as soon as it is
+ready, and keeps the finished ZIP in an ArtifactStore for download. Runs as a
+background job (see background_jobs) so the admin request returns at once and
+progress is polled through the job status endpoint. No leads are stored.
+"""
+import os
+import asyncio
+import logging
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from artifact_store import ArtifactStore
+from asset_cache import logo_cache, logo_digest
+from background_jobs import Job
+from content_manager import content_revision
+from syllabus_renderer import generation_date
+from syllabus_cache import syllabus_cache
+from syllabus_pool import syllabus_render_pool
+
+EXPORT_JOB_KIND = "syllabus_export"
+
+export_store = ArtifactStore(
+    Path(os.environ.get("SYLLABUS_EXPORT_DIR") or Path(tempfile.gettempdir()) / "grras-syllabus-exports"),
+    max_bytes=int(os.environ.get("SYLLABUS_EXPORT_MAX_MB", "200")) * 1024 * 1024,
+    max_age_seconds=float(os.environ.get("SYLLABUS_EXPORT_MAX_AGE_SECONDS", "3600")),
+)
+
+
+def export_filename(slug: str) -> str:
+    return f"{slug}-syllabus.pdf"
+
+
+async def export_syllabus_pack(job: Job, content: Dict[str, Any]) -> Dict[str, Any]:
+    """Job runner: build the ZIP of all visible course syllabi"""
+    institute = content.get("institute", {})
+    branding = content.get("branding", {})
+    generated_on = generation_date()
+    logo = await logo_cache.get(branding, content)
+    digest = logo_digest(logo)
+
+    courses = [
+        c for c in content.get("courses", [])
+        if c.get("slug") and c.get("visible", True)
+    ]
+    job.progress(done=0, total=len(courses), message="Rendering syllabi")
+
+    async def course_pdf(course: Dict[str, Any]) -> Tuple[str, Optional[bytes], bool, Optional[str]]:
+        """(slug, pdf, served from cache, error)"""
+        slug = course["slug"]
+        key = syllabus_cache.make_key(course, institute, branding, slug, generated_on, digest)
+        pdf = syllabus_cache.get(slug, key)
+        if pdf is not None:
+            return slug, pdf, True, None
+        try:
+            pdf = await syllabus_render_pool.render(course, institute, branding, slug, generated_on, logo, admission=False)
+        except Exception as e:
+            logging.error(f"Syllabus export failed for {slug}: {e}")
+            return slug, None, False, str(e)
+        syllabus_cache.put(slug, key, pdf)
+        return slug, pdf, False, None
+
+    path = export_store.new_path("grras-syllabi", ".zip")
+    # Pinned while it is written, so a sweep cannot take the half-built ZIP
+    export_store.pin(path)
+    archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+    cached = 0
+    failed: Dict[str, str] = {}
+    # The pool bounds how many renders run at once; entries are written as they finish
+    tasks = [asyncio.ensure_future(course_pdf(c)) for c in courses]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            slug, pdf, from_cache, error = await finished
+            if error:
+                failed[slug] = error
+            else:
+                cached += from_cache
+                await asyncio.to_thread(archive.writestr, export_filename(slug), pdf)
+            job.progress(done=job.done + 1)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        archive.close()
+        export_store.release(path)
+        raise
+    archive.close()
+
+    if len(failed) == len(courses) and courses:
+        export_store.release(path)
+        raise RuntimeError("No syllabus could be rendered")
+
+    export_store.adopt(path)
+    export_store.unpin(path)
+    job.progress(message="Ready for download")
+    return {
+        "file": path.name,
+        "bytes": path.stat().st_size,
+        "courses": len(courses) - len(failed),
+        "from_cache": cached,
+        "failed": failed,
+        "revision": content_revision(content),
+        "generated_on": generated_on,
+    }
@@ -0,0 +1,219 @@
+"""
+Off-loop execution of syllabus rendering.
+
+ReportLab is CPU bound and synchronous, so rendering inside an async handler
+blocks the whole uvicorn worker. SyllabusRenderPool runs renders in a
+ProcessPoolExecutor (or a ThreadPoolExecutor via SYLLABUS_RENDER_EXECUTOR=thread)
+with a plain JSON-serialisable payload, bounded concurrency, a per-render
+timeout and queue/latency metrics.
+
+Admission control: at most `queue_limit` visitor renders may wait for a slot.
+Further requests are rejected straight away with SyllabusQueueFull (503 +
+Retry-After at the route) instead of piling up requests, buffers and CPU work.
+Background renders (export, prerender) skip the check and are counted
+separately, so a bulk job cannot use up the visitors' queue budget.
+"""
+import os
+import json
+import math
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional
+
+from syllabus_renderer import render_syllabus_payload, warm_up
+
+
+class SyllabusRenderTimeout(Exception):
+    """The render did not finish within the configured timeout"""
+
+
+class SyllabusQueueFull(Exception):
+    """Too many renders are already waiting; retry after `retry_after` seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Syllabus render queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class SyllabusRenderPool:
+    def __init__(self, executor_type: str = "process", workers: int = 2, concurrency: Optional[int] = None, timeout: float = 30.0, queue_limit: int = 32):
+        self.executor_type = executor_type if executor_type in ("process", "thread") else "process"
+        self.workers = max(1, workers)
+        self.concurrency = max(1, concurrency or self.workers)
+        self.timeout = timeout
+        self.queue_limit = max(0, queue_limit)
+        self._executor = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Metrics; `queued` counts visitor renders only, background waiters are kept apart
+        self.queued = 0
+        self.background_queued = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.admitted = 0
+        self.total_render_seconds = 0.0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_type == "process":
+                # spawn: workers start clean instead of forking a process that
+                # holds the event loop and the Mongo client's threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="syllabus-render")
+            logging.info(f"🖨️ Syllabus render pool started ({self.executor_type}, {self.workers} workers)")
+        return self._executor
+
+    def start(self):
+        """Create the executor and spin up its workers ahead of the first request"""
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(warm_up)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    @staticmethod
+    def build_payload(course: Dict[str, Any], institute: Dict[str, Any], branding: Dict[str, Any], slug: str, generated_on: str, logo: Optional[bytes] = None) -> Dict[str, Any]:
+        """Plain, picklable copy of the render inputs (drops datetimes/ObjectIds)"""
+        payload = json.loads(json.dumps({
+            "course": course,
+            "institute": institute,
+            "branding": branding,
+            "slug": slug,
+            "generated_on": generated_on,
+        }, default=str))
+        # Already-prepared PNG bytes pickle as-is
+        payload["logo"] = logo
+        return payload
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        finished = self.completed + self.failed + self.timeouts
+        avg_render = self.total_render_seconds / finished if finished else 1.0
+        backlog = self.queued + self.background_queued + self.in_flight
+        return max(1, math.ceil(avg_render * backlog / self.concurrency))
+
+    async def render(
+        self,
+        course: Dict[str, Any],
+        institute: Dict[str, Any],
+        branding: Dict[str, Any],
+        slug: str,
+        generated_on: str,
+        logo: Optional[bytes] = None,
+        admission: bool = True,
+    ) -> bytes:
+        """Render in the pool. With admission=False (background jobs) the queue limit is not applied."""
+        semaphore = self._get_semaphore()
+        if admission and self.queued >= self.queue_limit and semaphore.locked():
+            self.rejected += 1
+            raise SyllabusQueueFull(self.retry_after())
+        self.admitted += 1
+
+        payload = self.build_payload(course, institute, branding, slug, generated_on, logo)
+        if admission:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        else:
+            self.background_queued += 1
+        wait_started = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            if admission:
+                self.queued -= 1
+            else:
+                self.background_queued -= 1
+            waited = time.perf_counter() - wait_started
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+        self.in_flight += 1
+        started = time.perf_counter()
+
+        def release(future: Optional[asyncio.Future] = None):
+            # Runs when the worker is really done - after a timeout too - so in_flight
+            # counts busy workers and a timed-out render keeps its slot until it ends
+            self.total_render_seconds += time.perf_counter() - started
+            self.in_flight -= 1
+            semaphore.release()
+            if future is not None and not future.cancelled():
+                future.exception()  # mark retrieved: nobody awaits an abandoned render
+
+        try:
+            try:
+                future = asyncio.wrap_future(self._get_executor().submit(render_syllabus_payload, payload))
+            except BaseException:
+                release()
+                raise
+            future.add_done_callback(release)
+            # shield: a timeout (or a client going away) stops the wait, not the render
+            pdf = await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+            self.completed += 1
+            return pdf
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logging.error(f"Syllabus render timed out after {self.timeout}s for {slug}")
+            raise SyllabusRenderTimeout(f"Rendering took longer than {self.timeout} seconds")
+        except BrokenProcessPool:
+            self.failed += 1
+            logging.error("Syllabus render pool broken - recreating executor")
+            self._executor = None
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+
+    def metrics(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed + self.timeouts
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "concurrency": self.concurrency,
+            "timeout_seconds": self.timeout,
+            "queue_limit": self.queue_limit,
+            "queue_depth": self.queued,
+            "background_queue_depth": self.background_queued,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "rejection_rate": round(self.rejected / (self.admitted + self.rejected), 4) if self.admitted + self.rejected else 0.0,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.admitted, 4) if self.admitted else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 4),
+            "avg_render_seconds": round(self.total_render_seconds / finished, 4) if finished else 0.0,
+            "retry_after_seconds": self.retry_after(),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+syllabus_render_pool = SyllabusRenderPool(
+    executor_type=os.environ.get("SYLLABUS_RENDER_EXECUTOR", "process"),
+    workers=int(os.environ.get("SYLLABUS_RENDER_WORKERS", "2")),
+    concurrency=int(os.environ.get("SYLLABUS_RENDER_CONCURRENCY", "0")) or None,
+    timeout=float(os.environ.get("SYLLABUS_RENDER_TIMEOUT", "30")),
+    queue_limit=int(os.environ.get("SYLLABUS_RENDER_QUEUE_LIMIT", "32")),
+)
@@ -0,0 +1,172 @@
+"""
+Background pre-rendering of course syllabi.
+
+After every content save (and at startup, and when the printed date rolls
+over) the prerenderer works out the PDF cache key of each visible course and
+re-renders only the courses whose key changed, through the shared render pool
+with its own small concurrency limit so visitor downloads are not starved.
+The outcome and render time of every course is kept for the admin status
+endpoint.
+"""
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from content_manager import content_revision
+from asset_cache import logo_cache, logo_digest
+from syllabus_renderer import generation_date
+from syllabus_cache import syllabus_cache
+from syllabus_pool import syllabus_render_pool
+
+RENDERED = "rendered"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+
+
+def _seconds_until_tomorrow(now: Optional[datetime] = None) -> float:
+    """The date line is part of the cache key - re-render once the day changes"""
+    now = now or datetime.now()
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=5, microsecond=0)
+    return max(1.0, (tomorrow - now).total_seconds())
+
+
+class SyllabusPrerenderer:
+    def __init__(self, concurrency: int = 1):
+        self.concurrency = max(1, concurrency)
+        self._content_manager = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._pending: Optional[Dict[str, Any]] = None
+
+        # Cache key per course from the last pass - the diff against these decides what to render
+        self._keys: Dict[str, str] = {}
+        self.running = False
+        self.last_run: Dict[str, Any] = {}
+        self.courses: Dict[str, Dict[str, Any]] = {}
+        self.runs = 0
+
+    async def start(self, content_manager):
+        self._content_manager = content_manager
+        self._task = asyncio.create_task(self._run())
+        logging.info("🖨️ Syllabus pre-renderer started")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self, content: Dict[str, Any]):
+        """Called after content saves; repeated saves coalesce into one pass over the latest content"""
+        self._pending = content
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            content, self._pending = self._pending, None
+            try:
+                if content is None:
+                    content = await self._content_manager.get_content()
+                await self.prerender(content)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Syllabus pre-render error: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=_seconds_until_tomorrow())
+            except asyncio.TimeoutError:
+                pass
+
+    async def prerender(self, content: Dict[str, Any]) -> Dict[str, Any]:
+        """Render every visible course whose syllabus inputs changed since the last pass"""
+        institute = content.get("institute", {})
+        branding = content.get("branding", {})
+        generated_on = generation_date()
+        logo = await logo_cache.get(branding, content)
+        digest = logo_digest(logo)
+
+        courses = [
+            c for c in content.get("courses", [])
+            if c.get("slug") and c.get("visible", True)
+        ]
+        keys = {
+            c["slug"]: syllabus_cache.make_key(c, institute, branding, c["slug"], generated_on, digest)
+            for c in courses
+        }
+        changed = [
+            c for c in courses
+            if keys[c["slug"]] != self._keys.get(c["slug"]) or not syllabus_cache.contains(keys[c["slug"]])
+        ]
+
+        self.running = True
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Unchanged courses keep the timings of the pass that last rendered them
+        results: Dict[str, Dict[str, Any]] = {
+            slug: {**self.courses.get(slug, {}), "status": UNCHANGED} for slug in keys
+        }
+
+        async def render_one(course: Dict[str, Any]):
+            slug = course["slug"]
+            async with semaphore:
+                course_started = time.perf_counter()
+                try:
+                    pdf = await syllabus_render_pool.render(course, institute, branding, slug, generated_on, logo, admission=False)
+                    syllabus_cache.put(slug, keys[slug], pdf)
+                    self._keys[slug] = keys[slug]
+                    results[slug] = {"status": RENDERED, "bytes": len(pdf)}
+                except Exception as e:
+                    logging.error(f"Syllabus pre-render failed for {slug}: {e}")
+                    results[slug] = {"status": FAILED, "error": str(e)}
+                results[slug]["seconds"] = round(time.perf_counter() - course_started, 4)
+                results[slug]["finished_at"] = datetime.utcnow().isoformat()
+
+        try:
+            await asyncio.gather(*(render_one(c) for c in changed))
+        finally:
+            self.running = False
+
+        # Courses that were removed or hidden no longer need their PDFs
+        for slug in set(self._keys) - set(keys):
+            self._keys.pop(slug, None)
+            syllabus_cache.invalidate_course(slug)
+
+        self.courses = results
+        self.runs += 1
+        self.last_run = {
+            "revision": content_revision(content),
+            "generated_on": generated_on,
+            "courses": len(keys),
+            "rendered": sum(1 for r in results.values() if r["status"] == RENDERED),
+            "failed": sum(1 for r in results.values() if r["status"] == FAILED),
+            "seconds": round(time.perf_counter() - started, 4),
+            "finished_at": datetime.utcnow().isoformat(),
+        }
+        if changed:
+            logging.info(
+                f"✅ Pre-rendered {self.last_run['rendered']}/{len(changed)} changed syllabi "
+                f"in {self.last_run['seconds']}s (revision {self.last_run['revision']})"
+            )
+        return self.last_run
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "runs": self.runs,
+            "last_run": self.last_run,
+            "courses": self.courses,
+        }
+
+
+syllabus_prerenderer = SyllabusPrerenderer(
+    concurrency=int(os.environ.get("SYLLABUS_PRERENDER_CONCURRENCY", "1")),
+)
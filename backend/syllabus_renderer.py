@@ -0,0 +1,534 @@
+"""
+Syllabus PDF rendering shared by server.py and railway_server.py.
+
+The PDF depends only on the course, the institute/branding settings, the logo,
+the generation date and (optionally) the personalisation lines, so rendering is
+a pure function of those inputs. That is what lets the syllabus route cache the
+output (see syllabus_cache) and stamp personal lines onto a cached base (see
+syllabus_stamp).
+
+Paragraph styles, the page header/footer callback and the static sections
+(certificate benefits, admission steps, call-to-action) are built once at
+import; each render only lays out the course-specific flowables plus shallow
+copies of the static ones.
+
+Compact mode (the default for downloads, SYLLABUS_PDF_COMPACT) targets mobile
+users on slow connections: the logo is downsampled to 150 dpi and embedded
+once as a shared image XObject, page streams are Flate-compressed, and only
+the standard PDF fonts are used (no emoji in the call-to-action).
+"""
+import os
+import copy
+import hashlib
+import logging
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, Any, List, Optional
+
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_LEFT, TA_CENTER
+from xml.sax.saxutils import escape as xml_escape
+from PIL import Image as PILImage
+
+from syllabus_stamp import StampSlot, BasePDF
+
+# Bump whenever the layout below changes so cached PDFs are not reused
+SYLLABUS_TEMPLATE_VERSION = "2025.4"
+
+# PDFs are served as binary - ASCII85 stream encoding only adds ~25% to every stream
+rl_config.useA85 = 0
+
+COMPACT_DEFAULT = os.environ.get("SYLLABUS_PDF_COMPACT", "true").lower() in ("1", "true", "yes")
+LOGO_WIDTH_MM = 30
+LOGO_HEIGHT_MM = 10
+COMPACT_LOGO_DPI = 150
+
+
+class SyllabusRenderError(Exception):
+    """Raised when neither the branded nor the fallback layout could be built"""
+
+
+def generation_date(now: Optional[datetime] = None) -> str:
+    """Date line printed on the syllabus - DD Mon YYYY format"""
+    return (now or datetime.now()).strftime("%d %b %Y")
+
+
+# === GRRAS PDF Typography Styles - following specific rules ===
+_styles = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CourseTitle',
+    parent=_styles['Heading1'],
+    fontSize=22,
+    spaceAfter=12,
+    spaceBefore=15,
+    textColor=colors.HexColor('#DC2626'),
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+SECTION_HEADING_STYLE = ParagraphStyle(
+    'SectionHeading',
+    parent=_styles['Heading2'],
+    fontSize=13,
+    spaceBefore=15,
+    spaceAfter=8,
+    textColor=colors.white,
+    fontName='Helvetica-Bold',
+    backColor=colors.HexColor('#DC2626'),
+    borderPadding=6,
+    alignment=TA_LEFT,
+    keepWithNext=True  # Keep heading with content
+)
+
+BODY_TEXT_STYLE = ParagraphStyle(
+    'BodyText',
+    parent=_styles['Normal'],
+    fontSize=10,
+    spaceAfter=5,
+    leading=13,
+    textColor=colors.HexColor('#374151'),
+    alignment=TA_LEFT,
+    firstLineIndent=0
+)
+
+BULLET_LIST_STYLE = ParagraphStyle(
+    'BulletList',
+    parent=_styles['Normal'],
+    fontSize=10,
+    spaceAfter=3,
+    leading=13,
+    leftIndent=12,
+    bulletIndent=8,
+    textColor=colors.HexColor('#374151')
+)
+
+NUMBER_LIST_STYLE = ParagraphStyle(
+    'NumberList',
+    parent=_styles['Normal'],
+    fontSize=10,
+    spaceAfter=4,
+    leading=13,
+    leftIndent=15,
+    textColor=colors.HexColor('#374151')
+)
+
+CERTIFICATION_BOX_STYLE = ParagraphStyle(
+    'CertificationBox',
+    parent=_styles['Normal'],
+    fontSize=10,
+    spaceAfter=8,
+    leading=13,
+    textColor=colors.HexColor('#0F766E'),
+    backColor=colors.HexColor('#F0FDFA'),
+    borderColor=colors.HexColor('#14B8A6'),
+    borderWidth=1,
+    borderPadding=8,
+    alignment=TA_LEFT
+)
+
+INFO_LABEL_STYLE = ParagraphStyle(
+    'InfoLabel',
+    parent=_styles['Normal'],
+    fontSize=10,
+    spaceAfter=2,
+    leading=12,
+    textColor=colors.HexColor('#374151'),
+    fontName='Helvetica'
+)
+
+# "Prepared for" / document ID lines - stamped with the same metrics by syllabus_stamp
+PERSONAL_FONT = "Helvetica"
+PERSONAL_FONT_SIZE = 11
+PERSONAL_LINE_HEIGHT = 20  # leading (14) + spaceAfter (6)
+PERSONAL_FIELDS = ("name", "document_id")
+
+PERSONAL_STYLE = ParagraphStyle(
+    'PersonalLine',
+    parent=_styles['Normal'],
+    fontSize=PERSONAL_FONT_SIZE,
+    leading=14,
+    spaceAfter=6,
+    textColor=colors.black,
+    fontName=PERSONAL_FONT
+)
+
+TOOLS_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#374151')),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 5),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+])
+
+# === Static sections - parsed once, shallow-copied into each render ===
+# Certificate benefits - no unicode symbols that cause issues
+_CERT_BENEFITS = [
+    Paragraph(benefit, BULLET_LIST_STYLE)
+    for benefit in (
+        "• Industry-recognized certificate upon completion",
+        "• Digital verification available",
+        "• LinkedIn profile enhancement ready",
+        "• Lifetime validity with institute backing",
+    )
+]
+
+# Admission Process - Numbered list with consistent punctuation
+_ADMISSION_PROCESS = [Paragraph("Admission Process", SECTION_HEADING_STYLE)] + [
+    Paragraph(f"{i}. {step}", NUMBER_LIST_STYLE)
+    for i, step in enumerate((
+        "Submit your inquiry online or visit our campus for course consultation.",
+        "Meet with our expert counselors to discuss career goals and course fit.",
+        "Complete admission with required documents and secure your seat.",
+        "Join orientation session and begin your learning journey.",
+    ), 1)
+] + [Spacer(1, 10*mm)]
+
+# Call-to-Action
+_CTA_TEXT = (
+    "<b>Ready to Transform Your Career? Join GRRAS Today!</b><br/><br/>"
+    "Contact our counselors for personalized guidance and enrollment assistance.<br/>"
+    "Visit us at: https://www.grras.tech"
+)
+_CALL_TO_ACTION = [Paragraph("🚀 " + _CTA_TEXT, CERTIFICATION_BOX_STYLE), Spacer(1, 8*mm)]
+# Standard fonts have no emoji glyphs - compact mode leaves it out
+_COMPACT_CALL_TO_ACTION = [Paragraph(_CTA_TEXT, CERTIFICATION_BOX_STYLE), Spacer(1, 8*mm)]
+
+
+def _static(flowables: List[Any]) -> List[Any]:
+    """Per-render copies - layout state is set on the copy, the parsed text is shared"""
+    return [copy.copy(flowable) for flowable in flowables]
+
+
+_logo_readers: Dict[str, ImageReader] = {}
+
+
+def _downsample_logo(logo: bytes, dpi: int) -> PILImage.Image:
+    """Logo scaled to the printed size at `dpi`"""
+    image = PILImage.open(BytesIO(logo))
+    image.load()
+    max_size = (round(LOGO_WIDTH_MM / 25.4 * dpi), round(LOGO_HEIGHT_MM / 25.4 * dpi))
+    image.thumbnail(max_size, PILImage.LANCZOS)
+    return image
+
+
+def logo_image_reader(logo: Optional[bytes], compact: bool = False) -> Optional[ImageReader]:
+    """ImageReader for the logo PNG, decoded once per process and reused across pages/renders"""
+    if not logo:
+        return None
+    digest = hashlib.sha256(logo).hexdigest() + (":compact" if compact else "")
+    reader = _logo_readers.get(digest)
+    if reader is None:
+        try:
+            reader = ImageReader(_downsample_logo(logo, COMPACT_LOGO_DPI) if compact else BytesIO(logo))
+        except Exception as e:
+            logging.warning(f"Logo decode failed: {e}")
+            return None
+        # Branding rarely changes - keep only the current logo (both modes)
+        if len(_logo_readers) >= 2:
+            _logo_readers.clear()
+        _logo_readers[digest] = reader
+    return reader
+
+
+class _SyllabusDocTemplate(SimpleDocTemplate):
+    """A4 template with proper margins for header/footer, carrying the per-render header data"""
+
+    def __init__(self, buffer, institute: Dict[str, Any], logo_reader: Optional[ImageReader], compact: bool = False):
+        super().__init__(
+            buffer,
+            pagesize=A4,
+            pageCompression=1 if compact else None,
+            rightMargin=15*mm,
+            leftMargin=15*mm,
+            topMargin=20*mm,  # Space for header
+            bottomMargin=25*mm  # Space for footer
+        )
+        self.institute_name = institute.get("name", "GRRAS Solutions Training Institute")
+        self.phone = ', '.join(institute.get("phones") or [institute.get("phone") or "090019 91227"])
+        self.email = ', '.join(institute.get("emails") or [institute.get("email") or "info@grrassolutions.com"])
+        self.logo_reader = logo_reader
+
+
+def _draw_header_footer(canvas_obj, doc: _SyllabusDocTemplate):
+    """Professional header and footer, called for EVERY page"""
+    canvas_obj.saveState()
+
+    page_width, page_height = A4
+
+    # === PROFESSIONAL HEADER ===
+    # Red header background
+    canvas_obj.setFillColor(colors.HexColor('#DC2626'))
+    canvas_obj.rect(0, page_height - 15*mm, page_width, 15*mm, fill=1)
+
+    # GRRAS logo area (pre-fetched by asset_cache, decoded once per process)
+    logo_drawn = False
+    if doc.logo_reader is not None:
+        try:
+            # drawImage registers the image once per document; later pages reference the same XObject
+            canvas_obj.drawImage(doc.logo_reader, 15*mm, page_height - 13*mm, width=LOGO_WIDTH_MM*mm, height=LOGO_HEIGHT_MM*mm,
+                                 mask='auto', preserveAspectRatio=True, anchor='w')
+            logo_drawn = True
+        except Exception as e:
+            logging.warning(f"Logo draw failed: {e}")
+
+    # Institute name in header
+    canvas_obj.setFillColor(colors.white)
+    canvas_obj.setFont("Helvetica-Bold", 14)
+    x_pos = 50*mm if logo_drawn else 15*mm
+    canvas_obj.drawString(x_pos, page_height - 8*mm, doc.institute_name)
+
+    canvas_obj.setFont("Helvetica", 10)
+    canvas_obj.drawString(x_pos, page_height - 12*mm, "www.grras.tech")
+
+    # === PROFESSIONAL FOOTER ===
+    # Footer line
+    canvas_obj.setStrokeColor(colors.HexColor('#DC2626'))
+    canvas_obj.setLineWidth(0.5)
+    canvas_obj.line(15*mm, 15*mm, page_width - 15*mm, 15*mm)
+
+    # Page number and contact
+    canvas_obj.setFillColor(colors.HexColor('#666666'))
+    canvas_obj.setFont("Helvetica", 9)
+    canvas_obj.drawString(15*mm, 10*mm, f"Page {canvas_obj.getPageNumber()}")
+    canvas_obj.drawRightString(page_width - 15*mm, 10*mm, f"Phone: {doc.phone}")
+
+    # Email on second line
+    canvas_obj.drawRightString(page_width - 15*mm, 6*mm, f"Email: {doc.email}")
+
+    canvas_obj.restoreState()
+
+
+def personal_lines(personalization: Dict[str, str]) -> List[str]:
+    """Text of the personalisation block, in PERSONAL_FIELDS order"""
+    lines = []
+    if personalization.get("name") is not None:
+        lines.append(f"Prepared for: {personalization['name']}")
+    if personalization.get("document_id") is not None:
+        lines.append(f"Document ID: {personalization['document_id']}")
+    return lines
+
+
+def _format_fee(fees: Any) -> str:
+    # Format fee with safe rupee symbol (avoid encoding issues)
+    formatted_fee = str(fees) if fees else "Contact for details"
+    if fees and str(fees).lower() not in ['contact for details', 'on request', 'varies']:
+        # Add Rs. if not already present and contains numbers
+        if not any(symbol in str(fees).lower() for symbol in ['rs', 'inr', 'rupee']) and any(char.isdigit() for char in str(fees)):
+            formatted_fee = f"Rs. {fees}"
+        elif '₹' in str(fees):
+            # Replace ₹ with Rs. to avoid encoding issues
+            formatted_fee = str(fees).replace('₹', 'Rs.')
+        elif '■' in str(fees):
+            # Fix corrupted rupee symbol
+            formatted_fee = str(fees).replace('■', 'Rs. ')
+    return formatted_fee
+
+
+def _clean(value: Any) -> str:
+    return str(value).replace('$', '').replace('\\', '')
+
+
+def _course_elements(course: Dict[str, Any], generated_on: str, personal_block: List[Any], compact: bool = False) -> List[Any]:
+    """Flowables for one course - GRRAS layout rules"""
+    # Extract course details with NULL SAFETY
+    slug = course.get("slug") or ""
+    course_name = course.get("title") or course.get("name") or slug.replace("-", " ").title()
+    course_description = course.get("overview") or course.get("description") or ""
+    highlights = course.get("highlights") or []
+    tools = course.get("tools") or []
+    learning_outcomes = course.get("learningOutcomes") or []
+    career_roles = course.get("careerRoles") or []
+    duration = course.get("duration") or "Contact for details"
+    fees = course.get("fees") or "Contact for details"
+    level = course.get("level") or "All Levels"
+    certificate_info = course.get("certificateInfo") or "Certificate provided on successful completion"
+    eligibility = course.get("eligibility") or "Contact for eligibility criteria"
+
+    # Ensure all list fields are actually lists
+    if not isinstance(highlights, list):
+        highlights = []
+    if not isinstance(tools, list):
+        tools = []
+    if not isinstance(learning_outcomes, list):
+        learning_outcomes = []
+    if not isinstance(career_roles, list):
+        career_roles = []
+
+    content_elements = []
+
+    # Course Title
+    content_elements.append(Spacer(1, 10*mm))
+    content_elements.append(Paragraph("COURSE SYLLABUS", TITLE_STYLE))
+    content_elements.append(Paragraph(f"{course_name}", TITLE_STYLE))
+    content_elements.append(Spacer(1, 8*mm))
+
+    # Personalisation ("Prepared for", document ID) or the slot it is stamped into
+    if personal_block:
+        content_elements.extend(personal_block)
+        content_elements.append(Spacer(1, 4*mm))
+
+    # Course Overview (if available)
+    if course_description:
+        content_elements.append(Paragraph("Course Overview", SECTION_HEADING_STYLE))
+        content_elements.append(Paragraph(course_description, BODY_TEXT_STYLE))
+        content_elements.append(Spacer(1, 8*mm))
+
+    # Course Information - Label: Value format with Rs. for fee
+    content_elements.append(Paragraph("Course Information", SECTION_HEADING_STYLE))
+    for item in (
+        f"<b>Duration:</b> {duration}",
+        f"<b>Level:</b> {level}",
+        f"<b>Fee:</b> {_format_fee(fees)}",
+        f"<b>Eligibility:</b> {eligibility}",
+    ):
+        content_elements.append(Paragraph(item, INFO_LABEL_STYLE))
+    content_elements.append(Spacer(1, 8*mm))
+
+    # Course Highlights Section (NO DUPLICATES)
+    if highlights:
+        content_elements.append(Paragraph("Course Highlights", SECTION_HEADING_STYLE))
+        for highlight in highlights[:8]:  # Limit for space
+            # Clean highlight text - remove any unicode issues
+            clean_highlight = _clean(str(highlight).replace('✓', '•'))
+            content_elements.append(Paragraph(f"• {clean_highlight}", BULLET_LIST_STYLE))
+        content_elements.append(Spacer(1, 8*mm))
+
+    # Learning Outcomes Section (NO DUPLICATES)
+    if learning_outcomes:
+        content_elements.append(Paragraph("What You'll Learn", SECTION_HEADING_STYLE))
+        for i, outcome in enumerate(learning_outcomes[:8], 1):
+            content_elements.append(Paragraph(f"{i}. {_clean(outcome)}", NUMBER_LIST_STYLE))
+        content_elements.append(Spacer(1, 8*mm))
+
+    # Tools & Technologies Section (NO DUPLICATES) - clean 2-column layout
+    if tools:
+        content_elements.append(Paragraph("Tools & Technologies", SECTION_HEADING_STYLE))
+        tools_data = []
+        for i in range(0, len(tools), 2):
+            row = []
+            for j in range(2):
+                row.append(f"• {_clean(tools[i + j])}" if i + j < len(tools) else "")
+            tools_data.append(row)
+
+        tools_table = Table(tools_data, colWidths=[80*mm, 80*mm])
+        tools_table.setStyle(TOOLS_TABLE_STYLE)
+        content_elements.append(tools_table)
+        content_elements.append(Spacer(1, 8*mm))
+
+    # Career Opportunities Section (NO DUPLICATES)
+    if career_roles:
+        content_elements.append(Paragraph("Career Opportunities", SECTION_HEADING_STYLE))
+        for role in career_roles[:6]:
+            content_elements.append(Paragraph(f"• {_clean(role)}", BULLET_LIST_STYLE))
+        content_elements.append(Spacer(1, 8*mm))
+
+    # Certification Section (NO DUPLICATES) - Clean and Professional
+    content_elements.append(Paragraph("Certification Details", SECTION_HEADING_STYLE))
+    content_elements.append(Paragraph(_clean(certificate_info), BODY_TEXT_STYLE))
+    content_elements.append(Spacer(1, 4*mm))
+    content_elements.extend(_static(_CERT_BENEFITS))
+
+    content_elements.extend(_static(_ADMISSION_PROCESS))
+    content_elements.extend(_static(_COMPACT_CALL_TO_ACTION if compact else _CALL_TO_ACTION))
+
+    # Add generation date - DD Mon YYYY format
+    content_elements.append(Paragraph(f"<i>Generated on: {generated_on}</i>", BODY_TEXT_STYLE))
+    return content_elements
+
+
+def _build(content_elements: List[Any], institute: Dict[str, Any], logo: Optional[bytes], course_name: str, compact: bool = False) -> bytes:
+    """Build the flowables into a PDF (generated IN MEMORY)"""
+    pdf_buffer = BytesIO()
+    try:
+        doc = _SyllabusDocTemplate(pdf_buffer, institute, logo_image_reader(logo, compact), compact)
+        try:
+            doc.build(content_elements, onFirstPage=_draw_header_footer, onLaterPages=_draw_header_footer)
+            logging.info(f"✅ GRRAS PDF with headers/footers generated for {course_name}")
+        except Exception as e:
+            logging.error(f"PDF generation error: {e}")
+            # Fallback without headers if main generation fails
+            try:
+                pdf_buffer.seek(0)  # Reset buffer
+                pdf_buffer.truncate(0)  # Clear buffer completely
+                SimpleDocTemplate(pdf_buffer, pagesize=A4).build(content_elements)
+                logging.info("✅ Fallback PDF generation (without headers) successful")
+            except Exception as fallback_error:
+                logging.error(f"Complete PDF generation failure: {fallback_error}")
+                raise SyllabusRenderError(str(fallback_error)) from fallback_error
+
+        pdf_content = pdf_buffer.getvalue()
+        if not pdf_content:
+            raise SyllabusRenderError("PDF content is empty")
+        return pdf_content
+    finally:
+        pdf_buffer.close()
+
+
+def render(
+    course: Dict[str, Any],
+    institute: Dict[str, Any],
+    branding: Dict[str, Any],
+    personalization: Optional[Dict[str, str]] = None,
+    generated_on: Optional[str] = None,
+    logo: Optional[bytes] = None,
+    compact: Optional[bool] = None,
+) -> bytes:
+    """Render the branded syllabus PDF for a course and return its bytes.
+
+    `personalization` adds "Prepared for" / "Document ID" lines (keys in
+    PERSONAL_FIELDS). `logo` is the PNG prepared by asset_cache; the renderer
+    never fetches it. `compact` defaults to COMPACT_DEFAULT.
+    """
+    compact = COMPACT_DEFAULT if compact is None else compact
+    personal_block = [
+        Paragraph(xml_escape(line), PERSONAL_STYLE) for line in personal_lines(personalization or {})
+    ]
+    elements = _course_elements(course, generated_on or generation_date(), personal_block, compact)
+    return _build(elements, institute, logo, course.get("title") or course.get("slug") or "course", compact)
+
+
+def render_base(
+    course: Dict[str, Any],
+    institute: Dict[str, Any],
+    branding: Dict[str, Any],
+    generated_on: Optional[str] = None,
+    logo: Optional[bytes] = None,
+    compact: Optional[bool] = None,
+) -> Optional[BasePDF]:
+    """Render with an empty personalisation slot for syllabus_stamp.stamp_lines.
+
+    Returns None if the slot could not be placed.
+    """
+    compact = COMPACT_DEFAULT if compact is None else compact
+    slot = StampSlot(A4[0] - 30*mm, PERSONAL_LINE_HEIGHT * len(PERSONAL_FIELDS))
+    elements = _course_elements(course, generated_on or generation_date(), [slot], compact)
+    pdf = _build(elements, institute, logo, course.get("title") or course.get("slug") or "course", compact)
+    return BasePDF(pdf, slot.position) if slot.position else None
+
+
+def warm_up() -> bool:
+    """No-op submitted at startup so pool workers import ReportLab early"""
+    return True
+
+
+def render_syllabus_payload(payload: Dict[str, Any]) -> bytes:
+    """Executor entry point - takes the plain dict built by the render pool"""
+    return render(
+        payload["course"],
+        payload["institute"],
+        payload["branding"],
+        payload.get("personalization"),
+        payload["generated_on"],
+        payload.get("logo"),
+        payload.get("compact"),
+    )
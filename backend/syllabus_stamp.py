@@ -0,0 +1,124 @@
+"""
+Personalised syllabus stamping.
+
+A personalised syllabus is the course's base PDF plus a few lines of
+per-student text ("Prepared for", document ID). The base is rendered once with
+an empty StampSlot reserving room for those lines; per request only a one-page
+overlay with the text is drawn and merged onto the slot's page with pypdf.
+
+pypdf is optional - without it STAMPING_AVAILABLE is False and callers render
+the personalised PDF in full.
+"""
+import logging
+from collections import OrderedDict
+from io import BytesIO
+from typing import Dict, Any, List, Optional, Tuple
+
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Flowable
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    STAMPING_AVAILABLE = True
+except ImportError:
+    PdfReader = PdfWriter = None
+    STAMPING_AVAILABLE = False
+
+MAX_BASE_PDFS = 64
+
+
+class StampSlot(Flowable):
+    """Empty block in the base layout that records where it was drawn"""
+
+    def __init__(self, width: float, height: float):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.position: Optional[Tuple[int, float, float]] = None
+
+    def wrap(self, available_width, available_height):
+        return self.width, self.height
+
+    def draw(self):
+        # (page index, x, y of the slot's top-left corner) in page coordinates
+        x, y = self.canv.absolutePosition(0, self.height)
+        self.position = (self.canv.getPageNumber() - 1, x, y)
+
+
+class BasePDF:
+    def __init__(self, pdf: bytes, slot: Tuple[int, float, float]):
+        self.pdf = pdf
+        self.slot = slot
+
+
+def stamp_lines(
+    base: BasePDF,
+    lines: List[str],
+    font_name: str = "Helvetica",
+    font_size: float = 11,
+    line_height: float = 20,
+) -> bytes:
+    """Merge `lines` into the base PDF at its stamp slot and return the new PDF"""
+    page_index, x, top = base.slot
+    reader = PdfReader(BytesIO(base.pdf))
+    writer = PdfWriter(clone_from=reader)
+    page = writer.pages[page_index]
+    width, height = float(page.mediabox.width), float(page.mediabox.height)
+
+    overlay_buffer = BytesIO()
+    overlay = canvas.Canvas(overlay_buffer, pagesize=(width, height))
+    overlay.setFont(font_name, font_size)
+    for i, line in enumerate(lines):
+        overlay.drawString(x, top - font_size - i * line_height, line)
+    overlay.save()
+
+    page.merge_page(PdfReader(BytesIO(overlay_buffer.getvalue())).pages[0])
+    # merge_page leaves the combined stream uncompressed; compressing adds a new
+    # stream object, so copy the pages into a fresh writer to drop the orphan
+    page.compress_content_streams()
+    compact = PdfWriter()
+    for merged in writer.pages:
+        compact.add_page(merged)
+    if reader.metadata:
+        compact.add_metadata(reader.metadata)
+
+    output = BytesIO()
+    compact.write(output)
+    return output.getvalue()
+
+
+class BasePDFCache:
+    """Small LRU of rendered base PDFs keyed by a fingerprint of their inputs"""
+
+    def __init__(self, max_entries: int = MAX_BASE_PDFS):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, BasePDF]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[BasePDF]:
+        base = self._entries.get(key)
+        if base is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return base
+
+    def put(self, key: str, base: BasePDF):
+        self._entries[key] = base
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            logging.info(f"Base syllabus PDF evicted: {evicted_key[:12]}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stamping_available": STAMPING_AVAILABLE,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+base_pdf_cache = BasePDFCache()
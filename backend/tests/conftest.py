@@ -0,0 +1,44 @@
+"""
+Shared fixtures for the backend unit tests.
+
+Tests run against an in-memory Motor database (mongomock_motor) and import
+the flat backend modules directly, so no MongoDB server is needed. Route
+tests use the `api` fixture: a TestClient for server.py on that database,
+with admin auth waived and without running startup:
+
+    cd backend && pip install -r requirements-dev.txt && python -m pytest tests
+"""
+import os
+import sys
+import asyncio
+
+import pytest
+import mongomock_motor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture
+def db():
+    return mongomock_motor.AsyncMongoMockClient()["grras_test"]
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a fresh event loop"""
+    return asyncio.run
+
+
+@pytest.fixture
+def api(db, monkeypatch):
+    """(TestClient, server module) with server.db replaced by the in-memory database"""
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    import server
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(server, "db", db)
+    server.app.dependency_overrides[server.verify_admin_token] = lambda: True
+    yield TestClient(server.app), server
+    server.app.dependency_overrides.clear()
@@ -0,0 +1,49 @@
+import os
+import time
+
+from artifact_store import ArtifactStore
+
+
+def test_pinned_files_survive_eviction_and_sweeps(tmp_path, run):
+    store = ArtifactStore(tmp_path, max_bytes=10, max_age_seconds=60)
+    streaming = run(store.put("a", b"12345678"))
+    assert store.is_pinned(streaming)
+
+    # Over the cap, but the only other file is still being streamed
+    newest = run(store.put("b", b"12345678"))
+    assert streaming.exists() and newest.exists()
+
+    # An export still being written, old enough to have expired
+    writing = store.new_path("zip", ".zip")
+    store.pin(writing)
+    writing.write_bytes(b"partial")
+    os.utime(writing, (time.time() - 120, time.time() - 120))
+    store.sweep()
+    assert writing.exists()
+
+    store.adopt(writing)
+    store.unpin(writing)
+    store.release(newest)
+    assert not newest.exists() and not store.is_pinned(newest)
+
+    # Once unpinned the older file is evicted as usual
+    store.unpin(streaming)
+    run(store.put("c", b"12345678"))
+    assert not streaming.exists()
+    assert store.stats()["evicted"] >= 1
+
+
+def test_pins_are_counted(tmp_path):
+    store = ArtifactStore(tmp_path, max_bytes=1, max_age_seconds=60)
+    path = store.new_path("zip", ".zip")
+    path.write_bytes(b"done")
+    store.pin(path)
+    store.pin(path)
+    store.adopt(path)
+    store.unpin(path)
+    store.sweep()
+    assert path.exists()
+
+    store.unpin(path)
+    store.sweep()
+    assert not path.exists()
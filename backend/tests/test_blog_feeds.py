@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from blog_feeds import FeedCache, RSS, JSON_FEED
+from blog_index import BlogIndex
+
+POSTS = [
+    {"slug": "k8s-intro", "title": "Kubernetes & you", "category": "DevOps", "tags": ["kubernetes"],
+     "body": "<p>Pods</p>", "created_at": "2025-03-01T10:00:00Z", "author": "Asha"},
+    {"slug": "linux-basics", "title": "Linux basics", "category": "Linux", "tags": ["linux"],
+     "body": "<p>Shell</p>", "created_at": "2025-02-01T10:00:00Z"},
+]
+
+
+def _content(revision=1, posts=POSTS):
+    return {"meta": {"revision": revision}, "blog": {"posts": [dict(post) for post in posts]},
+            "settings": {"site": {"title": "GRRAS"}}}
+
+
+def test_feeds_are_rendered_once_per_revision_and_filter():
+    cache = FeedCache()
+    content = _content()
+    index = BlogIndex(content)
+    rss = cache.get(index, content, RSS, "https://example.com")
+    assert cache.get(index, content, RSS, "https://example.com") is rss
+    assert b"<title>Kubernetes &amp; you</title>" in rss.body
+    assert rss.body.index(b"k8s-intro") < rss.body.index(b"linux-basics")
+
+    linux = cache.get(index, content, JSON_FEED, "https://example.com", category="LINUX")
+    feed = json.loads(linux.body)
+    assert [item["id"] for item in feed["items"]] == ["https://example.com/blog/linux-basics"]
+    assert feed["feed_url"] == "https://example.com/blog/feed.json?category=LINUX"
+
+    newer = _content(revision=2, posts=POSTS[1:])
+    assert cache.get(BlogIndex(newer), newer, RSS, "https://example.com").etag != rss.etag
+
+
+@pytest.fixture
+def feeds(api, monkeypatch):
+    client, server = api
+
+    async def get_content():
+        return _content()
+
+    monkeypatch.setattr(server.content_manager, "get_content", get_content)
+    monkeypatch.setattr(server, "feed_cache", FeedCache())
+    return client
+
+
+def test_matching_if_none_match_gets_a_304(feeds):
+    first = feeds.get("/blog/atom.xml")
+    assert first.status_code == 200
+    assert first.headers["content-type"].startswith("application/atom+xml")
+    etag = first.headers["etag"]
+
+    cached = feeds.get("/blog/atom.xml", headers={"If-None-Match": f'"other", {etag}'})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    assert feeds.get("/blog/atom.xml", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_modified_since_is_used_without_an_etag(feeds):
+    last_modified = feeds.get("/blog/rss.xml").headers["last-modified"]
+    assert feeds.get("/blog/rss.xml", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert feeds.get("/blog/rss.xml", headers={"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}).status_code == 200
+    assert feeds.get("/blog/rss.xml", headers={"If-Modified-Since": "yesterday"}).status_code == 200
@@ -0,0 +1,77 @@
+from blog_index import BlogIndex, build_facets, precompute_post_fields, summarize_post, update_blog_facets
+
+
+def _post(slug, created_at, **fields):
+    return {"slug": slug, "title": slug.title(), "body": "<p>Some words</p>", "created_at": created_at, **fields}
+
+
+def _content(posts, facets=None):
+    blog = {"posts": posts}
+    if facets is not None:
+        blog["facets"] = facets
+    return {"meta": {"revision": 1}, "blog": blog}
+
+
+POSTS = [
+    _post("linux-basics", "2024-01-01", category="Linux", tags=["linux", "shell"]),
+    _post("k8s-intro", "2024-03-01", category="DevOps", tags=["kubernetes", "devops"]),
+    _post("ci-pipelines", "2024-02-01", tags=["devops", "ci"]),
+    _post("draft", "2024-04-01", category="DevOps", published=False, status="draft"),
+]
+
+
+def test_category_filter_matches_the_explicit_field_only():
+    index = BlogIndex(_content(POSTS))
+    devops = [index.posts[i]["slug"] for i in index.filter_positions(category="devops")]
+    # ci-pipelines is only counted under "devops" through its first tag
+    assert devops == ["k8s-intro"]
+    assert index.filter_positions(category="general") == []
+
+
+def test_facets_fall_back_to_the_first_tag():
+    facets = build_facets(POSTS)
+    assert facets["categories"] == {"Linux": 1, "DevOps": 1, "devops": 1}
+    assert facets["tags"] == {"linux": 1, "shell": 1, "kubernetes": 1, "devops": 2, "ci": 1}
+
+
+def test_tag_filters_intersect_and_search_scans_candidates():
+    index = BlogIndex(_content(POSTS))
+    assert [index.posts[i]["slug"] for i in index.filter_positions(tags=["DevOps"])] == ["k8s-intro", "ci-pipelines"]
+    assert [index.posts[i]["slug"] for i in index.filter_positions(tags=["devops", "ci"])] == ["ci-pipelines"]
+    assert [index.posts[i]["slug"] for i in index.filter_positions(tags=["devops"], search="K8S")] == ["k8s-intro"]
+
+
+def test_incremental_facet_updates_match_a_recount():
+    content = _content([dict(post) for post in POSTS], facets=build_facets(POSTS))
+    old = content["blog"]["posts"][2]
+    new = {**old, "category": "CI", "tags": ["ci"]}
+    content["blog"]["posts"][2] = new
+    facets = update_blog_facets(content, old_post=old, new_post=new)
+    assert facets == build_facets(content["blog"]["posts"])
+
+
+def test_listing_summaries_leave_out_post_bodies():
+    body = "<p>" + " ".join(["word"] * 450) + "</p>"
+    index = BlogIndex(_content([_post("long-read", "2024-05-01", body=body, content=body, category="Linux")]))
+    summary = index.get_summary("long-read")
+    assert "body" not in summary and "content" not in summary
+    assert summary["reading_time"] == 2
+    assert summary["excerpt"].endswith("...") and len(summary["excerpt"]) <= 203
+    assert index.get_post("long-read")["body"] == body
+    assert index.get_summary("draft") is None
+
+
+def test_precomputed_fields_are_used_as_stored():
+    post = precompute_post_fields(_post("short", "2024-05-01", excerpt="Hand written", category="Linux"))
+    assert post["excerpt"] == "Hand written"
+    assert summarize_post(post)["excerpt"] == "Hand written"
+    assert summarize_post({**post, "reading_time": 7})["reading_time"] == 7
+
+
+def test_derived_excerpt_follows_body_edits():
+    # The admin editor sends the whole stored post back on save
+    post = precompute_post_fields(_post("edited", "2024-05-01", body="<p>First draft</p>"))
+    assert "excerpt" not in post
+    assert summarize_post(post)["excerpt"] == "First draft"
+    post = precompute_post_fields({**post, "body": "<p>Second draft</p>"})
+    assert summarize_post(post)["excerpt"] == "Second draft"
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from blog_scheduler import PUBLISH, PublishScheduler, apply_publish_schedule
+
+NOW = datetime(2025, 9, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_future_publish_at_is_stored_as_scheduled():
+    post = {"slug": "soon", "published": True, "status": "published", "publishAt": "2025-09-02T00:00:00Z"}
+    assert apply_publish_schedule(post, NOW) is True
+    assert (post["published"], post["status"]) == (False, "scheduled")
+
+    post["publishAt"] = None
+    assert apply_publish_schedule(post, NOW) is True
+    assert (post["published"], post["status"]) == (True, "published")
+
+    post["unpublishAt"] = "2025-09-01"
+    apply_publish_schedule(post, NOW)
+    assert (post["published"], post["status"]) == (False, "unpublished")
+
+
+@pytest.fixture
+def blog_api(api, monkeypatch):
+    client, server = api
+    store = {"content": {"meta": {"revision": 1}, "blog": {"posts": [{
+        "id": "p1", "slug": "soon", "title": "Soon", "body": "<p>Later</p>", "published": False,
+        "status": "scheduled", "publishAt": "2999-01-01T00:00:00Z", "unpublishAt": "2999-02-01T00:00:00Z",
+    }]}}}
+
+    async def get_content():
+        return store["content"]
+
+    async def save_content(content, user=None, is_draft=False):
+        content["meta"] = {"revision": content["meta"]["revision"] + 1}
+        store["content"] = content
+        return content
+
+    monkeypatch.setattr(server.content_manager, "get_content", get_content)
+    monkeypatch.setattr(server.content_manager, "save_content", save_content)
+    scheduler = PublishScheduler()
+    scheduler.rebuild(store["content"])
+    monkeypatch.setattr(server, "publish_scheduler", scheduler)
+    return client, store, scheduler
+
+
+def _update(client, **fields):
+    body = {"title": "Soon", "slug": "soon", "content": "<p>Later</p>", **fields}
+    response = client.put("/api/admin/blog/p1", json=body)
+    assert response.status_code == 200, response.text
+    return response.json()["post"]
+
+
+def test_omitted_schedule_fields_keep_the_stored_schedule(blog_api):
+    client, _, scheduler = blog_api
+    post = _update(client)
+    assert post["publishAt"] == "2999-01-01T00:00:00Z"
+    assert post["status"] == "scheduled"
+    assert len(scheduler._heap) == 2
+
+
+def test_explicit_null_clears_and_cancels_the_schedule(blog_api):
+    client, _, scheduler = blog_api
+    post = _update(client, publish_at=None, unpublish_at="")
+    assert post["publishAt"] is None and post["unpublishAt"] is None
+    assert (post["published"], post["status"]) == (True, "published")
+    assert scheduler._heap == []
+
+    post = _update(client, publish_at="2999-03-01T00:00:00Z")
+    assert post["status"] == "scheduled"
+    assert [action for _, _, action in scheduler._heap] == [PUBLISH]
@@ -0,0 +1,34 @@
+from db_indexes import CONFLICT, CREATED, EXISTS, INDEXES, IndexRegistry
+
+
+def test_ensure_creates_missing_indexes_then_reports_them_as_existing(db, run):
+    async def scenario():
+        first = await IndexRegistry(INDEXES).ensure(db)
+        information = await db.lead_identities.index_information()
+        second = await IndexRegistry(INDEXES).ensure(db)
+        return first, information, second
+
+    first, information, second = run(scenario())
+    assert {result["status"] for results in first.values() for result in results.values()} == {CREATED}
+    assert information["key_unique"]["unique"] is True
+    assert {result["status"] for results in second.values() for result in results.values()} == {EXISTS}
+
+
+def test_existing_indexes_are_reused_and_conflicts_left_alone(db, run):
+    registry = IndexRegistry({"leads": [
+        {"name": "timestamp_id", "keys": [("timestamp", -1), ("_id", -1)]},
+        {"name": "email", "keys": [("email", 1)]},
+    ]})
+
+    async def scenario():
+        # Created by hand under another name, and a name reused for other keys
+        await db.leads.create_index([("timestamp", -1), ("_id", -1)], name="by_time")
+        await db.leads.create_index([("email", -1)], name="email")
+        results = await registry.ensure(db)
+        return results, await db.leads.index_information()
+
+    results, information = run(scenario())
+    assert results["leads"]["timestamp_id"] == {"status": EXISTS, "existing_name": "by_time"}
+    assert results["leads"]["email"]["status"] == CONFLICT
+    assert "timestamp_id" not in information
+    assert information["email"]["key"] == [("email", -1)]
@@ -0,0 +1,66 @@
+import os
+import time
+import asyncio
+
+import lead_buffer
+from lead_buffer import LeadBuffer
+
+
+class FakeStore:
+    def __init__(self):
+        self.buffer = None
+        self.written = []
+
+    async def write_batch(self, entries):
+        self.written.extend(entries)
+
+
+def test_concurrent_enqueues_share_fsyncs(tmp_path, run, monkeypatch):
+    real_fsync = os.fsync
+    calls = []
+
+    def slow_fsync(fd):
+        calls.append(fd)
+        time.sleep(0.01)
+        real_fsync(fd)
+
+    monkeypatch.setattr(lead_buffer.os, "fsync", slow_fsync)
+
+    async def scenario():
+        store = FakeStore()
+        buffer = LeadBuffer(spill_dir=tmp_path, flush_ms=60000, max_items=1000)
+        await buffer.start(store)
+        results = await asyncio.gather(*(buffer.enqueue({"name": f"Lead {i}"}) for i in range(50)))
+        fsyncs = len(calls)
+        assert buffer._synced == 50
+        assert buffer.stats()["syncs"] == fsyncs
+        lines = [line for path in tmp_path.glob("*.ndjson") for line in path.read_bytes().splitlines()]
+        assert len(lines) == 50
+
+        assert await buffer.flush() == 50
+        await buffer.stop()
+        return store, results, fsyncs
+
+    store, results, fsyncs = run(scenario())
+    assert fsyncs < 50
+    assert [entry["id"] for entry in store.written] == [result["lead_id"] for result in results]
+
+
+def test_rotation_keeps_waiting_appends_durable(tmp_path, run):
+    async def scenario():
+        store = FakeStore()
+        buffer = LeadBuffer(spill_dir=tmp_path, flush_ms=60000, max_items=1000)
+        await buffer.start(store)
+        enqueues = [asyncio.create_task(buffer.enqueue({"name": f"Lead {i}"})) for i in range(20)]
+        # Rotate and flush while some of the appends are still waiting on their fsync
+        await asyncio.sleep(0)
+        await buffer.flush()
+        await asyncio.gather(*enqueues)
+        await buffer.flush()
+        await buffer.stop()
+        return store
+
+    store = run(scenario())
+    assert len(store.written) == 20
+    assert len({entry["id"] for entry in store.written}) == 20
+    assert list(tmp_path.glob("*.ndjson")) == []
@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import lead_export
+from lead_export import CSV, NDJSON, stream_leads
+
+LEADS = [
+    {"name": "Asha", "email": "asha@example.com", "phone": "+919876543210", "course": "DevOps",
+     "message": "=HYPERLINK(\"x\")", "timestamp": datetime(2025, 9, 2, 10, 0), "interactions": 3},
+    {"name": "Ravi, K", "email": "ravi@example.com", "phone": "9876543211", "course": "Linux",
+     "message": "Call me\nafter 6", "timestamp": datetime(2025, 9, 1, 10, 0)},
+]
+
+
+async def _collect(db, query, fmt):
+    return "".join([chunk async for chunk in stream_leads(db.leads, query, fmt)])
+
+
+def test_csv_export_is_spreadsheet_safe(db, run):
+    run(db.leads.insert_many([dict(lead) for lead in LEADS]))
+    text = run(_collect(db, {}, CSV))
+    assert text.startswith("\ufeff")
+    rows = list(csv.reader(io.StringIO(text[1:])))
+    assert rows[0][:3] == ["Name", "Email", "Phone"]
+    assert [row[0] for row in rows[1:]] == ["Asha", "Ravi, K"]
+    assert rows[1][2] == "+919876543210"
+    assert rows[1][6] == "'=HYPERLINK(\"x\")"
+    assert rows[1][7] == "3" and rows[2][7] == "1"
+    assert rows[2][6] == "Call me\nafter 6"
+
+
+def test_ndjson_export_filters_and_chunks(db, run, monkeypatch):
+    monkeypatch.setattr(lead_export, "CHUNK_BYTES", 1)
+    run(db.leads.insert_many([dict(lead) for lead in LEADS]))
+
+    async def chunks():
+        return [chunk async for chunk in stream_leads(db.leads, {"course": "Linux"}, NDJSON)]
+
+    parts = run(chunks())
+    rows = [json.loads(line) for line in "".join(parts).splitlines()]
+    assert len(parts) >= 2
+    assert [row["name"] for row in rows] == ["Ravi, K"]
+    assert rows[0]["timestamp"] == "2025-09-01T10:00:00"
+    assert set(rows[0]) == {"id", *lead_export.EXPORT_FIELDS}
+
+
+def test_export_route(api, db, run):
+    client, _ = api
+    run(db.leads.insert_many([dict(lead) for lead in LEADS]))
+    response = client.get("/api/admin/leads/export", params={"format": "ndjson", "q": "asha"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "attachment; filename=grras-leads-" in response.headers["content-disposition"]
+    assert [json.loads(line)["name"] for line in response.text.splitlines()] == ["Asha"]
+    assert client.get("/api/admin/leads/export", params={"format": "xlsx"}).status_code == 400
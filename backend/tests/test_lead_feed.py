@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from lead_feed import CHANGE_PIPELINE, LeadFeed
+
+
+def _change(lead_id, operation="insert", interactions=1):
+    change = {
+        "_id": {"_data": str(ObjectId())},
+        "operationType": operation,
+        "documentKey": {"_id": lead_id},
+        "fullDocument": {
+            "_id": lead_id,
+            "name": "Asha",
+            "email": "asha@example.com",
+            "phone": "9876543210",
+            "course": "DevOps",
+            "type": "contact_form",
+            "timestamp": datetime(2025, 9, 1, 10, 0),
+            "interactions": interactions,
+            "events": [{"id": lead_id, "timestamp": datetime(2025, 9, 1, 10, 0)}],
+            "identity_keys": ["email:asha@example.com"],
+        },
+    }
+    if operation == "update":
+        change["updateDescription"] = {"updatedFields": {"interactions": interactions}}
+    return change
+
+
+def test_change_event_keeps_lead_id_through_pipeline(db, run):
+    lead_id = ObjectId()
+
+    async def scenario():
+        await db.changes.insert_many([_change(lead_id), _change(ObjectId(), "update", interactions=1)])
+        return await db.changes.aggregate(CHANGE_PIPELINE).to_list(length=None)
+
+    projected = run(scenario())
+    # The interactions=1 update (a migration, not a merge) is filtered out
+    assert len(projected) == 1
+    document = projected[0]["fullDocument"]
+    assert document["_id"] == lead_id
+    assert "events" not in document and "identity_keys" not in document
+
+    feed = LeadFeed()
+    queue = feed.subscribe()
+    feed._publish(document, created=projected[0]["operationType"] == "insert")
+    event = queue.get_nowait()
+    assert event["event"] == "lead"
+    assert event["data"]["op"] == "created"
+    assert event["data"]["lead"]["id"] == str(lead_id)
+
+
+def test_merge_update_is_published_as_updated(db, run):
+    lead_id = ObjectId()
+
+    async def scenario():
+        await db.changes.insert_one(_change(lead_id, "update", interactions=2))
+        return await db.changes.aggregate(CHANGE_PIPELINE).to_list(length=None)
+
+    [change] = run(scenario())
+    feed = LeadFeed()
+    queue = feed.subscribe()
+    feed._publish(change["fullDocument"], created=change["operationType"] == "insert")
+    assert queue.get_nowait()["data"]["op"] == "updated"
+
+
+def test_unserializable_lead_is_skipped_without_raising():
+    feed = LeadFeed()
+    queue = feed.subscribe()
+    feed._publish({"name": "No id"}, created=True)
+    assert queue.empty()
+    assert feed.published == 0
+
+
+def test_last_event_id_replays_missed_events():
+    feed = LeadFeed()
+    queue = feed.subscribe()
+    for name in ("a", "b", "c"):
+        feed._publish({"_id": ObjectId(), "name": name}, created=True)
+    first_id = f"{feed._epoch}-{queue.get_nowait()['seq']}"
+    assert [e["data"]["lead"]["name"] for e in feed.since(first_id)] == ["b", "c"]
+    assert feed.since("otherepoch-1") is None
@@ -0,0 +1,40 @@
+from lead_log import LeadLog
+
+
+def test_repeated_id_appended_at_runtime_is_compacted(tmp_path, run):
+    async def scenario():
+        log = LeadLog(tmp_path / "leads.ndjson", fsync="never", compact_interval=0)
+        await log.start()
+        await log.append({"id": "a", "name": "First"})
+        await log.append({"id": "b", "name": "Second"})
+        assert log._garbage == 0
+        await log.append({"id": "a", "name": "First again"})
+        assert log._garbage == 1
+
+        result = await log.compact()
+        assert result == {"before": 3, "after": 2}
+        assert [lead["id"] for lead in await log.newest()] == ["b", "a"]
+
+        # The id set is rebuilt from the compacted file
+        await log.append({"id": "b", "name": "Second again"})
+        assert log._garbage == 1
+        await log.stop()
+
+    run(scenario())
+
+
+def test_repeats_and_torn_lines_found_at_open(tmp_path, run):
+    path = tmp_path / "leads.ndjson"
+    path.write_bytes(b'{"id":"a"}\nnot json\n{"id":"a"}\n{"id":"b"}\n{"id":"c"')
+
+    async def scenario():
+        log = LeadLog(path, fsync="never", compact_interval=0)
+        await log.start()
+        assert len(log) == 4
+        assert log._garbage == 2
+        assert await log.compact() == {"before": 4, "after": 2}
+        assert await log.compact() == {"before": 2, "after": 2}
+        await log.stop()
+
+    run(scenario())
+    assert path.read_bytes() == b'{"id":"a"}\n{"id":"b"}\n'
@@ -0,0 +1,115 @@
+from datetime import datetime
+
+import pytest
+
+import lead_purge
+from background_jobs import Job
+from lead_purge import ARCHIVE_COLLECTION, PURGE_JOB_KIND, purge_leads
+
+
+@pytest.fixture
+def purge_db(db, monkeypatch):
+    monkeypatch.setattr(lead_purge, "PURGE_BATCH_SIZE", 2)
+    monkeypatch.setattr(lead_purge, "PURGE_BATCH_PAUSE_SECONDS", 0)
+    monkeypatch.setattr(lead_purge.lead_store, "db", db)
+    return db
+
+
+def _seed(db, run):
+    leads = [{"name": f"Test {i}", "email": f"t{i}@test.com", "timestamp": datetime(2025, 9, 1, i)} for i in range(5)]
+    leads.append({"name": "Real", "email": "real@example.com", "timestamp": datetime(2025, 9, 1, 6)})
+    run(db.leads.insert_many(leads))
+    run(db.lead_identities.insert_many([
+        {"key": f"email:{lead['email']}", "lead_id": lead["_id"]} for lead in leads
+    ]))
+    return leads
+
+
+def test_purge_archives_then_deletes_in_batches(purge_db, run):
+    db = purge_db
+    _seed(db, run)
+    job = Job(PURGE_JOB_KIND)
+    result = run(purge_leads(job, db, {"email": {"$regex": "@test\\.com$"}}))
+
+    assert result == {"deleted": 5, "archive_collection": ARCHIVE_COLLECTION, "stats_rebuilt": False}
+    assert (job.done, job.total) == (5, 5)
+    remaining = run(db.leads.find({}).to_list(length=None))
+    assert [lead["name"] for lead in remaining] == ["Real"]
+    archived = run(db[ARCHIVE_COLLECTION].find({}).to_list(length=None))
+    assert len(archived) == 5
+    assert all(lead["purge_job"] == job.id and isinstance(lead["archived_at"], datetime) for lead in archived)
+    assert run(db.lead_identities.count_documents({})) == 1
+
+
+def test_interrupted_purge_loses_nothing_and_resumes(purge_db, run, monkeypatch):
+    db = purge_db
+    leads = _seed(db, run)
+    collection_type = type(db.leads)
+    real_bulk_write = collection_type.bulk_write
+    calls = []
+
+    async def delete_once_then_fail(self, *args, **kwargs):
+        if self.name == "leads":
+            calls.append(args)
+        if len(calls) > 1:
+            raise RuntimeError("connection reset")
+        return await real_bulk_write(self, *args, **kwargs)
+
+    monkeypatch.setattr(collection_type, "bulk_write", delete_once_then_fail)
+    query = {"email": {"$regex": "@test\\.com$"}}
+    with pytest.raises(RuntimeError):
+        run(purge_leads(Job(PURGE_JOB_KIND), db, query))
+
+    # The second batch was archived but not deleted - every lead still exists somewhere
+    assert run(db.leads.count_documents(query)) == 3
+    assert run(db[ARCHIVE_COLLECTION].count_documents({})) == 4
+    monkeypatch.setattr(collection_type, "bulk_write", real_bulk_write)
+
+    result = run(purge_leads(Job(PURGE_JOB_KIND), db, query))
+    assert result["deleted"] == 3
+    assert run(db.leads.count_documents({})) == 1
+    archived_ids = {lead["_id"] for lead in run(db[ARCHIVE_COLLECTION].find({}).to_list(length=None))}
+    assert archived_ids == {lead["_id"] for lead in leads[:5]}
+
+
+def test_leads_changed_after_archiving_are_archived_again_or_kept(purge_db, run, monkeypatch):
+    db = purge_db
+    leads = _seed(db, run)
+    merged, moved = leads[0]["_id"], leads[1]["_id"]
+    real_archive = lead_purge._archive
+    rounds = []
+
+    async def archive_then_submissions_arrive(db, batch, job_id):
+        await real_archive(db, batch, job_id)
+        if not rounds:
+            # Between the archive copy and the delete: a repeat submission is merged into
+            # one lead, and another lead's email changes so it no longer matches the filter
+            await db.leads.update_one({"_id": merged}, {
+                "$inc": {"interactions": 1}, "$push": {"events": {"course": "DevOps"}},
+                "$set": {"timestamp": datetime(2025, 9, 2)},
+            })
+            await db.leads.update_one({"_id": moved}, {"$inc": {"interactions": 1}, "$set": {"email": "t1@example.com"}})
+        rounds.append([lead["_id"] for lead in batch])
+
+    monkeypatch.setattr(lead_purge, "_archive", archive_then_submissions_arrive)
+    job = Job(PURGE_JOB_KIND)
+    result = run(purge_leads(job, db, {"email": {"$regex": "@test\\.com$"}}))
+
+    assert result["deleted"] == 4
+    assert rounds[1][0] == merged
+    assert [lead["_id"] for lead in run(db.leads.find({}).to_list(length=None))] == [moved, leads[5]["_id"]]
+    archived = run(db[ARCHIVE_COLLECTION].find_one({"_id": merged}))
+    assert archived["events"] == [{"course": "DevOps"}] and archived["timestamp"] == datetime(2025, 9, 2)
+    assert run(db[ARCHIVE_COLLECTION].find_one({"_id": moved})) is None
+    assert run(db.lead_identities.count_documents({"lead_id": moved})) == 1
+
+
+def test_stale_archive_copy_is_replaced(purge_db, run):
+    db = purge_db
+    leads = _seed(db, run)
+    # Archived by an earlier purge, then re-created under the same _id with new state
+    run(db[ARCHIVE_COLLECTION].insert_one({"_id": leads[0]["_id"], "name": "Old", "purge_job": "earlier"}))
+    job = Job(PURGE_JOB_KIND)
+    run(purge_leads(job, db, {"_id": leads[0]["_id"]}))
+    archived = run(db[ARCHIVE_COLLECTION].find_one({"_id": leads[0]["_id"]}))
+    assert archived["name"] == "Test 0" and archived["purge_job"] == job.id
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from lead_queries import LeadCountCache, LeadQueryError, build_lead_filter, decode_cursor, wildcard_regex
+
+START = datetime(2025, 9, 1, 10, 0)
+
+
+def _lead(minutes, **fields):
+    return {"_id": ObjectId(), "name": f"Lead {minutes}", "email": f"lead{minutes}@example.com",
+            "phone": "9876543210", "course": "DevOps", "type": "enquiry", "source": "website",
+            "timestamp": START + timedelta(minutes=minutes), **fields}
+
+
+def test_filters():
+    assert wildcard_regex("*@test.com") == r"^.*@test\.com$"
+    query = build_lead_filter(course="DevOps", q="+91 98765-43210", date_from="2025-09-01", date_to="2025-09-02")
+    assert query["timestamp"] == {"$gte": datetime(2025, 9, 1), "$lt": datetime(2025, 9, 3)}
+    assert query["$and"][0] == {"$or": [{"courses": "DevOps"}, {"course": "DevOps"}]}
+    assert {"phone": {"$regex": "9876543210"}} in query["$and"][1]["$or"]
+    with pytest.raises(LeadQueryError):
+        build_lead_filter(date_from="soon")
+    with pytest.raises(LeadQueryError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.fixture
+def leads_api(api, monkeypatch):
+    client, server = api
+    monkeypatch.setattr(server, "lead_count_cache", LeadCountCache())
+    return client
+
+
+def _page(client, **params):
+    response = client.get("/api/admin/leads", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_filtered_pages_and_totals(leads_api, db, run):
+    # Same timestamp for two leads: _id breaks the tie
+    run(db.leads.insert_many([
+        _lead(0), _lead(1, course="Linux"), _lead(2, source="instagram"), _lead(2), _lead(3, name="Asha Verma"),
+    ]))
+    devops = _page(leads_api, course="DevOps", limit=10)
+    assert devops["total"] == 4 and devops["has_more"] is False
+    assert [lead["name"] for lead in devops["leads"]][::3] == ["Asha Verma", "Lead 0"]
+    assert [lead["name"] for lead in _page(leads_api, q="asha")["leads"]] == ["Asha Verma"]
+    assert _page(leads_api, source="instagram")["total"] == 1
+    assert set(devops["leads"][0]) == {
+        "id", "name", "email", "phone", "message", "course", "type", "source", "timestamp", "interactions", "courses",
+    }
+    assert leads_api.get("/api/admin/leads", params={"cursor": "garbage"}).status_code == 400
+
+
+def test_cursor_pages_stay_stable_while_leads_arrive(leads_api, db, run):
+    run(db.leads.insert_many([_lead(minutes) for minutes in (0, 1, 2, 2, 3)]))
+    seen = []
+    page = _page(leads_api, limit=2)
+    seen += [lead["id"] for lead in page["leads"]]
+    # A new lead arriving mid-listing must not shift the following pages
+    run(db.leads.insert_one(_lead(10)))
+    while page["next_cursor"]:
+        page = _page(leads_api, limit=2, cursor=page["next_cursor"])
+        seen += [lead["id"] for lead in page["leads"]]
+
+    expected = run(db.leads.find({"timestamp": {"$lt": START + timedelta(minutes=10)}})
+                   .sort([("timestamp", -1), ("_id", -1)]).to_list(length=None))
+    assert seen == [str(lead["_id"]) for lead in expected]
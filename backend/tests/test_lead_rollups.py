@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from lead_rollups import (
+    DIMENSIONS, ROLLUP_COLLECTION, apply_rebuilt_counts, dimensions, query_stats, rebuild_pipeline, record_submission,
+    record_submissions,
+)
+
+
+def _row(day, course, submissions, new_leads):
+    return {"_id": f"{day}|{course}|enquiry|website", "day": day, "course": course,
+            "type": "enquiry", "source": "website", "submissions": submissions, "new_leads": new_leads}
+
+
+def _lead(timestamp, course):
+    return {"timestamp": timestamp, "course": course, "type": "enquiry", "source": "website"}
+
+
+def test_submissions_are_counted_per_stats_day(db, run):
+    async def scenario():
+        # 20:00 UTC is already the next day in IST
+        await record_submission(db, _lead(datetime(2025, 9, 1, 20, 0), "DevOps"), new_lead=True)
+        await record_submissions(db, [
+            (_lead(datetime(2025, 9, 2, 6, 0), "DevOps"), False),
+            (_lead(datetime(2025, 9, 3, 6, 0), "Linux"), True),
+        ])
+        return await query_stats(db, date_from="2025-09-01", date_to="2025-09-07", interval="week")
+
+    stats = run(scenario())
+    assert stats["totals"] == {"submissions": 3, "new_leads": 2}
+    assert stats["series"] == [{"period": "2025-09-01", "submissions": 3, "new_leads": 2}]
+    assert stats["breakdown"]["course"][0] == {"key": "DevOps", "submissions": 2, "new_leads": 1}
+
+
+def test_rebuild_corrects_rows_and_keeps_increments_made_meanwhile(db, run):
+    async def scenario():
+        await db[ROLLUP_COLLECTION].insert_many([
+            _row("2025-08-31", "Java", 4, 4),     # every lead deleted since
+            _row("2025-09-01", "DevOps", 9, 9),   # over-counted
+        ])
+        current = await db[ROLLUP_COLLECTION].find({}).to_list(length=None)
+        # Counted live while the pipeline runs; too new for the pipeline to see
+        await record_submission(db, _lead(datetime(2025, 9, 1, 7, 0), "DevOps"), new_lead=True)
+        await record_submission(db, _lead(datetime(2025, 9, 3, 7, 0), "Linux"), new_lead=True)
+        rebuilt = [_row("2025-09-01", "DevOps", 2, 2), _row("2025-09-02", "Python", 1, 0)]
+        corrected = await apply_rebuilt_counts(db, current, rebuilt)
+        rows = {row["_id"]: (row["submissions"], row["new_leads"]) async for row in db[ROLLUP_COLLECTION].find({})}
+        return corrected, rows
+
+    corrected, rows = run(scenario())
+    assert corrected == 3
+    assert rows == {
+        "2025-09-01|DevOps|enquiry|website": (3, 3),
+        "2025-09-02|Python|enquiry|website": (1, 0),
+        "2025-09-03|Linux|enquiry|website": (1, 1),
+    }
+
+
+def test_rebuild_pipeline_only_counts_events_before_it_started():
+    started = datetime(2025, 9, 1, 12, 0)
+    pipeline = rebuild_pipeline(started)
+    assert {"$match": {"event.timestamp": {"$type": "date", "$lt": started}}} in pipeline
+    assert not any("$out" in stage or "$merge" in stage for stage in pipeline)
+
+
+def test_rebuild_buckets_empty_dimensions_like_ingest(db, run):
+    group_key = next(stage["$group"]["_id"] for stage in rebuild_pipeline(datetime(2025, 9, 1)) if "$group" in stage)
+    events = [{"course": "DevOps", "type": "", "source": None}, {"type": "enquiry"}]
+
+    async def scenario():
+        await db.events.insert_many([{"event": dict(event)} for event in events])
+        cursor = db.events.aggregate([{"$project": {"_id": 0, **{d: group_key[d] for d in DIMENSIONS}}}])
+        return [row async for row in cursor]
+
+    assert run(scenario()) == [dimensions(event) for event in events]
@@ -0,0 +1,83 @@
+import pytest
+
+from background_jobs import Job
+from lead_migrations import IDENTITY_JOB_KIND, MIGRATIONS, merge_duplicate_leads
+from lead_store import LeadStore, identity_keys, normalize_phone
+
+
+def _store(db):
+    store = LeadStore(dedup=True)
+    store.attach(db)
+    return store
+
+
+def test_identity_keys_are_normalised():
+    assert normalize_phone("098765 43210") == "+919876543210"
+    assert normalize_phone("+1 (415) 555-0100") == "+14155550100"
+    assert normalize_phone("12345") is None
+    assert identity_keys({"email": " Asha@Example.com ", "phone": "9876543210"}) == [
+        "email:asha@example.com", "phone:+919876543210",
+    ]
+
+
+def test_repeated_email_is_merged_into_one_lead(db, run):
+    async def scenario():
+        store = _store(db)
+        first = await store.insert({"name": "Asha", "email": "asha@example.com", "course": "DevOps", "type": "enquiry"})
+        second = await store.insert({"name": "Asha K", "email": "ASHA@example.com", "phone": "9876543210", "course": "Linux"})
+        leads = await db.leads.find({}).to_list(length=None)
+        identities = await db.lead_identities.find({}).to_list(length=None)
+        return first, second, leads, identities
+
+    first, second, leads, identities = run(scenario())
+    assert first["merged"] is False and second == {"lead_id": first["lead_id"], "merged": True}
+    assert len(leads) == 1
+    lead = leads[0]
+    assert lead["name"] == "Asha K"
+    assert lead["interactions"] == 2
+    assert [event["course"] for event in lead["events"]] == ["DevOps", "Linux"]
+    assert sorted(lead["courses"]) == ["DevOps", "Linux"]
+    # The phone first seen on the second submission now points at the same lead
+    assert {identity["key"]: identity["lead_id"] for identity in identities} == {
+        "email:asha@example.com": first["lead_id"],
+        "phone:+919876543210": first["lead_id"],
+    }
+
+
+def test_failed_lead_write_releases_the_claimed_keys(db, run, monkeypatch):
+    async def failing_update(*args, **kwargs):
+        raise RuntimeError("primary stepped down")
+
+    async def scenario():
+        store = _store(db)
+        monkeypatch.setattr(type(db.leads), "update_one", failing_update)
+        with pytest.raises(RuntimeError):
+            await store.insert({"name": "Ravi", "email": "ravi@example.com"})
+        monkeypatch.undo()
+        assert await db.lead_identities.count_documents({}) == 0
+        result = await store.insert({"name": "Ravi", "email": "ravi@example.com"})
+        return result, await db.leads.count_documents({"_id": result["lead_id"]})
+
+    result, stored = run(scenario())
+    assert result["merged"] is False
+    assert stored == 1
+
+
+def test_identity_migration_leaves_nothing_pending(db, run):
+    async def scenario():
+        await db.leads.insert_many([
+            {"name": "A", "email": "a@example.com", "timestamp": "2025-01-01T10:00:00"},
+            {"name": "A again", "email": "A@example.com", "timestamp": "2025-01-02T10:00:00"},
+            {"name": "No contact", "timestamp": "2025-01-03T10:00:00"},
+            {"name": "Bad phone", "phone": "123", "timestamp": "2025-01-04T10:00:00"},
+        ])
+        pending = MIGRATIONS["identities"]["pending"]
+        before = await db.leads.count_documents(pending)
+        counts = await merge_duplicate_leads(Job(IDENTITY_JOB_KIND), db)
+        return before, counts, await db.leads.count_documents(pending), await db.leads.count_documents({})
+
+    before, counts, after, total = run(scenario())
+    assert before == 3
+    assert counts == {"scanned": 4, "merged": 1, "unkeyed": 2}
+    assert after == 0
+    assert total == 3
@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+
+import lead_migrations
+from background_jobs import Job
+from lead_migrations import MIGRATIONS, TIMESTAMP_JOB_KIND, TIMESTAMP_MIGRATION, backfill_lead_timestamps
+from lead_store import format_timestamp, normalize_lead, to_bson_date
+
+
+def test_to_bson_date_reads_every_stored_format():
+    expected = datetime(2025, 9, 1, 4, 30)
+    assert to_bson_date("2025-09-01T04:30:00Z") == expected
+    assert to_bson_date("2025-09-01T10:00:00+05:30") == expected
+    assert to_bson_date("2025-09-01 04:30:00") == expected
+    assert to_bson_date(datetime(2025, 9, 1, 10, 0, tzinfo=timezone.utc).timestamp()) == datetime(2025, 9, 1, 10, 0)
+    assert to_bson_date(1756701000000) == expected
+    assert to_bson_date("last tuesday") is None
+    assert to_bson_date(True) is None
+    assert format_timestamp(None) == "Unknown Date"
+    assert format_timestamp("garbled") == "garbled"
+
+
+def test_normalize_lead_defaults_to_now():
+    lead = normalize_lead({"name": "Asha", "timestamp": "garbled"})
+    assert isinstance(lead["timestamp"], datetime)
+    assert abs((datetime.utcnow() - lead["timestamp"]).total_seconds()) < 5
+
+
+def test_backfill_converts_old_timestamps_and_keeps_unreadable_values(db, run, monkeypatch):
+    monkeypatch.setattr(lead_migrations, "BATCH_SIZE", 2)
+    monkeypatch.setattr(lead_migrations, "BATCH_PAUSE_SECONDS", 0)
+
+    async def scenario():
+        await db.leads.insert_many([
+            {"name": "iso", "timestamp": "2025-09-01T04:30:00Z"},
+            {"name": "str", "timestamp": "2025-09-01 04:30:00.123456"},
+            {"name": "epoch", "timestamp": 1756701000000},
+            {"name": "bad", "timestamp": "garbled"},
+            {"name": "done", "timestamp": datetime(2025, 1, 1)},
+        ])
+        pending = MIGRATIONS["timestamps"]["pending"]
+        before = await db.leads.count_documents(pending)
+        counts = await backfill_lead_timestamps(Job(TIMESTAMP_JOB_KIND), db)
+        leads = {lead["name"]: lead async for lead in db.leads.find({})}
+        checkpoint = await db.migrations.find_one({"_id": TIMESTAMP_MIGRATION})
+        return before, counts, leads, checkpoint, await db.leads.count_documents(pending)
+
+    before, counts, leads, checkpoint, after = run(scenario())
+    assert before == 4 and after == 0
+    assert counts == {"scanned": 4, "converted": 4, "unreadable": 1}
+    assert leads["iso"]["timestamp"] == datetime(2025, 9, 1, 4, 30)
+    assert leads["epoch"]["timestamp"] == datetime(2025, 9, 1, 4, 30)
+    assert leads["bad"]["timestamp_raw"] == "garbled"
+    assert leads["bad"]["timestamp"] == leads["bad"]["_id"].generation_time.replace(tzinfo=None)
+    assert checkpoint["completed_at"] is not None
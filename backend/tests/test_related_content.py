@@ -0,0 +1,42 @@
+from blog_index import BlogIndex, build_related_content
+from related_content import RelatedContentEngine, jaccard_matrix, tokenize
+
+
+def test_tokenize_keeps_tech_terms_and_drops_stop_words():
+    assert tokenize("What is C++ and the CI/CD of Node.js?") == ["c++", "ci", "cd", "node.js"]
+
+
+def test_jaccard_matrix():
+    scores = jaccard_matrix([{"linux", "shell"}, {"linux"}, set()])
+    assert scores[0, 1] == 0.5
+    assert scores[0, 2] == 0.0 and scores[2, 2] == 0.0
+
+
+def test_engine_ranks_similar_posts_and_courses():
+    related = RelatedContentEngine(top_k=2).build(
+        post_keys=["k8s", "docker", "excel"],
+        post_texts=["kubernetes pods clusters deploy", "docker containers images deploy", "excel formulas sheets"],
+        post_tags=[{"devops"}, {"devops"}, {"office"}],
+        course_keys=["devops-course", "office-course"],
+        course_texts=["kubernetes docker devops deploy", "excel word office sheets"],
+    )
+    assert related["posts"]["k8s"] == ["docker"]
+    # No shared terms or tags - nothing is padded in
+    assert related["posts"]["excel"] == []
+    assert related["courses"]["docker"][0] == "devops-course"
+    assert related["courses"]["excel"] == ["office-course"]
+
+
+def test_blog_index_serves_stored_related_posts_that_are_still_published():
+    posts = [
+        {"slug": "a", "title": "Ansible roles", "tags": ["ansible"], "created_at": "2024-01-01"},
+        {"slug": "b", "title": "Ansible playbooks", "tags": ["ansible"], "created_at": "2024-01-02"},
+        {"slug": "c", "title": "Ansible vault", "tags": ["ansible"], "created_at": "2024-01-03"},
+    ]
+    content = {"meta": {"revision": 1}, "blog": {"posts": posts}, "courses": []}
+    content["blog"]["related"] = build_related_content(content)
+    assert set(content["blog"]["related"]["posts"]["a"]) == {"b", "c"}
+
+    posts[2]["published"] = False
+    index = BlogIndex(content)
+    assert [summary["slug"] for summary in index.related_posts("a")] == ["b"]
@@ -0,0 +1,64 @@
+import time
+import asyncio
+
+import pytest
+
+import syllabus_pool
+from syllabus_pool import SyllabusRenderPool, SyllabusQueueFull, SyllabusRenderTimeout
+
+
+def _slow_render(seconds):
+    def render(payload):
+        time.sleep(seconds)
+        return b"%PDF-" + payload["slug"].encode()
+    return render
+
+
+def _render(pool, slug="python", admission=True):
+    return pool.render({"slug": slug}, {}, {}, slug, "2025-09-01", admission=admission)
+
+
+def test_timed_out_render_keeps_its_slot_until_the_worker_finishes(monkeypatch, run):
+    monkeypatch.setattr(syllabus_pool, "render_syllabus_payload", _slow_render(0.3))
+    pool = SyllabusRenderPool(executor_type="thread", workers=1, timeout=0.05, queue_limit=0)
+
+    async def scenario():
+        with pytest.raises(SyllabusRenderTimeout):
+            await _render(pool)
+        # The worker is still busy: the slot stays taken, so new visitors are turned away
+        assert pool.in_flight == 1
+        with pytest.raises(SyllabusQueueFull):
+            await _render(pool)
+        await asyncio.sleep(0.4)
+        assert pool.in_flight == 0
+        pool.timeout = 5
+        assert await _render(pool, "devops") == b"%PDF-devops"
+
+    try:
+        run(scenario())
+    finally:
+        pool.shutdown()
+
+
+def test_background_renders_do_not_use_the_visitor_queue(monkeypatch, run):
+    monkeypatch.setattr(syllabus_pool, "render_syllabus_payload", _slow_render(0.1))
+    pool = SyllabusRenderPool(executor_type="thread", workers=1, timeout=5, queue_limit=1)
+
+    async def scenario():
+        background = [asyncio.create_task(_render(pool, f"bg{i}", admission=False)) for i in range(4)]
+        await asyncio.sleep(0.02)
+        assert pool.queued == 0
+        assert pool.metrics()["background_queue_depth"] == 3
+        # One visitor may still wait behind the background work ...
+        visitor = asyncio.create_task(_render(pool, "visitor"))
+        await asyncio.sleep(0)
+        # ... the next one exceeds queue_limit
+        with pytest.raises(SyllabusQueueFull):
+            await _render(pool, "late")
+        assert await visitor == b"%PDF-visitor"
+        await asyncio.gather(*background)
+
+    try:
+        run(scenario())
+    finally:
+        pool.shutdown()
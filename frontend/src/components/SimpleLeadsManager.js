@@ -15,6 +15,7 @@ const SimpleLeadsManager = ({ token, onLogout }) => {
   const [attemptLog, setAttemptLog] = useState([]);
   const [selectedLeads, setSelectedLeads] = useState([]);
   const [deleting, setDeleting] = useState(false);
+  const [live, setLive] = useState(false);
 
   // ---- Endpoints to try (common patterns) ----
   const endpoints = useMemo(
@@ -125,6 +126,21 @@ const SimpleLeadsManager = ({ token, onLogout }) => {
     if (token) load();
   }, [token]);
 
+  // Live feed: new and merged leads arrive over SSE, so the list is loaded once instead of re-fetched
+  useEffect(() => {
+    if (!token || !BACKEND_URL || typeof EventSource === "undefined") return;
+    const source = new EventSource(`${BACKEND_URL}/api/admin/leads/stream?token=${encodeURIComponent(token)}`);
+    source.addEventListener("ready", () => setLive(true));
+    source.addEventListener("lead", (e) => {
+      const item = normalize(JSON.parse(e.data).lead);
+      setLeads((prev) => [item, ...prev.filter((l) => l.id !== item.id)]);
+    });
+    // Missed too many updates (backend restart, slow connection) - reload the list
+    source.addEventListener("resync", () => load(true));
+    source.onerror = () => setLive(false);
+    return () => source.close();
+  }, [token]);
+
   // Delete functions
   const deleteSingleLead = async (leadId) => {
     if (!confirm("Are you sure you want to delete this lead?")) return;
@@ -245,7 +261,15 @@ const SimpleLeadsManager = ({ token, onLogout }) => {
     <div className="min-h-screen bg-gray-50">
       <div className="max-w-5xl mx-auto px-4 py-6">
         <div className="mb-4 flex items-center justify-between">
-          <h1 className="text-xl font-black text-gray-900">Leads</h1>
+          <h1 className="text-xl font-black text-gray-900 flex items-center gap-2">
+            Leads
+            {live && (
+              <span className="inline-flex items-center gap-1 text-xs font-semibold text-emerald-700" title="New leads appear automatically">
+                <span className="h-2 w-2 rounded-full bg-emerald-500 animate-pulse" />
+                Live
+              </span>
+            )}
+          </h1>
           <div className="flex items-center gap-2">
             <button
               onClick={() => load(true)}
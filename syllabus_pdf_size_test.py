@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Syllabus PDF Size Regression Test - compact mode bytes per page, for every course
+
+Renders each course in backend/data/content.json locally in compact mode (with
+the bundled logo, so no network is needed) - both the plain syllabus and, when
+pypdf is installed, the personalised copy stamped onto the cached base PDF -
+and fails if any PDF exceeds the bytes-per-page budget. Catches regressions such as a full-resolution logo,
+ASCII85 stream encoding or embedded fonts creeping back in.
+
+Usage: python syllabus_pdf_size_test.py [--max-bytes-per-page N]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from io import BytesIO
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+import syllabus_renderer  # noqa: E402
+from asset_cache import logo_cache  # noqa: E402
+from syllabus_stamp import stamp_lines  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING)
+
+# Compact syllabi measured ~4.1 KB/page when this budget was set
+MAX_BYTES_PER_PAGE = 5000
+
+
+def page_count(pdf: bytes) -> int:
+    try:
+        from pypdf import PdfReader
+        return len(PdfReader(BytesIO(pdf)).pages)
+    except ImportError:
+        # Each page object carries exactly one "/Type /Page" (the tree root is "/Pages")
+        return pdf.count(b"/Type /Page\n") + pdf.count(b"/Type /Page ") or 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Syllabus PDF size regression test")
+    parser.add_argument("--max-bytes-per-page", type=int, default=MAX_BYTES_PER_PAGE)
+    args = parser.parse_args()
+
+    with open(os.path.join(BACKEND_DIR, "data", "content.json")) as f:
+        content = json.load(f)
+
+    logo = logo_cache.bundled_logo()
+    results = {}
+    for course in content.get("courses", []):
+        if not course.get("slug"):
+            continue
+        pdf = syllabus_renderer.render(
+            course, content.get("institute", {}), content.get("branding", {}),
+            logo=logo, compact=True,
+        )
+        results[course["slug"]] = pdf
+
+        base = syllabus_renderer.render_base(
+            course, content.get("institute", {}), content.get("branding", {}),
+            logo=logo, compact=True,
+        )
+        if base is not None:
+            lines = syllabus_renderer.personal_lines({"name": "Size Test", "document_id": "SYL-SIZE-TEST"})
+            results[f"{course['slug']} (stamped)"] = stamp_lines(
+                base, lines, syllabus_renderer.PERSONAL_FONT,
+                syllabus_renderer.PERSONAL_FONT_SIZE, syllabus_renderer.PERSONAL_LINE_HEIGHT,
+            )
+
+    print(f"\n{'='*60}")
+    print(f"📦 SYLLABUS PDF SIZE TEST (budget {args.max_bytes_per_page} bytes/page)")
+    print(f"{'='*60}")
+
+    failures = 0
+    for slug, pdf in results.items():
+        size, pages = len(pdf), page_count(pdf)
+        per_page = size // pages
+        ok = per_page <= args.max_bytes_per_page
+        failures += not ok
+        status = "✅ PASS" if ok else "❌ FAIL"
+        print(f"  {slug:<42} {size:>7} bytes / {pages} pages = {per_page:>5}/page  {status}")
+
+    print(f"\nTests Passed: {len(results) - failures}/{len(results)}")
+    if failures:
+        print("\n⚠️ Some syllabi exceed the size budget")
+        sys.exit(1)
+    print("\n🎉 ALL SYLLABI WITHIN SIZE BUDGET!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Syllabus Render Micro-Benchmark - times backend/syllabus_renderer.py locally
+
+Renders every course in backend/data/content.json in three modes:
+  full      - render(course, institute, branding)
+  personal  - render(..., personalization) (full layout per lead)
+  stamped   - render_base once, then stamp_lines per lead (needs pypdf)
+
+Usage: python syllabus_render_benchmark.py [--iterations N] [--course SLUG]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+import syllabus_renderer  # noqa: E402
+from syllabus_stamp import STAMPING_AVAILABLE, stamp_lines  # noqa: E402
+
+# Renderer logs one line per PDF - keep the benchmark output readable
+logging.basicConfig(level=logging.WARNING)
+
+
+def time_calls(func, iterations):
+    """Milliseconds per call (warm - the first call is discarded)"""
+    func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def benchmark_course(course, institute, branding, iterations):
+    personalization = {"name": "Benchmark Student", "document_id": f"SYL-{course['slug'].upper()}-BENCH"}
+    generated_on = syllabus_renderer.generation_date()
+
+    results = {
+        "full": time_calls(lambda: syllabus_renderer.render(course, institute, branding, generated_on=generated_on), iterations),
+        "personal": time_calls(lambda: syllabus_renderer.render(course, institute, branding, personalization, generated_on), iterations),
+    }
+
+    if STAMPING_AVAILABLE:
+        base = syllabus_renderer.render_base(course, institute, branding, generated_on)
+        lines = syllabus_renderer.personal_lines(personalization)
+        results["stamped"] = time_calls(
+            lambda: stamp_lines(
+                base, lines,
+                font_name=syllabus_renderer.PERSONAL_FONT,
+                font_size=syllabus_renderer.PERSONAL_FONT_SIZE,
+                line_height=syllabus_renderer.PERSONAL_LINE_HEIGHT,
+            ),
+            iterations,
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Syllabus render micro-benchmark")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--course", help="Only benchmark this course slug")
+    args = parser.parse_args()
+
+    with open(os.path.join(BACKEND_DIR, "data", "content.json")) as f:
+        content = json.load(f)
+
+    courses = [c for c in content.get("courses", []) if c.get("slug")]
+    if args.course:
+        courses = [c for c in courses if c["slug"] == args.course]
+
+    modes = ["full", "personal"] + (["stamped"] if STAMPING_AVAILABLE else [])
+    print(f"{'='*72}")
+    print(f"🖨️ SYLLABUS RENDER BENCHMARK - {args.iterations} iterations, median / max ms")
+    print(f"{'='*72}")
+    print(f"{'course':<32}" + "".join(f"{mode:>14}" for mode in modes))
+
+    totals = {mode: [] for mode in modes}
+    for course in courses:
+        results = benchmark_course(course, content.get("institute", {}), content.get("branding", {}), args.iterations)
+        row = f"{course['slug'][:31]:<32}"
+        for mode in modes:
+            median, worst = results[mode]
+            totals[mode].append(median)
+            row += f"{median:>7.1f} /{worst:>5.1f}"
+        print(row)
+
+    if courses:
+        print(f"{'-'*72}")
+        print(f"{'median of medians':<32}" + "".join(f"{statistics.median(totals[mode]):>14.1f}" for mode in modes))
+    if not STAMPING_AVAILABLE:
+        print("\n⚠️ pypdf not installed - stamped mode skipped")
+
+
+if __name__ == "__main__":
+    main()